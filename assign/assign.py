@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+from bisect import bisect_left, bisect_right
+from heapq import heapify, heappop, heappush
+from typing import Iterable, Iterator
+
+from pendulum import DateTime
+
+from member.memberset import MemberSet
+from task.task import Task
+from timerange.workingcalendar import WorkingCalendar
+
+
+# 担当者の予定(稼働秒の区間)。重ならない区間を開始順に持つ。休みの中に
+# 収まる幅0の区間は何とも重ならないので持たない。
+class _Schedule:
+  __slots__ = ("starts", "ends")
+
+  def __init__(self, spans: list[tuple[float, float]]):
+    self.starts = []
+    self.ends = []
+    for start, end in sorted(spans):
+      if start == end:
+        continue
+      if self.ends and start <= self.ends[-1]:
+        self.ends[-1] = max(self.ends[-1], end)
+      else:
+        self.starts.append(start)
+        self.ends.append(end)
+
+  def is_free(self, start: float, end: float) -> bool:
+    i = bisect_right(self.starts, start)
+    if i and self.ends[i - 1] > start:
+      return False
+    return i >= len(self.starts) or self.starts[i] >= end
+
+  def add(self, start: float, end: float):
+    if start == end:
+      return
+    i = bisect_left(self.starts, start)
+    self.starts.insert(i, start)
+    self.ends.insert(i, end)
+
+  # [start, end)と重なる稼働秒。
+  def used(self, start: float, end: float) -> float:
+    return sum(
+      max(0, min(e, end) - max(s, start)) for s, e in zip(self.starts, self.ends)
+    )
+
+
+# 担当者のいないタスクに担当者を提案する。完了していないタスクの予定を
+# 担当者ごとに集め、担当者のいないタスクを予定開始の順に、予定が重ならない
+# 担当者のうち今から後の空いている稼働時間が最も多い人に割り当てる。
+# 担当者は空き時間をキーにしたヒープで持ち、重なる人だけを取り出して
+# 戻すので、タスクごとに全員やすべての予定を見直すことはない。
+class Assigner:
+  __slots__ = ("calendar", "now", "_members", "_busy", "_open")
+
+  def __init__(
+    self,
+    members: MemberSet,
+    calendar: WorkingCalendar,
+    now: DateTime,
+    roles: Iterable[str] | None = None,
+  ):
+    roles = set(roles) if roles else None
+    self.calendar = calendar
+    self.now = now
+    self._members = [m for m in members if roles is None or m.role in roles]
+    self._busy = {m.name: [] for m in self._members}
+    self._open = []
+
+  def add(self, task: Task, task_members: MemberSet):
+    if task.actual_end:
+      return
+    span = (
+      self.calendar.seconds_at(task.plan_start),
+      self.calendar.seconds_at(task.plan_end),
+    )
+    if not task_members:
+      self._open.append((span, len(self._open), task))
+      return
+    for m in task_members:
+      busy = self._busy.get(m.name)
+      if busy is not None:
+        busy.append(span)
+
+  def feed(
+    self, tasks: Iterable[tuple[Task, MemberSet]]
+  ) -> Iterator[tuple[Task, MemberSet]]:
+    for task, task_members in tasks:
+      self.add(task, task_members)
+      yield task, task_members
+
+  # (タスク, 提案する担当者名)を予定開始の順に返す。候補がいなければNone。
+  def suggest(self) -> list[tuple[Task, str | None]]:
+    calendar = self.calendar
+    now = calendar.seconds_at(self.now)
+    last = calendar.cumulative[-1] if calendar.cumulative else 0
+    schedules = {}
+    heap = []
+    for i, m in enumerate(self._members):
+      schedule = _Schedule(self._busy[m.name])
+      schedules[m.name] = schedule
+      heap.append((schedule.used(now, last) - (last - now), i, m.name))
+    heapify(heap)
+
+    result = []
+    for (start, end), _, task in sorted(self._open):
+      busy = []
+      chosen = None
+      while heap:
+        entry = heappop(heap)
+        if schedules[entry[2]].is_free(start, end):
+          chosen = entry
+          break
+        busy.append(entry)
+      if chosen:
+        key, i, name = chosen
+        schedules[name].add(start, end)
+        busy.append((key + max(0, min(end, last) - max(start, now)), i, name))
+      for entry in busy:
+        heappush(heap, entry)
+      result.append((task, chosen[2] if chosen else None))
+    return result
+
+
+# end of file
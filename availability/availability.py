@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+from heapq import merge
+from typing import Iterable, Iterator
+
+from pendulum import DateTime
+
+from member.memberset import MemberSet
+from task.task import Task
+from timerange.timerange import TimeRange
+from timerange.workingcalendar import WorkingCalendar
+
+
+# 担当者ごとの予定を稼働秒の軸(カレンダーの始まりからの稼働秒数)に写して
+# 集める。休みはこの軸では幅が0になるので、空いている稼働時間は予定の
+# 隙間の長さそのものになる。完了したタスクは空きを塞がない。
+class Availability:
+  __slots__ = ("names", "calendar", "_busy")
+
+  def __init__(self, members: MemberSet, calendar: WorkingCalendar):
+    self.names = members.names()
+    self.calendar = calendar
+    self._busy = {name: [] for name in self.names}
+
+  def add(self, task: Task, task_members: MemberSet):
+    if task.actual_end:
+      return
+    start = self.calendar.seconds_at(task.plan_start)
+    end = self.calendar.seconds_at(task.plan_end)
+    if start < end:
+      for m in task_members:
+        self._busy[m.name].append((start, end))
+
+  def feed(
+    self, tasks: Iterable[tuple[Task, MemberSet]]
+  ) -> Iterator[tuple[Task, MemberSet]]:
+    for task, task_members in tasks:
+      self.add(task, task_members)
+      yield task, task_members
+
+  # 誰かの予定が入っている区間(稼働秒)。担当者ごとに整列してから一度の
+  # マージでつなぐ。
+  def busy(self, names: Iterable[str]) -> list[tuple[float, float]]:
+    result = []
+    for start, end in merge(*(sorted(self._busy[name]) for name in names)):
+      if result and start <= result[-1][1]:
+        if end > result[-1][1]:
+          result[-1] = (result[-1][0], end)
+      else:
+        result.append((start, end))
+    return result
+
+  # after以降で全員が空いている稼働時間がseconds秒以上続く区間を早い順に返す。
+  # 区間の両端は稼働している時刻に寄せる。firstなら最初の1つだけ。
+  def slots(
+    self, names: Iterable[str], seconds: float, after: DateTime, first: bool = False
+  ) -> list[TimeRange]:
+    calendar = self.calendar
+    if not calendar.cumulative or seconds <= 0:
+      return []
+    last = calendar.cumulative[-1]
+    cur = calendar.seconds_at(after)
+    result = []
+    for start, end in self.busy(names) + [(last, last)]:
+      if start - cur >= seconds:
+        result.append(TimeRange(calendar.start_at(cur), calendar.time_at(start)))
+        if first:
+          break
+      cur = max(cur, end)
+    return result
+
+  # 最初に空く区間の始まりからseconds秒の稼働時間。見つからなければNone。
+  def earliest(
+    self, names: Iterable[str], seconds: float, after: DateTime
+  ) -> TimeRange | None:
+    slots = self.slots(names, seconds, after, first=True)
+    if not slots:
+      return None
+    start = slots[0].start
+    return TimeRange(start, self.calendar.add(start, seconds))
+
+
+# end of file
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+# load_tasksで読み込んだタスク1件あたりのメモリ使用量を測る。
+# __slots__を使わず工数を作るときに計算していたTask(eager)と、今のTask
+# (slots)を同じシートで測って比べる。
+# python bench/bench_memory.py [タスク数]
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gc
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest import mock
+
+from pendulum import duration as penduration
+
+import prj
+from sheet import Sheet
+from task import Task
+from timerange import TimeRange, TimeRangeSet
+
+MEMBERS = 8
+DAYS = 120
+LABELS = [
+  "タスク",
+  "進捗(%)",
+  "予定開始日時",
+  "予定完了日時",
+  "実績開始日時",
+  "実績完了日時",
+] + [f"担当者{i}" for i in range(1, MEMBERS + 1)]
+
+
+# 進捗管理表と同じレイアウトのシートを作る。
+# 担当者ごとにタスクを30分から2時間ずつ並べる。
+def make_sheet(n: int, first: datetime) -> Sheet:
+  width = 14 + DAYS
+  header = ["ベースライン", None, "チーム名"] + [None] * 3 + LABELS[6:]
+  names = ["bench", None, "bench"] + [None] * 3 + [f"m{i}" for i in range(MEMBERS)]
+  roles = [None] * 6 + ["リーダー"] + [None] * (MEMBERS - 1)
+  days = [first + timedelta(days=d) for d in range(DAYS)]
+  rows = [
+    header + [None] * (width - len(header)),
+    names + [None] * (width - len(names)),
+    roles,
+    [],
+    LABELS + days,
+    [None] * 14 + days,
+    [None] * 14 + [None] * DAYS,
+  ]
+  lanes = [first + timedelta(hours=9)] * MEMBERS
+  for i in range(n):
+    k = i % MEMBERS
+    start = lanes[k]
+    end = start + timedelta(minutes=30 * (1 + i % 4))
+    if end.hour >= 17:
+      start = start.replace(hour=9, minute=0) + timedelta(days=1)
+      end = start + timedelta(minutes=30 * (1 + i % 4))
+    lanes[k] = end
+    # 基準日時(DAYS // 2日目)より後に始まるタスクは未着手にする。
+    started = i % 3 != 0 and start < first + timedelta(days=DAYS // 2)
+    assignees = [None] * MEMBERS
+    assignees[k] = f"m{k}"
+    rows.append(
+      [
+        f"タスク{i % 50}",
+        (i * 13) % 100 if started else None,
+        start,
+        end,
+        start if started else None,
+        None,
+      ]
+      + assignees
+    )
+  return Sheet(rows, "bench")
+
+
+def working_seconds(start: datetime, end: datetime, breaks: TimeRangeSet) -> int:
+  if start >= end:
+    return 0
+  trs = TimeRangeSet([TimeRange(start, end)]) - breaks
+  dur = trs.total_duration() if trs else penduration()
+  return dur.in_seconds()
+
+
+# 比べるためのTask。属性は__dict__に持ち、工数は作るときにすべて計算する。
+class EagerTask:
+  def __init__(
+    self,
+    name,
+    progress,
+    plan_start,
+    plan_end,
+    actual_start,
+    actual_end,
+    now,
+    breaks,
+    was_warned=False,
+    memo=None,
+  ):
+    self.name = name
+    self.plan_start = plan_start
+    self.plan_end = plan_end
+    self.actual_start = actual_start
+    self.actual_end = actual_end
+    self.progress = progress
+    self.now = now
+    self.was_warned = was_warned
+    self.planned_total_seconds = working_seconds(plan_start, plan_end, breaks)
+    self.planned_done_seconds = (
+      working_seconds(plan_start, min(now, plan_end), breaks) if plan_start < now else 0
+    )
+    if progress == 100:
+      self.actual_total_seconds = working_seconds(actual_start, actual_end, breaks)
+      self.actual_done_seconds = self.actual_total_seconds
+    elif progress >= 30:
+      self.actual_done_seconds = working_seconds(actual_start, now, breaks)
+      self.actual_total_seconds = self.actual_done_seconds * 100 / progress
+    else:
+      self.actual_total_seconds = self.planned_total_seconds
+      self.actual_done_seconds = self.actual_total_seconds * progress / 100
+
+  __eq__ = Task.__eq__
+  is_overlap = Task.is_overlap
+  period_start = Task.period_start
+  period_end = Task.period_end
+  is_responsible = Task.is_responsible
+  is_unstarted = Task.is_unstarted
+  is_unfinished = Task.is_unfinished
+  is_overrun = Task.is_overrun
+
+
+# load_tasksが増やしたメモリ(バイト)。
+def measure(ws: Sheet, nowt) -> tuple[int, int]:
+  with redirect_stdout(StringIO()):
+    baseline, team, members, on_off_map = prj.load_members(ws)
+    breaks = prj.make_breaks(on_off_map)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tasks = prj.load_tasks(ws, members, nowt, breaks, on_off_map, interactive=False)
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+  tracemalloc.stop()
+  return len(tasks), sum(s.size_diff for s in after.compare_to(before, "filename"))
+
+
+def main(n: int = 500):
+  first = datetime(2026, 1, 5)
+  ws = make_sheet(n, first)
+  nowt = prj.to_datetime(first + timedelta(days=DAYS // 2, hours=13))
+  # eagerはセルごとにDateTimeを作る(to_datetimeのキャッシュを使わない)。
+  with (
+    mock.patch.object(prj, "Task", EagerTask),
+    mock.patch.object(prj, "to_datetime", prj.to_datetime.__wrapped__),
+  ):
+    count, eager = measure(ws, nowt)
+  prj.to_datetime.cache_clear()
+  count, slots = measure(ws, nowt)
+  for label, size in (("eager", eager), ("slots", slots)):
+    print(
+      f"{label}: tasks: {count}, total: {size / 1024:.1f}KiB,"
+      + f" per task: {size / n:.1f}B"
+    )
+  print(f"slots/eager: {slots / eager:.2f}")
+
+
+if __name__ == "__main__":
+  main(*(int(a) for a in sys.argv[1:]))
+
+# end of file
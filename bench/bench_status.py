@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+# TaskSetの時刻を指定した抽出をfilterと比べる。
+# python bench/bench_status.py [タスク数] [時刻の数]
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from io import StringIO
+
+import prj
+from bench.bench_memory import DAYS, make_sheet
+
+
+def main(n: int = 2000, times: int = 200):
+  first = datetime(2026, 1, 5)
+  ws = make_sheet(n, first)
+  nowt = prj.to_datetime(first + timedelta(days=DAYS // 2, hours=13))
+  with redirect_stdout(StringIO()):
+    baseline, team, members, on_off_map = prj.load_members(ws)
+    breaks = prj.make_breaks(on_off_map)
+    tasks = prj.load_tasks(ws, members, nowt, breaks, on_off_map, interactive=False)
+  ts = [nowt.add(hours=h) for h in range(-times // 2, times - times // 2)]
+
+  queries = [
+    ("unstarted", lambda t, T: t.is_unstarted(T)),
+    ("unfinished", lambda t, T: t.is_unfinished(T)),
+    ("overrun", lambda t, T: t.is_overrun(T)),
+    ("responsible", lambda t, T: t.is_responsible(T)),
+  ]
+  for name, pred in queries:
+    start = time.perf_counter()
+    expected = [tasks.filter(lambda t, T=T, pred=pred: pred(t, T)).names() for T in ts]
+    scan = time.perf_counter() - start
+    start = time.perf_counter()
+    actual = [getattr(tasks, name)(T).names() for T in ts]
+    indexed = time.perf_counter() - start
+    if actual != expected:
+      raise AssertionError(f"{name}: filterと結果が違います。")
+    print(
+      f"{name:12}: filter {scan * 1000:8.1f}ms, index {indexed * 1000:8.1f}ms"
+      + f" ({len(ts)} times, {len(tasks)} tasks)"
+    )
+
+
+if __name__ == "__main__":
+  main(*(int(a) for a in sys.argv[1:]))
+
+# end of file
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import hashlib
+import json
+import os
+import tempfile
+
+import plotly
+import plotly.io as pio
+from pendulum import DateTime
+
+# 形式を変えたら上げる。古いキャッシュは使われなくなり、そのうち追い出される。
+CACHE_VERSION = 2
+# ガントチャートは稼働日1日(7時間)で150pxなので3分でおよそ1px。現在時刻はこの単位に切り捨てる。
+GRANULARITY_MINUTES = 3
+MAX_BYTES = 64 * 1024 * 1024
+
+# 担当者別の行を作るのに使う集計。
+SUMMARY_FIELDS = (
+  "count",
+  "plan_start",
+  "plan_end",
+  "actual_start",
+  "actual_end",
+  "started",
+  "running",
+  "planned_total_seconds",
+  "actual_done_seconds",
+  "actual_total_seconds",
+)
+
+
+def floor_time(t: DateTime, minutes: int = GRANULARITY_MINUTES) -> DateTime:
+  return t.set(minute=t.minute - t.minute % minutes, second=0, microsecond=0)
+
+
+def _iso(t: DateTime | None) -> str:
+  return t.isoformat() if t else ""
+
+
+# ガントチャートの中身を決めるものだけから作るキー。行の並びも図に出るので
+# タスクは渡された順に数える。
+def gantt_key(tasks, nowtt: DateTime, title: str, members=None, breaks=None) -> str:
+  h = hashlib.sha256()
+
+  def put(*values):
+    h.update(repr(values).encode("utf-8"))
+    h.update(b"\n")
+
+  put(CACHE_VERSION, plotly.__version__, title, _iso(nowtt))
+  for t in tasks:
+    put(
+      t.name,
+      _iso(t.plan_start),
+      _iso(t.plan_end),
+      _iso(t.actual_start),
+      _iso(t.actual_end),
+    )
+  if members is not None and breaks is not None:
+    for m in members:
+      s = m.summary
+      put(m.name, *(getattr(s, f) for f in SUMMARY_FIELDS))
+  if breaks is not None:
+    for r in breaks.ranges:
+      put(_iso(r.start), _iso(r.end))
+  return h.hexdigest()
+
+
+# 保存した図。Figureに戻すと最初の1回は検証の準備に作り直すのと同じくらい
+# かかるので、検証済みのdictのまま表示する。
+class CachedFigure:
+  __slots__ = ("fig",)
+
+  def __init__(self, text: str):
+    self.fig = json.loads(text)
+
+  def show(self, *args, **kwargs):
+    pio.show(self.fig, *args, validate=False, **kwargs)
+
+  def to_html(self, *args, **kwargs) -> str:
+    return pio.to_html(self.fig, *args, validate=False, **kwargs)
+
+  def to_json(self, *args, **kwargs) -> str:
+    return pio.to_json(self.fig, *args, validate=False, **kwargs)
+
+
+# キーごとに1つのファイルに保存する。使うたびに更新日時を新しくして、
+# 合計がmax_bytesを超えたら古いものから消す。
+class FigureCache:
+  __slots__ = ("path", "max_bytes")
+
+  def __init__(self, path: str, max_bytes: int = MAX_BYTES):
+    os.makedirs(path, exist_ok=True)
+    self.path = path
+    self.max_bytes = max_bytes
+
+  def _file(self, key: str, ext: str) -> str:
+    return os.path.join(self.path, f"{key}.{ext}")
+
+  def get(self, key: str, ext: str = "json") -> str | None:
+    path = self._file(key, ext)
+    try:
+      with open(path, encoding="utf-8") as f:
+        text = f.read()
+      os.utime(path)
+    except FileNotFoundError:
+      return None
+    return text
+
+  def put(self, key: str, text: str, ext: str = "json"):
+    fd, tmp = tempfile.mkstemp(dir=self.path, prefix=".", suffix=".tmp")
+    try:
+      with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(text)
+      os.replace(tmp, self._file(key, ext))
+    except BaseException:
+      os.unlink(tmp)
+      raise
+    self.evict()
+
+  def evict(self):
+    entries = []
+    total = 0
+    with os.scandir(self.path) as it:
+      for e in it:
+        if e.name.startswith(".") or not e.is_file():
+          continue
+        st = e.stat()
+        entries.append((st.st_mtime_ns, st.st_size, e.path))
+        total += st.st_size
+    entries.sort()
+    # 最後に書いたものは残す。
+    for _, size, path in entries[:-1]:
+      if total <= self.max_bytes:
+        break
+      try:
+        os.unlink(path)
+      except FileNotFoundError:
+        pass
+      total -= size
+
+
+# end of file
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import hashlib
+import json
+import os
+import tempfile
+
+from pendulum import DateTime
+
+from timerange.timerangeset import TimeRangeSet
+
+# 形式を変えたら上げる。
+MEMO_VERSION = 1
+# これを超えたら今回使わなかったものを捨てる。
+MAX_ENTRIES = 1_000_000
+
+
+# 休みの一覧のハッシュ。休みは稼働日(on_off_map)と休み方(夜と昼休み)から
+# 作るので、どちらが変わっても変わる。
+def breaks_fingerprint(breaks: TimeRangeSet) -> str:
+  h = hashlib.sha256(f"{MEMO_VERSION};".encode())
+  for r in breaks.ranges:
+    h.update(f"{int(r.start.timestamp())},{int(r.end.timestamp())};".encode())
+  return h.hexdigest()
+
+
+# 区間の稼働秒数を実行をまたいで覚えておく。カレンダーごとに1つのファイル。
+# nowによらない区間(予定の全体、完了した実績)だけに使う。
+class WorkingTimeMemo:
+  __slots__ = ("path", "fingerprint", "_seconds", "_used", "_dirty")
+
+  def __init__(self, directory: str, breaks: TimeRangeSet):
+    os.makedirs(directory, exist_ok=True)
+    self.fingerprint = breaks_fingerprint(breaks)
+    self.path = os.path.join(directory, f"{self.fingerprint}.json")
+    try:
+      with open(self.path, encoding="utf-8") as f:
+        self._seconds = json.load(f)
+    except (FileNotFoundError, ValueError):
+      self._seconds = {}
+    self._used = set()
+    self._dirty = False
+
+  def get(self, start: DateTime, end: DateTime, compute) -> int:
+    key = f"{int(start.timestamp())},{int(end.timestamp())}"
+    self._used.add(key)
+    seconds = self._seconds.get(key)
+    if seconds is None:
+      seconds = compute(start, end)
+      self._seconds[key] = seconds
+      self._dirty = True
+    return seconds
+
+  def save(self):
+    if not self._dirty:
+      return
+    if len(self._seconds) > MAX_ENTRIES:
+      self._seconds = {k: v for k, v in self._seconds.items() if k in self._used}
+    fd, tmp = tempfile.mkstemp(
+      dir=os.path.dirname(self.path), prefix=".", suffix=".tmp"
+    )
+    try:
+      with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(self._seconds, f, separators=(",", ":"))
+      os.replace(tmp, self.path)
+    except BaseException:
+      os.unlink(tmp)
+      raise
+    self._dirty = False
+
+  def __len__(self):
+    return len(self._seconds)
+
+
+# end of file
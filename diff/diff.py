@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from collections import deque
+from typing import Iterable
+
+from member.memberset import MemberSet
+from task.task import Task
+
+
+# タスク名から行番号(-lineN)を除く。
+def task_label(name: str) -> str:
+  label, sep, line = name.rpartition("-line")
+  return label if sep and line.isdigit() else name
+
+
+class TaskChange:
+  __slots__ = ("name", "old", "new", "old_members", "new_members")
+
+  def __init__(
+    self,
+    name: str,
+    old: Task | None,
+    new: Task | None,
+    old_members: tuple[str, ...] = (),
+    new_members: tuple[str, ...] = (),
+  ):
+    self.name = name
+    self.old = old
+    self.new = new
+    self.old_members = old_members
+    self.new_members = new_members
+
+  def is_rescheduled(self) -> bool:
+    return (self.old.plan_start, self.old.plan_end) != (
+      self.new.plan_start,
+      self.new.plan_end,
+    )
+
+  def is_reprogressed(self) -> bool:
+    return (self.old.progress, self.old.actual_start, self.old.actual_end) != (
+      self.new.progress,
+      self.new.actual_start,
+      self.new.actual_end,
+    )
+
+  def is_reassigned(self) -> bool:
+    return set(self.old_members) != set(self.new_members)
+
+
+class MemberHours:
+  __slots__ = ("name", "old_planned", "new_planned", "old_actual", "new_actual")
+
+  def __init__(self, name: str):
+    self.name = name
+    self.old_planned = 0
+    self.new_planned = 0
+    self.old_actual = 0
+    self.new_actual = 0
+
+
+class WorkbookDiff:
+  __slots__ = ("added", "removed", "rescheduled", "reprogressed", "reassigned", "hours")
+
+  def __init__(self):
+    self.added = []
+    self.removed = []
+    self.rescheduled = []
+    self.reprogressed = []
+    self.reassigned = []
+    # 担当者ごとの予定工数と実績工数(秒)
+    self.hours = []
+
+  def __bool__(self):
+    return bool(
+      self.added
+      or self.removed
+      or self.rescheduled
+      or self.reprogressed
+      or self.reassigned
+      or any(
+        h.old_planned != h.new_planned or h.old_actual != h.new_actual
+        for h in self.hours
+      )
+    )
+
+  def _add(self, change: TaskChange):
+    if change.is_rescheduled():
+      self.rescheduled.append(change)
+    if change.is_reprogressed():
+      self.reprogressed.append(change)
+    if change.is_reassigned():
+      self.reassigned.append(change)
+
+
+def _entries(tasks: Iterable[tuple[Task, MemberSet]]) -> list[tuple]:
+  return [(task_label(t.name), t, tuple(m.name for m in tm)) for t, tm in tasks]
+
+
+# 2つの版のタスクを名前と担当者の組で対応付け、残りを名前だけで対応付ける
+# (担当者の変更)。同じ組が複数あれば上から順に対応付ける。
+# 対応しないタスクは追加/削除。担当者ごとの工数は集計から比べる。
+def diff_tasks(
+  old_tasks: Iterable[tuple[Task, MemberSet]],
+  old_members: MemberSet,
+  new_tasks: Iterable[tuple[Task, MemberSet]],
+  new_members: MemberSet,
+) -> WorkbookDiff:
+  rc = WorkbookDiff()
+  olds = _entries(old_tasks)
+  news = _entries(new_tasks)
+  by_key = {}
+  for e in olds:
+    by_key.setdefault((e[0], frozenset(e[2])), deque()).append(e)
+  matched = set()
+  rest = []
+  for name, t, names in news:
+    q = by_key.get((name, frozenset(names)))
+    if q:
+      o = q.popleft()
+      matched.add(id(o[1]))
+      rc._add(TaskChange(name, o[1], t, o[2], names))
+    else:
+      rest.append((name, t, names))
+  by_name = {}
+  for e in olds:
+    if id(e[1]) not in matched:
+      by_name.setdefault(e[0], deque()).append(e)
+  for name, t, names in rest:
+    q = by_name.get(name)
+    if q:
+      o = q.popleft()
+      matched.add(id(o[1]))
+      rc._add(TaskChange(name, o[1], t, o[2], names))
+    else:
+      rc.added.append(TaskChange(name, None, t, (), names))
+  for name, t, names in olds:
+    if id(t) not in matched:
+      rc.removed.append(TaskChange(name, t, None, names, ()))
+
+  hours = {}
+  for m in old_members:
+    h = hours.setdefault(m.name, MemberHours(m.name))
+    h.old_planned = m.summary.planned_total_seconds
+    h.old_actual = m.summary.actual_done_seconds
+  for m in new_members:
+    h = hours.setdefault(m.name, MemberHours(m.name))
+    h.new_planned = m.summary.planned_total_seconds
+    h.new_actual = m.summary.actual_done_seconds
+  rc.hours = list(hours.values())
+  return rc
+
+
+# end of file
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import csv
+import os
+from itertools import islice
+from typing import Iterable, Iterator
+
+from pendulum import DateTime
+
+from member.memberset import MemberSet
+from task.task import Task
+
+# タスクと担当者の組ごとに1行。担当者がいないタスクはmember/roleが空。
+# tasksはprj.iter_tasksが返す(タスク, 担当者)で、読みながら書き出せる。
+COLUMNS = [
+  ("team", "string"),
+  ("task", "string"),
+  ("member", "string"),
+  ("role", "string"),
+  ("progress", "int"),
+  ("plan_start", "timestamp"),
+  ("plan_end", "timestamp"),
+  ("actual_start", "timestamp"),
+  ("actual_end", "timestamp"),
+  ("planned_total_seconds", "float"),
+  ("planned_done_seconds", "float"),
+  ("actual_total_seconds", "float"),
+  ("actual_done_seconds", "float"),
+  ("is_unstarted", "bool"),
+  ("is_unfinished", "bool"),
+  ("is_overrun", "bool"),
+  ("was_warned", "bool"),
+]
+
+
+def task_rows(
+  team: str,
+  tasks: Iterable[tuple[Task, MemberSet]],
+  members: MemberSet,
+  nowt: DateTime,
+) -> Iterator[tuple]:
+  order = {m.name: i for i, m in enumerate(members)}
+  for t, task_members in tasks:
+    for m in sorted(task_members, key=lambda m: order[m.name]) or [None]:
+      yield (
+        team,
+        t.name,
+        m.name if m else None,
+        m.role if m else None,
+        t.progress,
+        t.plan_start,
+        t.plan_end,
+        t.actual_start,
+        t.actual_end,
+        t.planned_total_seconds,
+        t.planned_done_seconds,
+        t.actual_total_seconds,
+        t.actual_done_seconds,
+        bool(t.is_unstarted(nowt)),
+        bool(t.is_unfinished(nowt)),
+        bool(t.is_overrun(nowt)),
+        t.was_warned,
+      )
+
+
+def _chunks(rows: Iterable[tuple], size: int) -> Iterator[list[tuple]]:
+  it = iter(rows)
+  while chunk := list(islice(it, size)):
+    yield chunk
+
+
+def _write_csv(path: str, rows: Iterable[tuple], chunk_size: int):
+  with open(path, "w", newline="", encoding="utf-8") as f:
+    writer = csv.writer(f)
+    writer.writerow(name for name, _ in COLUMNS)
+    for chunk in _chunks(rows, chunk_size):
+      writer.writerows(
+        tuple(v.isoformat() if isinstance(v, DateTime) else v for v in row)
+        for row in chunk
+      )
+
+
+def _arrow_schema(pa, tz: str):
+  types = {
+    "string": pa.string(),
+    "int": pa.int32(),
+    "timestamp": pa.timestamp("s", tz=tz),
+    "float": pa.float64(),
+    "bool": pa.bool_(),
+  }
+  return pa.schema([(name, types[t]) for name, t in COLUMNS])
+
+
+def _write_arrow(path: str, rows: Iterable[tuple], chunk_size: int, tz: str):
+  import pyarrow as pa
+
+  schema = _arrow_schema(pa, tz)
+  if os.path.splitext(path)[1].lower() == ".parquet":
+    import pyarrow.parquet as pq
+
+    writer = pq.ParquetWriter(path, schema)
+  else:
+    writer = pa.ipc.new_file(path, schema)
+  with writer:
+    for chunk in _chunks(rows, chunk_size):
+      writer.write_table(
+        pa.Table.from_arrays(
+          [pa.array(col, type=f.type) for col, f in zip(zip(*chunk), schema)],
+          schema=schema,
+        )
+      )
+
+
+# 拡張子で形式を選ぶ。.parquet/.arrow/.featherはpyarrowが必要で、
+# ない場合は同じ名前の.csvに書き出す。書き出したファイル名を返す。
+def write_tasks(
+  path: str,
+  rows: Iterable[tuple],
+  chunk_size: int = 10000,
+  tz: str = "Asia/Tokyo",
+) -> str:
+  if os.path.splitext(path)[1].lower() in (".parquet", ".arrow", ".feather"):
+    try:
+      _write_arrow(path, rows, chunk_size, tz)
+      return path
+    except ImportError:
+      path = os.path.splitext(path)[0] + ".csv"
+      print(f"pyarrowがインストールされていないので{path}に書き出します。")
+  _write_csv(path, rows, chunk_size)
+  return path
+
+
+# end of file
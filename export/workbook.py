@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+from typing import Iterable
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, NamedStyle, PatternFill
+from pendulum import DateTime
+
+from member.memberset import MemberSet
+from task.task import Task
+from validate.diagnostic import Diagnostic
+
+DATETIME_FORMAT = "yyyy-mm-dd hh:mm"
+
+# ガントチャートと同じ色。problemは未着手・未完了・工数超過になってから今まで。
+FILLS = {
+  name: PatternFill("solid", fgColor=color)
+  for name, color in [
+    ("plan", "6495ED"),
+    ("done", "00FF64"),
+    ("in progress", "FFA500"),
+    ("problem", "DC0000"),
+    ("off", "808080"),
+  ]
+}
+BOLD = Font(bold=True)
+# ガントのセルは名前付きスタイルにする。塗りを毎回登録するより速い。
+GANTT_STYLES = {name: f"ガント:{name}" for name in FILLS}
+
+RESULT_COLUMNS = [
+  "タスク",
+  "担当者",
+  "進捗(%)",
+  "予定開始日時",
+  "予定完了日時",
+  "実績開始日時",
+  "実績完了日時",
+  "予定工数(hr)",
+  "予定済み工数(hr)",
+  "実績工数(hr)",
+  "見込み工数(hr)",
+  "状態",
+  "警告",
+]
+
+MEMBER_COLUMNS = [
+  "担当者",
+  "役割",
+  "タスク",
+  "予定工数(hr)",
+  "予定済み工数(hr)",
+  "実績工数(hr)",
+  "見込み工数(hr)",
+  "未着手",
+  "未完了",
+  "工数超過",
+]
+
+
+def _row(ws, values: list, fills: dict[int, PatternFill] = None, font=None) -> list:
+  cells = []
+  for i, v in enumerate(values):
+    if isinstance(v, DateTime):
+      cell = WriteOnlyCell(ws, v.naive())
+      cell.number_format = DATETIME_FORMAT
+    else:
+      cell = WriteOnlyCell(ws, v)
+    if fills and i in fills:
+      cell.fill = fills[i]
+    if font:
+      cell.font = font
+    cells.append(cell)
+  return cells
+
+
+def task_status(t: Task, nowt: DateTime) -> str:
+  status = ["未着手" if not t.actual_start else "完了" if t.actual_end else "進行中"]
+  if t.is_unstarted(nowt):
+    status.append("開始遅れ")
+  if (
+    t.actual_end is None
+    and t.is_unfinished(nowt)
+    or (t.actual_end and t.actual_end > t.plan_end)
+  ):
+    status.append("完了遅れ")
+  if t.is_overrun(nowt):
+    status.append("工数超過")
+  return "/".join(status)
+
+
+# colsは稼働日(序数) -> 列。休日は見出しだけ灰色にして、タスクの行では塗らない。
+# 塗るのはタスクの予定と実績の期間のセルだけで、他は空のまま書く。
+# 開始遅れ・完了遅れなら予定を、工数超過なら実績を問題の色にする。
+def _gantt_row(ws, t: Task, nowt: DateTime, cols: dict[int, int], width: int) -> list:
+  fills = {}
+
+  def paint(start: DateTime, end: DateTime, fill: str):
+    for d in range(start.toordinal(), end.toordinal() + 1):
+      col = cols.get(d)
+      if col is not None:
+        fills[col] = fill
+
+  late = not t.actual_end and (t.is_unstarted(nowt) or t.is_unfinished(nowt))
+  paint(t.plan_start, t.plan_end, "problem" if late else "plan")
+  if t.actual_start:
+    if t.actual_end:
+      paint(t.actual_start, t.actual_end, "done")
+    else:
+      paint(
+        t.actual_start,
+        max(t.actual_start, nowt),
+        "problem" if t.is_overrun(nowt) else "in progress",
+      )
+  row = [t.name] + [None] * width
+  for col, fill in fills.items():
+    row[col] = cell = WriteOnlyCell(ws)
+    cell.style = GANTT_STYLES[fill]
+  return row
+
+
+# 計算結果を新しいxlsxに1行ずつ書き出す(openpyxlの書き込み専用モード)。
+# tasksはprj.iter_tasksが返す(タスク, 担当者)で、diagnosticsはiter_tasksに
+# 渡したもの。タスクを返す時点でその行の問題はdiagnosticsに入っている。
+# 担当者の集計はタスクを読み終えてから書く。
+def write_workbook(
+  path: str,
+  tasks: Iterable[tuple[Task, MemberSet]],
+  members: MemberSet,
+  on_off_map: dict[DateTime, bool],
+  nowt: DateTime,
+  diagnostics: list[Diagnostic],
+):
+  wb = Workbook(write_only=True)
+  for name, style in GANTT_STYLES.items():
+    wb.add_named_style(NamedStyle(style, fill=FILLS[name]))
+  results = wb.create_sheet("結果")
+  summary = wb.create_sheet("担当者")
+  gantt = wb.create_sheet("ガント")
+
+  results.append(_row(results, RESULT_COLUMNS, font=BOLD))
+  days = sorted(on_off_map)
+  head = ["タスク"] + [d.format("MM-DD") for d in days]
+  off = {i + 1: FILLS["off"] for i, d in enumerate(days) if not on_off_map[d]}
+  gantt.append(_row(gantt, head, off, BOLD))
+  cols = {d.toordinal(): i + 1 for i, d in enumerate(days) if on_off_map[d]}
+
+  # 行番号 -> 問題。まだ書いていない行の分だけを持つ。
+  pending = {}
+  seen = 0
+  for t, task_members in tasks:
+    for d in diagnostics[seen:]:
+      pending.setdefault(d.row, []).append(d.message)
+    seen = len(diagnostics)
+    row = int(t.name.rpartition("-line")[2])
+    messages = pending.pop(row, [])
+    status = task_status(t, nowt)
+    results.append(
+      _row(
+        results,
+        [
+          t.name,
+          ", ".join(m.name for m in task_members),
+          t.progress,
+          t.plan_start,
+          t.plan_end,
+          t.actual_start,
+          t.actual_end,
+          round(t.planned_total_seconds / 3600, 2),
+          round(t.planned_done_seconds / 3600, 2),
+          round(t.actual_done_seconds / 3600, 2),
+          round(t.actual_total_seconds / 3600, 2),
+          status,
+          "\n".join(messages) or None,
+        ],
+        {12: FILLS["problem"]} if messages or t.was_warned else None,
+      )
+    )
+    gantt.append(_gantt_row(gantt, t, nowt, cols, len(days)))
+
+  summary.append(_row(summary, MEMBER_COLUMNS, font=BOLD))
+  for m in members:
+    s = m.summary
+    counts = [s.unstarted_count, s.unfinished_count, s.overrun_count]
+    summary.append(
+      _row(
+        summary,
+        [
+          m.name,
+          m.role,
+          s.count,
+          round(s.planned_total_seconds / 3600, 2),
+          round(s.planned_done_seconds / 3600, 2),
+          round(s.actual_done_seconds / 3600, 2),
+          round(s.actual_total_seconds / 3600, 2),
+        ]
+        + counts,
+        {7 + i: FILLS["problem"] for i, n in enumerate(counts) if n},
+      )
+    )
+  wb.save(path)
+
+
+# end of file
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from typing import Iterable, Iterator
+
+from pendulum import DateTime
+
+from member.memberset import MemberSet
+from task.task import Task
+from timerange.workingcalendar import WorkingCalendar
+
+
+# 予定と見込みの完了日時。見込みがカレンダーを超える場合はbeyondがTrue。
+# remainingは残りの稼働秒数の合計。
+class Forecast:
+  __slots__ = ("name", "plan_end", "finish", "beyond", "remaining")
+
+  def __init__(self, name: str):
+    self.name = name
+    self.plan_end = None
+    self.finish = None
+    self.beyond = False
+    self.remaining = 0
+
+  def add(self, plan_end: DateTime, finish: DateTime | None, remaining: float = 0):
+    if self.plan_end is None or self.plan_end < plan_end:
+      self.plan_end = plan_end
+    self.remaining += remaining
+    if finish is None:
+      self.beyond = True
+    elif self.finish is None or self.finish < finish:
+      self.finish = finish
+
+  # 見込みが予定より遅れる稼働秒数。遅れなければ負。
+  def delay(self, calendar: WorkingCalendar) -> float | None:
+    if self.beyond:
+      return None
+    return calendar.working_seconds(self.plan_end, self.finish)
+
+
+# 残りの工数を稼働時間として今から積んで完了日時を見込む。
+# 完了したタスクは実績完了日時、未着手は予定開始日時(過ぎていれば今)から予定工数、
+# 進行中はTaskが進捗から見込んだ工数の残り。担当者のタスクは重ならないので、
+# 担当者は今から残りの工数の合計を積んだ時刻より前には終わらない。
+class Forecaster:
+  __slots__ = ("calendar", "nowt", "tasks", "members", "team")
+
+  def __init__(self, calendar: WorkingCalendar, nowt: DateTime):
+    self.calendar = calendar
+    self.nowt = nowt
+    # 完了していないタスクだけ
+    self.tasks = []
+    self.members = {}
+    self.team = Forecast(None)
+
+  @staticmethod
+  def remaining(t: Task) -> float:
+    if t.actual_end:
+      return 0
+    if not t.actual_start:
+      return t.planned_total_seconds
+    return max(t.actual_total_seconds - t.actual_done_seconds, 0)
+
+  def finish(self, t: Task) -> DateTime | None:
+    if t.actual_end:
+      return t.actual_end
+    start = t.actual_start or t.plan_start
+    return self.calendar.add(max(start, self.nowt), self.remaining(t))
+
+  def add(self, t: Task, task_members: MemberSet):
+    finish = self.finish(t)
+    remaining = self.remaining(t)
+    if not t.actual_end:
+      f = Forecast(t.name)
+      f.add(t.plan_end, finish, remaining)
+      self.tasks.append(f)
+    for m in task_members:
+      f = self.members.get(m.name)
+      if f is None:
+        f = self.members[m.name] = Forecast(m.name)
+      f.add(t.plan_end, finish, remaining)
+    self.team.add(t.plan_end, finish, remaining)
+
+  # 担当者ごとの見込み。残りの工数の合計を今から積んだ時刻も考える。
+  def member_forecasts(self, members: MemberSet) -> list[Forecast]:
+    rc = []
+    for m in members:
+      f = self.members.get(m.name)
+      if f is None:
+        continue
+      backlog = self.calendar.add(self.nowt, f.remaining)
+      if backlog is None:
+        f.beyond = True
+      elif f.finish is None or f.finish < backlog:
+        f.finish = backlog
+      rc.append(f)
+    return rc
+
+  # チームの見込みは担当者の見込みとタスクの見込みの遅い方。
+  def team_forecast(self, members: MemberSet) -> Forecast:
+    team = self.team
+    for f in self.member_forecasts(members):
+      team.beyond = team.beyond or f.beyond
+      if f.finish and (team.finish is None or team.finish < f.finish):
+        team.finish = f.finish
+    return team
+
+  # タスクはそのまま返し、見込みを加えていく。
+  def feed(
+    self, tasks: Iterable[tuple[Task, MemberSet]]
+  ) -> Iterator[tuple[Task, MemberSet]]:
+    for task, task_members in tasks:
+      self.add(task, task_members)
+      yield task, task_members
+
+
+# end of file
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator
+
+import numpy as np
+from pendulum import DateTime
+
+from forecast.forecast import Forecaster
+from member.memberset import MemberSet
+from task.task import Task
+from timerange.workingcalendar import WorkingCalendar
+
+QUANTILES = (50, 80, 95)
+
+# 完了したタスクが少なくて実績/予定のばらつきが分からない場合の値
+DEFAULT_SIGMA = 0.3
+
+# 1回に計算する試行の数。タスク x 試行の行列の大きさを抑える。
+SHARD_TRIALS = 20000
+
+
+# 1人分またはチーム分の結果。finishesは各分位の完了日時(範囲外はNone)。
+class RiskResult:
+  __slots__ = ("name", "plan_end", "finishes", "on_time")
+
+  def __init__(
+    self,
+    name: str | None,
+    plan_end: DateTime,
+    finishes: list[DateTime | None],
+    on_time: float,
+  ):
+    self.name = name
+    self.plan_end = plan_end
+    self.finishes = finishes
+    # 予定完了日時までに終わる割合
+    self.on_time = on_time
+
+
+def _simulate(
+  starts: np.ndarray,
+  remaining: np.ndarray,
+  mu: np.ndarray,
+  sigma: np.ndarray,
+  groups: list[np.ndarray],
+  now: float,
+  trials: int,
+  seed: np.random.SeedSequence,
+) -> tuple[np.ndarray, np.ndarray]:
+  rng = np.random.default_rng(seed)
+  # タスク x 試行
+  durations = rng.standard_normal((len(starts), trials))
+  durations *= sigma[:, None]
+  durations += mu[:, None]
+  np.exp(durations, out=durations)
+  durations *= remaining[:, None]
+  finishes = starts[:, None] + durations
+  members = np.empty((len(groups), trials))
+  for k, idx in enumerate(groups):
+    # 担当者のタスクは重ならないので残りの合計より前には終わらない。
+    members[k] = np.maximum(finishes[idx].max(axis=0), now + durations[idx].sum(axis=0))
+  team = finishes.max(axis=0)
+  if len(groups):
+    team = np.maximum(team, members.max(axis=0))
+  return members, team
+
+
+# 完了していないタスクの残りの工数を対数正規分布で引いて完了日時の分布を求める。
+# 分布の中央と幅は、完了したタスクの実績/予定(チームの超過率)から決める。
+# 進捗30%以上の進行中のタスクはTaskの見込みを中央にして、進捗に応じて幅を狭める。
+# 開始位置と残りの工数の求め方はForecasterと同じ。
+class RiskModel:
+  __slots__ = (
+    "calendar",
+    "nowt",
+    "starts",
+    "remaining",
+    "progress",
+    "projected",
+    "assignees",
+    "plan_ends",
+    "team_plan_end",
+    "ratios",
+  )
+
+  def __init__(self, calendar: WorkingCalendar, nowt: DateTime):
+    self.calendar = calendar
+    self.nowt = nowt
+    self.starts = []
+    self.remaining = []
+    self.progress = []
+    # 進捗から工数を見込んだタスクか
+    self.projected = []
+    # 担当者名 -> タスクの位置
+    self.assignees = {}
+    self.plan_ends = {}
+    self.team_plan_end = None
+    # 完了したタスクのlog(実績/予定)
+    self.ratios = []
+
+  def add(self, t: Task, task_members: MemberSet):
+    if self.team_plan_end is None or self.team_plan_end < t.plan_end:
+      self.team_plan_end = t.plan_end
+    for m in task_members:
+      if m.name not in self.plan_ends or self.plan_ends[m.name] < t.plan_end:
+        self.plan_ends[m.name] = t.plan_end
+    if t.actual_end:
+      if t.planned_total_seconds > 0 and t.actual_total_seconds > 0:
+        self.ratios.append(np.log(t.actual_total_seconds / t.planned_total_seconds))
+      return
+    for m in task_members:
+      self.assignees.setdefault(m.name, []).append(len(self.starts))
+    start = max(t.actual_start or t.plan_start, self.nowt)
+    self.starts.append(self.calendar.seconds_at(start))
+    self.remaining.append(Forecaster.remaining(t))
+    self.progress.append(t.progress or 0)
+    self.projected.append(bool(t.actual_start) and (t.progress or 0) >= 30)
+
+  def feed(
+    self, tasks: Iterable[tuple[Task, MemberSet]]
+  ) -> Iterator[tuple[Task, MemberSet]]:
+    for task, task_members in tasks:
+      self.add(task, task_members)
+      yield task, task_members
+
+  def fit(self) -> tuple[float, float]:
+    if len(self.ratios) < 2:
+      return (float(np.mean(self.ratios)) if self.ratios else 0.0), DEFAULT_SIGMA
+    return float(np.mean(self.ratios)), float(np.std(self.ratios, ddof=1))
+
+  # 試行はSHARD_TRIALSずつに分けて計算し、workersが2以上ならプロセスで並列に
+  # 計算する。分け方は試行の数だけで決まるので、結果はworkersによらない。
+  def simulate(
+    self,
+    members: MemberSet,
+    trials: int = 10000,
+    workers: int = 1,
+    seed: int | None = None,
+  ) -> list[RiskResult]:
+    if trials < 1:
+      raise ValueError(f"試行回数は1以上にしてください: {trials}")
+    if not self.starts:
+      return []
+    team_mu, team_sigma = self.fit()
+    projected = np.array(self.projected)
+    progress = np.array(self.progress, dtype=float)
+    mu = np.where(projected, 0.0, team_mu)
+    sigma = np.where(projected, team_sigma * (1 - progress / 100), team_sigma)
+    names = [m.name for m in members if m.name in self.assignees]
+    groups = [np.array(self.assignees[name]) for name in names]
+    now = self.calendar.seconds_at(self.nowt)
+    args = (np.array(self.starts), np.array(self.remaining), mu, sigma, groups, now)
+    shards = -(-trials // SHARD_TRIALS)
+    sizes = [trials // shards + (i < trials % shards) for i in range(shards)]
+    seeds = np.random.SeedSequence(seed).spawn(shards)
+    if workers < 2 or shards == 1:
+      parts = [_simulate(*args, n, s) for n, s in zip(sizes, seeds)]
+    else:
+      with ProcessPoolExecutor(max_workers=min(workers, shards)) as pool:
+        parts = list(
+          pool.map(_simulate, *zip(*[args + (n, s) for n, s in zip(sizes, seeds)]))
+        )
+    member_finishes = np.concatenate([p[0] for p in parts], axis=1)
+    team_finishes = np.concatenate([p[1] for p in parts])
+
+    rc = []
+    for name, finishes in zip(names, member_finishes):
+      rc.append(self._result(name, self.plan_ends[name], finishes))
+    rc.append(self._result(None, self.team_plan_end, team_finishes))
+    return rc
+
+  def _result(
+    self, name: str | None, plan_end: DateTime, finishes: np.ndarray
+  ) -> RiskResult:
+    return RiskResult(
+      name,
+      plan_end,
+      [self.calendar.time_at(q) for q in np.percentile(finishes, QUANTILES)],
+      float(np.mean(finishes <= self.calendar.seconds_at(plan_end))),
+    )
+
+
+# end of file
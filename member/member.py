@@ -26,32 +26,53 @@
 # CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import sys
+
 from task.task import Task
 from task.taskset import TaskSet
+from task.tasksummary import TaskSummary
 
 
 class Member:
+  __slots__ = ("name", "role", "tasks", "summary", "was_warned", "_days")
+
   def __init__(self, name: str, role: str | None):
-    self.name = name
-    self.role = role
+    self.name = sys.intern(name) if isinstance(name, str) else name
+    self.role = sys.intern(role) if isinstance(role, str) else role
     self.tasks = TaskSet()
+    self.summary = TaskSummary()
     self.was_warned = False
+    # 日(序数) -> その日にかかるタスクの(順番, 予定開始, 予定終了, 名前)
+    self._days = {}
 
   def __eq__(self, val: "Member"):
     return self.name == val.name
 
-  def add_task(self, task: "Task"):
-    for ts in self.tasks:
-      if ts.is_overlap(task):
-        self.was_warned = True
-        print(
-          f"{self.name}さんのタスク「{task.name}」はタスク「{ts.name}」と重なっています。タスクを分割するなどして修正してください。"
-        )
-    self.tasks.add(task)
+  # keepがFalseならタスクは保持せず、集計と重なり判定用の予定期間だけを残す。
+  # detailsがFalseなら集計はCSに出す一覧を持たず件数だけ数える。
+  # 予定が重なっている既存のタスク名を追加した順に返す。
+  def add_task(
+    self, task: "Task", keep: bool = True, details: bool = True
+  ) -> list[str]:
+    days = range(task.plan_start.toordinal(), task.plan_end.toordinal() + 1)
+    overlaps = {}
+    for d in days:
+      for seq, start, end, name in self._days.get(d, ()):
+        if start < task.plan_end and task.plan_start < end:
+          overlaps[seq] = name
+    if overlaps:
+      self.was_warned = True
+    entry = (self.summary.count, task.plan_start, task.plan_end, task.name)
+    for d in days:
+      self._days.setdefault(d, []).append(entry)
+    self.summary.add(task, details)
+    if keep:
+      self.tasks.add(task)
+    return [overlaps[seq] for seq in sorted(overlaps)]
 
   def __repr__(self):
     return (
-      f"Member(name={self.name!r}, role={self.role!r}, tasks={len(self.tasks)} tasks)"
+      f"Member(name={self.name!r}, role={self.role!r}, tasks={len(self.summary)} tasks)"
     )
 
 
@@ -30,6 +30,8 @@ from member.member import Member
 
 
 class MemberSet:
+  __slots__ = ("members",)
+
   def __init__(self, members: list[Member] = None):
     self.members = members or []
 
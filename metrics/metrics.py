@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+
+from pendulum import DateTime
+
+from member.memberset import MemberSet
+from task.task import Task
+from validate.diagnostic import INFO, WARNING, Diagnostic
+
+PREFIX = "shishiodoshi_"
+
+# 名前 -> (種類, 説明)
+FAMILIES = {
+  "progress_ratio": (
+    "gauge",
+    "Planned or actual progress (done / total working time).",
+  ),
+  "planned_seconds": ("gauge", "Planned working time in seconds."),
+  "actual_seconds": ("gauge", "Actual working time in seconds."),
+  "tasks": ("gauge", "Number of tasks by status at the evaluation time."),
+  "diagnostics": ("gauge", "Number of diagnostics found while reading the sheet."),
+  "phase_seconds": ("gauge", "Wall time of each phase of the run in seconds."),
+  "evaluated_timestamp_seconds": ("gauge", "Evaluation time of the report."),
+  "last_run_timestamp_seconds": ("gauge", "Time the run finished."),
+}
+
+
+def _escape(value: str) -> str:
+  return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# 1回の実行の結果をPrometheusのtextfile collector用にまとめる。
+class Metrics:
+  __slots__ = ("team", "samples", "phases", "counts")
+
+  def __init__(self, team: str = None):
+    self.team = team
+    # (名前, ラベル, 値)
+    self.samples = []
+    self.phases = {}
+    self.counts = dict(total=0, unstarted=0, unfinished=0, overrun=0)
+
+  @contextmanager
+  def phase(self, name: str):
+    start = time.perf_counter()
+    try:
+      yield
+    finally:
+      self.phases[name] = self.phases.get(name, 0) + time.perf_counter() - start
+
+  # タスクはそのまま返し、状態ごとの件数を数える。
+  def feed(
+    self, tasks: Iterable[tuple[Task, MemberSet]], nowt: DateTime
+  ) -> Iterator[tuple[Task, MemberSet]]:
+    counts = self.counts
+    for task, task_members in tasks:
+      counts["total"] += 1
+      if task.is_unstarted(nowt):
+        counts["unstarted"] += 1
+      if task.is_unfinished(nowt):
+        counts["unfinished"] += 1
+      if task.is_overrun(nowt):
+        counts["overrun"] += 1
+      yield task, task_members
+
+  def add(self, name: str, value: float, **labels):
+    self.samples.append((name, dict(team=self.team, **labels), value))
+
+  def add_progress(self, durations: tuple, **labels):
+    planned_total, planned_done, actual_total, actual_done = durations
+    self.add("planned_seconds", planned_total, kind="total", **labels)
+    self.add("planned_seconds", planned_done, kind="done", **labels)
+    self.add("actual_seconds", actual_total, kind="total", **labels)
+    self.add("actual_seconds", actual_done, kind="done", **labels)
+    if planned_total:
+      self.add("progress_ratio", planned_done / planned_total, kind="planned", **labels)
+    if actual_total:
+      self.add("progress_ratio", actual_done / actual_total, kind="actual", **labels)
+
+  # チームと担当者ごとの進捗、タスクと問題の件数、フェーズの時間を加える。
+  def add_run(
+    self,
+    team_durations: tuple,
+    members: MemberSet,
+    diagnostics: list[Diagnostic],
+    nowt: DateTime,
+  ):
+    self.add_progress(team_durations)
+    for status, n in self.counts.items():
+      self.add("tasks", n, status=status)
+    for m in members:
+      s = m.summary
+      self.add_progress(s.total_durations(), member=m.name)
+      self.add("tasks", s.count, member=m.name, status="total")
+      self.add("tasks", s.unstarted_count, member=m.name, status="unstarted")
+      self.add("tasks", s.unfinished_count, member=m.name, status="unfinished")
+      self.add("tasks", s.overrun_count, member=m.name, status="overrun")
+    levels = {}
+    for d in diagnostics:
+      levels[d.level] = levels.get(d.level, 0) + 1
+    for level in (WARNING, INFO):
+      self.add("diagnostics", levels.get(level, 0), level=level)
+    self.add("evaluated_timestamp_seconds", nowt.timestamp())
+
+  def render(self, openmetrics: bool = False) -> str:
+    samples = self.samples + [
+      ("phase_seconds", dict(team=self.team, phase=p), s)
+      for p, s in self.phases.items()
+    ]
+    samples.append(("last_run_timestamp_seconds", dict(team=self.team), time.time()))
+    lines = []
+    for family, (kind, help) in FAMILIES.items():
+      rows = [(labels, value) for name, labels, value in samples if name == family]
+      if not rows:
+        continue
+      lines.append(f"# HELP {PREFIX}{family} {help}")
+      lines.append(f"# TYPE {PREFIX}{family} {kind}")
+      for labels, value in rows:
+        text = ",".join(
+          f'{k}="{_escape(v)}"' for k, v in labels.items() if v is not None
+        )
+        lines.append(f"{PREFIX}{family}{{{text}}} {float(value)!r}")
+    if openmetrics:
+      lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+# 同じディレクトリの一時ファイルに書いてから置き換える。
+# node_exporterが書きかけのファイルを読むことはない。
+def write_textfile(path: str, text: str):
+  fd, tmp = tempfile.mkstemp(
+    dir=os.path.dirname(os.path.abspath(path)), prefix=".", suffix=".tmp"
+  )
+  try:
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+      f.write(text)
+      f.flush()
+      os.fsync(f.fileno())
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)
+  except BaseException:
+    os.unlink(tmp)
+    raise
+
+
+# end of file
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import hashlib
+from typing import Callable
+
+from pendulum import DateTime
+
+from member.memberset import MemberSet
+from task.task import Task
+from task.taskset import TaskSet
+from timerange.timerangeset import TimeRangeSet
+
+
+# 開講/休講の並びが同じカレンダーは同じ値になる。
+def calendar_fingerprint(on_off_map: dict[DateTime, bool]) -> str:
+  h = hashlib.sha256()
+  for d in sorted(on_off_map):
+    h.update(f"{d.format('YYYY-MM-DD')}:{int(on_off_map[d])};".encode())
+  return h.hexdigest()
+
+
+class Team:
+  __slots__ = (
+    "index",
+    "name",
+    "path",
+    "baseline",
+    "members",
+    "on_off_map",
+    "breaks",
+    "fingerprint",
+    "order",
+  )
+
+  def __init__(
+    self,
+    index: int,
+    name: str,
+    path: str,
+    baseline: str,
+    members: MemberSet,
+    on_off_map: dict[DateTime, bool],
+    breaks: TimeRangeSet,
+    fingerprint: str,
+  ):
+    self.index = index
+    self.name = name
+    self.path = path
+    self.baseline = baseline
+    self.members = members
+    self.on_off_map = on_off_map
+    self.breaks = breaks
+    self.fingerprint = fingerprint
+    # 担当者名 -> 担当者の順番
+    self.order = {name: i for i, name in enumerate(members.names())}
+
+
+# 複数チームのタスクを1つのTaskSetにまとめる。タスク名はチーム名/タスク名。
+# 同じカレンダーの休みは一度だけ作って共有し、チームの中で同じ内容の行は
+# 最初の1行だけを残す。同じひな形から作ったチームの行は別のタスクとして残す。
+class Portfolio:
+  __slots__ = ("teams", "tasks", "duplicates", "_calendars", "_seen", "_assigned")
+
+  def __init__(self):
+    self.teams = []
+    self.tasks = TaskSet()
+    self.duplicates = 0
+    # カレンダーの指紋 -> 休み
+    self._calendars = {}
+    self._seen = set()
+    # ガントチャート用。(予定開始日時, チーム, 担当者の順番, 順番, タスク)
+    self._assigned = []
+
+  def add_team(
+    self,
+    path: str,
+    baseline: str,
+    name: str,
+    members: MemberSet,
+    on_off_map: dict[DateTime, bool],
+    make_breaks: Callable[[dict[DateTime, bool]], TimeRangeSet],
+  ) -> Team:
+    names = {t.name for t in self.teams}
+    key = name
+    i = 1
+    while key in names:
+      i += 1
+      key = f"{name}-{i}"
+    fingerprint = calendar_fingerprint(on_off_map)
+    breaks = self._calendars.get(fingerprint)
+    if breaks is None:
+      breaks = self._calendars[fingerprint] = make_breaks(on_off_map)
+    team = Team(
+      len(self.teams),
+      key,
+      path,
+      baseline,
+      members,
+      on_off_map,
+      breaks,
+      fingerprint,
+    )
+    self.teams.append(team)
+    return team
+
+  def calendars(self) -> int:
+    return len(self._calendars)
+
+  # タスク名はteam.name/で始まっていること。重複した行ならFalseを返す。
+  def add(self, team: Team, task: Task, task_members: MemberSet) -> bool:
+    # 同じチームの行を、行番号を除いた内容で比べる。
+    names = tuple(sorted(m.name for m in task_members))
+    key = (
+      team.index,
+      task.name[len(team.name) + 1 :].rpartition("-line")[0],
+      task.progress,
+      task.plan_start,
+      task.plan_end,
+      task.actual_start,
+      task.actual_end,
+      names,
+    )
+    if key in self._seen:
+      self.duplicates += 1
+      return False
+    self._seen.add(key)
+    self.tasks.add(task)
+    if task_members:
+      self._assigned.append(
+        (
+          task.plan_start,
+          team.index,
+          min(team.order[name] for name in names),
+          len(self._assigned),
+          task,
+        )
+      )
+    return True
+
+  def team_tasks(self, team: Team) -> TaskSet:
+    prefix = f"{team.name}/"
+    return self.tasks.filter(lambda t: t.name.startswith(prefix))
+
+  # 担当者のいるタスクを予定開始日時、チーム、担当者の順に並べる。
+  def gantt_tasks(self) -> list[Task]:
+    return [e[4] for e in sorted(self._assigned, key=lambda e: e[:4])]
+
+
+# end of file
@@ -31,8 +31,15 @@ import sys
 
 sys.path.insert(0, os.path.dirname(__file__))
 
+import argparse
+import io
 import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
 from datetime import datetime as datetime_sucks
+from fnmatch import fnmatchcase
+from functools import lru_cache, partial
+from typing import Iterable, Iterator
 
 import plotly.figure_factory as ff
 from openpyxl import load_workbook
@@ -49,10 +56,50 @@ from pendulum import (
   parse as penparse,
 )
 
+from assign import Assigner
+from availability import Availability
+from cache import (
+  CachedFigure,
+  FigureCache,
+  WorkingTimeMemo,
+  floor_time,
+  gantt_key,
+)
+from diff import TaskChange, WorkbookDiff, diff_tasks
+from export import task_rows, write_tasks, write_workbook
+from forecast import QUANTILES, Forecast, Forecaster, RiskModel, RiskResult
 from member import Member, MemberSet
+from metrics import Metrics, write_textfile
+from portfolio import Portfolio
+from server import PLOTLYJS_PATH, ReportServer
+from sheet import (
+  SCHEMA_PATH,
+  CsvSheet,
+  RowExtractor,
+  Sheet,
+  TaskSchema,
+  load_schema,
+  read_xlsx,
+  read_xlsx_sheets,
+)
 from task import Task, TaskSet
-from timerange import TimeRange, TimeRangeSet
-from util.text import TERM_NORM, TERM_RED, wljustify
+from timerange import TimeRange, TimeRangeSet, WorkingCalendar
+from util.text import TERM_NORM, TERM_RED, wlen, wljustify
+from validate import (
+  INFO,
+  WARNING,
+  Diagnostic,
+  TaskRow,
+  print_diagnostics,
+  validate_tasks,
+)
+from validate.diagnostic import (
+  NO_ASSIGNEE,
+  OVERLAP,
+  PLAN_END_MISSING,
+  UNKNOWN_MEMBER,
+)
+from workload import BUCKETS, LoadHistogram, Workload, load_heatmap
 
 if os.name == "nt":
   subprocess.run("c:/Windows/System32/mode.com con cp select=65001", shell=True)
@@ -65,6 +112,8 @@ excel_epoch = datetime(1899, 12, 30, tz=tz_default)
 set_local_timezone(tz_default)
 
 
+# 同じセル値は同じDateTimeを共有する(DateTimeは不変)。
+@lru_cache(maxsize=4096, typed=True)
 def to_datetime(val):
   if val is None:
     return val
@@ -91,15 +140,31 @@ def to_datetime(val):
 
 
 # O例以降で同じ日時が縦に並んでいる場所の(i+1行j列)を返す
+# 最も左の列、同じ列なら最も上を返す。最終行は対象外。
 def find_double_datetime(ws) -> tuple[int, int]:
-  rows = list(ws.iter_rows())
-  # O列 14(0base)
-  for j in range(15 - 1, len(rows[0])):
-    for i in range(len(rows) - 2):
-      c = to_datetime(rows[i][j].value)
-      if isinstance(c, DateTime) and c == to_datetime(rows[i + 1][j].value):
-        return i + 2, j + 1  # 1base
-  return None, None
+  rows = ws.iter_rows(values_only=True)
+  prev = next(rows, None)
+  if prev is None:
+    return None, None
+  width = len(prev)
+  found = None
+  pending = None
+  for i, row in enumerate(rows):
+    if pending is not None and (found is None or pending[1] < found[1]):
+      found = pending
+    if found is not None and found[1] == 15 - 1:
+      break
+    pending = None
+    # O列 14(0base)
+    for j in range(15 - 1, width if found is None else found[1]):
+      c = to_datetime(prev[j])
+      if isinstance(c, DateTime) and c == to_datetime(row[j]):
+        pending = i, j
+        break
+    prev = row
+  if found is None:
+    return None, None
+  return found[0] + 2, found[1] + 1  # 1base
 
 
 def make_breaks(on_off_map: dict[DateTime, bool]):
@@ -128,24 +193,27 @@ def make_breaks(on_off_map: dict[DateTime, bool]):
   return breaks
 
 
-def load_members(ws) -> tuple[str, str, MemberSet, dict[DateTime, bool]]:
-  labels = [cell.value for cell in ws[1]]
-  label_to_col = {label: i for i, label in enumerate(labels, start=1) if label}
+def load_members(
+  ws, schema: TaskSchema = None
+) -> tuple[str, str, MemberSet, dict[DateTime, bool]]:
+  schema = schema or load_schema()
+  labels = next(ws.iter_rows(min_row=1, max_row=1, values_only=True))
+  label_to_col = {label: i for i, label in enumerate(labels) if label}
 
   errors = []
-  baseline = ws.cell(row=2, column=label_to_col["ベースライン"]).value
-  team = ws.cell(row=2, column=label_to_col["チーム名"]).value
+  names, roles = ws.iter_rows(min_row=2, max_row=3, values_only=True)
+  baseline_label = schema.header["baseline"]
+  team_label = schema.header["team"]
+  baseline = names[label_to_col[baseline_label]]
+  team = names[label_to_col[team_label]]
 
   members = MemberSet()
-  rows = list(ws.iter_rows(min_row=2, max_row=3))
-  names = rows[0]
-  roles = rows[1]
-  for i in range(1, 10):
-    col = label_to_col.get(f"担当者{i}")
+  for label in schema.member_labels():
+    col = label_to_col.get(label)
     if col is not None:
-      name = names[col - 1].value
+      name = names[col]
       if name is not None:
-        role = roles[col - 1].value or "プログラマ"
+        role = roles[col] or "プログラマ"
         members.add(Member(name=name, role=role))
 
   on_off_map = {}
@@ -153,137 +221,261 @@ def load_members(ws) -> tuple[str, str, MemberSet, dict[DateTime, bool]]:
   if j is None:
     errors.append("O列以降にカレンダーが見つかりませんでした。")
   else:
-    rows = list(ws.iter_rows())
-    i -= 1
+    dates, days = ws.iter_rows(min_row=i, max_row=i + 1, values_only=True)
     j -= 1
-    while j < len(rows[0]):
-      c = to_datetime(rows[i][j].value)
+    out = io.StringIO()
+    while j < len(dates):
+      c = to_datetime(dates[j])
       if not isinstance(c, DateTime):
         break
-      x = rows[i + 1][j].value
+      x = days[j]
       on_off_map[c.at(0)] = x in ["開", "月", "火", "水", "木", "金"] or (
         x not in ["祝", "休", "土", "日"] and c.day_of_week not in [SATURDAY, SUNDAY]
       )
       print(
-        f"{c.format('YYYY-MM-DD dddd'):<20}: {'開講' if on_off_map[c.at(0)] else '休講'}"
+        f"{c.format('YYYY-MM-DD dddd'):<20}: {'開講' if on_off_map[c.at(0)] else '休講'}",
+        file=out,
       )
       j += 1
+    sys.stdout.write(out.getvalue())
 
   if baseline is None:
-    errors.append("ベースラインの定義が見つかりません。しくしく...")
+    errors.append(f"{baseline_label}の定義が見つかりません。しくしく...")
   if team is None:
-    errors.append("チーム名の定義が見つかりません。しくしく...")
+    errors.append(f"{team_label}の定義が見つかりません。しくしく...")
   if 1 > len(members):
-    errors.append("担当者の定義が見当たりません。しくしく...")
+    errors.append(f"{schema.member_prefix}の定義が見当たりません。しくしく...")
   if len(errors) > 0:
     raise ValueError(errors)
 
   return baseline, team, members, on_off_map
 
 
-def load_tasks(
+# タスクの見出しの行を探して、行から値を取り出す方法を決める。
+def task_header(ws, schema: TaskSchema = None) -> RowExtractor:
+  schema = schema or load_schema()
+  name_label = schema.columns["name"]
+  for row in ws.iter_rows(min_row=5, values_only=True):
+    if name_label in row:
+      # 見出しは一度だけ解決し、行からはitemgetterでまとめて取り出す。
+      return schema.compile(list(row))
+  raise ValueError(f"'{name_label}'というセルが見つかりません。しくしく...")
+
+
+# 行ごとにタスクを作り、担当者の集計に加えながら(タスク, 担当者)を返す。
+# keepがFalseなら担当者はタスクを保持しない。detailsがFalseなら担当者の集計は
+# CSに出す一覧を持たず件数だけを数える。行はchunk_sizeずつまとめて
+# 検査し、見つかった問題はdiagnosticsに集めて最後に一度だけ出力する。
+# 警告があれば確認を求める。namespaceを指定するとタスク名の前に付ける。
+def iter_tasks(
   ws,
   members: MemberSet,
   now: DateTime,
   breaks: TimeRangeSet,
   on_off_map: dict[DateTime, bool],
-) -> TaskSet:
-  labels = None
-  for row in ws.iter_rows(min_row=5, values_only=True):
-    if "タスク" in row:
-      labels = list(row)
-      break
-  if labels is None:
-    raise ValueError("'タスク'というセルが見つかりません。しくしく...")
-  label_to_col = {label: i for i, label in enumerate(labels) if label}
-  # print(f"{label_to_col}")
-
-  if "進捗\n(%)" in label_to_col and "進捗(%)" not in label_to_col:
-    label_to_col["進捗(%)"] = label_to_col["進捗\n(%)"]
-  for label in [
-    "タスク",
-    "進捗(%)",
-    "予定開始日時",
-    "予定完了日時",
-    "実績開始日時",
-    "実績完了日時",
-    "担当者1",
-  ]:
-    if label not in label_to_col:
-      raise ValueError(f"{label}列が見つかりません。しくしく...")
-    # else:
-    #    print(f"{label}: 列{label_to_col[label]}")
+  interactive: bool = not IN_GOOGLE_COLAB,
+  keep: bool = True,
+  diagnostics: list[Diagnostic] = None,
+  chunk_size: int = 10000,
+  namespace: str = None,
+  schema: TaskSchema = None,
+  memo: WorkingTimeMemo = None,
+  details: bool = True,
+) -> Iterator[tuple[Task, MemberSet]]:
+  schema = schema or load_schema()
+  columns = schema.columns
+  extract = task_header(ws, schema)
+  fields = extract.fields
+  member_cols = extract.members
+  by_name = {m.name: m for m in members}
 
-  print(TERM_RED, end="")
-  taskset = TaskSet()
-  is_warned = False
+  diagnostics = [] if diagnostics is None else diagnostics
+  chunk = []
   for i, row in enumerate(
     ws.iter_rows(min_row=6, values_only=True),
     start=6,
   ):
-    task_name = row[label_to_col["タスク"]]
+    task_name, progress, plan_start, plan_end, actual_start, actual_end = fields(row)
     if task_name is None:
       continue
-    task_name += f"-line{i}"
-    plan_start = to_datetime(row[label_to_col["予定開始日時"]])
+    task_name = sys.intern(
+      f"{namespace}/{task_name}-line{i}" if namespace else f"{task_name}-line{i}"
+    )
+    plan_start = to_datetime(plan_start)
     if plan_start is None:
       continue
-    plan_end = to_datetime(row[label_to_col["予定完了日時"]])
+    plan_end = to_datetime(plan_end)
     if plan_end is None:
-      is_warned = True
-      print(f"{task_name}: 予定完了日時がありません。")
+      diagnostics.append(
+        Diagnostic(
+          i,
+          columns["plan_end"],
+          PLAN_END_MISSING,
+          f"{task_name}: {columns['plan_end']}がありません。",
+        )
+      )
       continue
     try:
-      progress = int(row[label_to_col["進捗(%)"]])
+      progress = int(progress)
     except (TypeError, ValueError):
       progress = None
-    actual_start = to_datetime(row[label_to_col["実績開始日時"]])
-    actual_end = to_datetime(row[label_to_col["実績完了日時"]])
     task_members = MemberSet()
-    for j in range(1, 10):
-      col = label_to_col.get(f"担当者{j}")
-      if col is not None:
-        name = row[col]
-        if name is not None:
-          m = members.find_by_name(name)
-          if m is not None:
-            task_members.add(m)
-          else:
-            print(f"{task_name}: 担当者{j}の{name}さんは定義されていません。")
+    for label, col in member_cols:
+      name = row[col]
+      if name is not None:
+        m = by_name.get(name)
+        if m is not None:
+          task_members.add(m)
+        else:
+          diagnostics.append(
+            Diagnostic(
+              i,
+              label,
+              UNKNOWN_MEMBER,
+              f"{task_name}: {label}の{name}さんは定義されていません。",
+              level=INFO,
+            )
+          )
     if len(task_members) < 1:
-      is_warned = True
-      print(f"{task_name}: 恐ろしいことに誰も担当していません。")
+      diagnostics.append(
+        Diagnostic(
+          i,
+          member_cols[0][0],
+          NO_ASSIGNEE,
+          f"{task_name}: 恐ろしいことに誰も担当していません。",
+        )
+      )
+    chunk.append(
+      TaskRow(
+        i,
+        task_name,
+        progress,
+        plan_start,
+        plan_end,
+        to_datetime(actual_start),
+        to_datetime(actual_end),
+        task_members,
+      )
+    )
+    if len(chunk) >= chunk_size:
+      yield from _build_tasks(
+        chunk, now, breaks, on_off_map, keep, diagnostics, memo, columns, details
+      )
+      chunk = []
+  yield from _build_tasks(
+    chunk, now, breaks, on_off_map, keep, diagnostics, memo, columns, details
+  )
+  print_diagnostics(diagnostics)
+  if interactive and any(d.level == WARNING for d in diagnostics):
+    print("\n確認したらenterを押してください。")
+    input()
+
+
+def _build_tasks(
+  rows: list[TaskRow],
+  now: DateTime,
+  breaks: TimeRangeSet,
+  on_off_map: dict[DateTime, bool],
+  keep: bool,
+  diagnostics: list[Diagnostic],
+  memo: WorkingTimeMemo = None,
+  columns: dict[str, str] = None,
+  details: bool = True,
+) -> Iterator[tuple[Task, MemberSet]]:
+  columns = columns or load_schema().columns
+  validate_tasks(rows, now, on_off_map, diagnostics, columns)
+  for r in rows:
     task = Task(
-      task_name,
-      progress,
-      plan_start,
-      plan_end,
-      actual_start,
-      actual_end,
+      r.name,
+      r.progress,
+      r.plan_start,
+      r.plan_end,
+      r.actual_start,
+      r.actual_end,
       now,
       breaks,
-      on_off_map,
+      r.was_warned,
+      memo,
     )
-    if task.was_warned:
-      is_warned = True
+    for m in r.members:
+      for other in m.add_task(task, keep, details):
+        diagnostics.append(
+          Diagnostic(
+            r.row,
+            columns["plan_start"],
+            OVERLAP,
+            f"{m.name}さんのタスク「{task.name}」はタスク「{other}」と重なっています。"
+            + "タスクを分割するなどして修正してください。",
+          )
+        )
+    yield task, r.members
+
+
+def load_tasks(
+  ws,
+  members: MemberSet,
+  now: DateTime,
+  breaks: TimeRangeSet,
+  on_off_map: dict[DateTime, bool],
+  interactive: bool = not IN_GOOGLE_COLAB,
+) -> TaskSet:
+  taskset = TaskSet()
+  for task, _ in iter_tasks(ws, members, now, breaks, on_off_map, interactive):
     taskset.add(task)
-    for m in task_members:
-      m.add_task(task)
-      if m.was_warned:
-        is_warned = True
-  print(TERM_NORM, end="")
-  if is_warned and not IN_GOOGLE_COLAB:
-    print("\n確認したらenterを押してください。")
-    input()
   return taskset
 
 
+# 複数の進捗管理表を読んでチームごとにタスクをまとめる。
+def load_portfolio(
+  xlsxs: list[str],
+  nowt: DateTime,
+  lean: bool = False,
+  interactive: bool = not IN_GOOGLE_COLAB,
+  schema: TaskSchema = None,
+) -> Portfolio:
+  portfolio = Portfolio()
+  for xlsx in xlsxs:
+    ws = load_sheet(xlsx, lean, schema)
+    baseline, name, members, on_off_map = load_members(ws, schema)
+    print_team(baseline, name, members)
+    team = portfolio.add_team(xlsx, baseline, name, members, on_off_map, make_breaks)
+    for task, task_members in iter_tasks(
+      ws,
+      members,
+      nowt,
+      team.breaks,
+      on_off_map,
+      interactive,
+      keep=False,
+      namespace=team.name,
+      schema=schema,
+      details=False,
+    ):
+      portfolio.add(team, task, task_members)
+  return portfolio
+
+
+# ガントチャート用に担当者のいるタスクを集める。並びは担当者ごとのタスクを
+# つないでから予定開始日時で安定ソートしたものと同じ。
+def gantt_tasks(
+  tasks: Iterable[tuple[Task, MemberSet]], members: MemberSet
+) -> list[Task]:
+  order = {m.name: i for i, m in enumerate(members)}
+  rc = []
+  for seq, (task, task_members) in enumerate(tasks):
+    if task_members:
+      rc.append((task.plan_start, min(order[m.name] for m in task_members), seq, task))
+  rc.sort(key=lambda e: e[:3])
+  return [e[3] for e in rc]
+
+
 def print_progress_details(
   planned_total_seconds,
   planned_done_seconds,
   actual_total_seconds,
   actual_done_seconds,
   note="",
+  out=None,
 ) -> float:
   planned_progress = 100 * planned_done_seconds / planned_total_seconds
   actual_progress = 100 * actual_done_seconds / actual_total_seconds
@@ -292,21 +484,30 @@ def print_progress_details(
   )
   print(
     f"予定進捗率{note}: {planned_progress:.2f}% "
-    f"({planned_done_seconds / 3600:.2f}hr/{planned_total_seconds / 3600:.2f}hr)"
+    f"({planned_done_seconds / 3600:.2f}hr/{planned_total_seconds / 3600:.2f}hr)",
+    file=out,
   )
   print(
     f"実績進捗率{note}: {actual_progress:.2f}% "
-    f"({actual_done_seconds / 3600:.2f}hr/{actual_total_seconds / 3600:.2f}hr)"
+    f"({actual_done_seconds / 3600:.2f}hr/{actual_total_seconds / 3600:.2f}hr)",
+    file=out,
   )
   print(
     f"実績/予定 {note}: "
     + (f"{100 * actual_per_planned:.2f}%" if actual_per_planned is not None else "N/A")
-    + f" ({actual_progress:.2f}%/{planned_progress:.2f}%)"
+    + f" ({actual_progress:.2f}%/{planned_progress:.2f}%)",
+    file=out,
   )
   return actual_per_planned
 
 
-def gantt(trs: TaskSet, nowtt: DateTime, title: str):
+def gantt(
+  trs: TaskSet,
+  nowtt: DateTime,
+  title: str,
+  members: MemberSet = None,
+  breaks: TimeRangeSet = None,
+):
   colors = {
     "plan": "rgb(100,149,237)",  # 計画  : コーンフラワーブルー
     "done": "rgb(0,255,100)",  # 完了  : 緑
@@ -362,10 +563,14 @@ def gantt(trs: TaskSet, nowtt: DateTime, title: str):
     show_colorbar=True,
     group_tasks=True,
   )
+  if breaks is not None:
+    rangebreaks, days = gantt_rangebreaks(breaks, start, end)
+  else:
+    rangebreaks, days = [], None
   fig.update_layout(
     title=f"{title}",
     height=40 * len(df),
-    width=(end - start).in_days() * 150,
+    width=(len(days) if days else (end - start).in_days()) * 150,
     plot_bgcolor="black",
     paper_bgcolor="black",
     font=dict(color="white"),
@@ -408,13 +613,16 @@ def gantt(trs: TaskSet, nowtt: DateTime, title: str):
   fig.update_xaxes(
     showgrid=True,
     gridwidth=1,
-    dtick="D1",
     side="top" if nowtt - start < end - nowtt else "bottom",
     tickformat="%Y-%m-%d",
     gridcolor="gray",
     tickfont=dict(color="white"),
     title_font=dict(color="white"),
   )
+  if days:
+    fig.update_xaxes(rangebreaks=rangebreaks, tickvals=days)
+  else:
+    fig.update_xaxes(dtick="D1")
   fig.update_yaxes(
     showgrid=True,
     gridwidth=1,
@@ -422,24 +630,238 @@ def gantt(trs: TaskSet, nowtt: DateTime, title: str):
     tickfont=dict(color="white"),
     title_font=dict(color="white"),
   )
+  if members is not None and breaks is not None:
+    add_gantt_levels(
+      fig,
+      [
+        ("担当者別", gantt_member_rows(members, nowtt)),
+        ("週別", gantt_week_rows(trs, nowtt, breaks)),
+      ],
+      colors,
+      ((end - start).in_days() // 7 + 1) * 300,
+    )
   return fig
 
 
-def main(xlsx: str = None, nw: str = None):
-  if not IN_GOOGLE_COLAB:
-    if not xlsx and len(sys.argv) > 1:
-      xlsx = sys.argv[1]
-    if not nw and len(sys.argv) > 2:
-      nw = sys.argv[2]
-  if not xlsx:
-    xlsx = "進捗管理表.xlsx"
+# 予定と実績と現在時刻(切り捨て)が同じなら前回の図を読み込む。
+def cached_gantt(
+  cache: FigureCache | None,
+  trs: TaskSet,
+  nowtt: DateTime,
+  title: str,
+  members: MemberSet = None,
+  breaks: TimeRangeSet = None,
+):
+  if cache is None:
+    return gantt(trs, nowtt, title, members, breaks)
+  nowtt = floor_time(nowtt)
+  key = gantt_key(trs, nowtt, title, members, breaks)
+  text = cache.get(key)
+  if text is not None:
+    return CachedFigure(text)
+  fig = gantt(trs, nowtt, title, members, breaks)
+  cache.put(key, fig.to_json())
+  return fig
 
-  print(f"xlsx:{xlsx}, nw:{nw}{', Google Colab' if IN_GOOGLE_COLAB else ''}")
-  nowt = penparse(nw, tz=tz_default) if nw else now(tz_default)
+
+# 横軸から休み(夜、昼休み、休日)を除く。plotlyのrangebreaksは同じ長さの休みを
+# まとめて指定できるので長さごとにまとめる。日付をまたぐ休みの終わりを
+# 稼働日の始まりとして目盛にする。日時のタイムゾーンはplotlyでは無視される
+# ので、タスクと同じisoformatで渡す。
+def gantt_rangebreaks(
+  breaks: TimeRangeSet, start: DateTime, end: DateTime
+) -> tuple[list[dict], list[str]]:
+  gaps = {}
+  days = []
+  for r in breaks:
+    if r.end < start or end < r.start:
+      continue
+    dvalue = round((r.end.timestamp() - r.start.timestamp()) * 1000)
+    gaps.setdefault(dvalue, []).append(r.start.isoformat())
+    if r.start.date() != r.end.date() and r.end <= end:
+      days.append(r.end.isoformat())
+  return [dict(values=v, dvalue=d) for d, v in gaps.items()], days
+
+
+# 担当者ごとに予定と実績の範囲をまとめた行。工数はホバーで表示する。
+def gantt_member_rows(members: MemberSet, nowtt: DateTime) -> list[dict]:
+  df = []
+  for m in members:
+    s = m.summary
+    if not s.count:
+      continue
+    df.append(
+      dict(
+        Task=f"{m.name}(予定)",
+        Start=s.plan_start.isoformat(),
+        Finish=s.plan_end.isoformat(),
+        Resource="plan" if s.started else "unstarted",
+        Description=f"予定工数: {s.planned_total_seconds / 3600:.2f}hr",
+      )
+    )
+    if s.started:
+      finish = max(s.actual_end, nowtt) if s.actual_end else nowtt
+      df.append(
+        dict(
+          Task=m.name,
+          Start=s.actual_start.isoformat(),
+          Finish=(finish if s.running else s.actual_end).isoformat(),
+          Resource="in progress" if s.running else "done",
+          Description=f"実績工数: {s.actual_done_seconds / 3600:.2f}hr"
+          + f" (見込み: {s.actual_total_seconds / 3600:.2f}hr)",
+        )
+      )
+  return df
+
+
+# 週(月曜始まり)ごとに予定と実績の範囲と稼働時間をまとめた行。
+def gantt_week_rows(trs: TaskSet, nowtt: DateTime, breaks: TimeRangeSet) -> list[dict]:
+  weeks = {}
+  for t in trs:
+    spans = [
+      ("plan", t.plan_start, t.plan_end, "plan" if t.actual_start else "unstarted")
+    ]
+    if t.actual_start:
+      spans.append(
+        (
+          "actual",
+          t.actual_start,
+          t.actual_end or nowtt,
+          "done" if t.actual_end else "in progress",
+        )
+      )
+    for kind, start, end, resource in spans:
+      week = start.start_of("week")
+      while week < end:
+        week_end = week.add(weeks=1)
+        a = max(start, week)
+        b = min(end, week_end)
+        if a < b:
+          seconds = (
+            (TimeRangeSet([TimeRange(a, b)]) - breaks).total_duration().in_seconds()
+          )
+          w = weeks.get((week, kind))
+          if w is None:
+            weeks[(week, kind)] = dict(
+              start=a, end=b, seconds=seconds, resource=resource
+            )
+          else:
+            w["start"] = min(w["start"], a)
+            w["end"] = max(w["end"], b)
+            w["seconds"] += seconds
+            if resource in ("unstarted", "in progress"):
+              w["resource"] = resource
+        week = week_end
+  df = []
+  for week, kind in sorted(weeks, key=lambda k: (k[0], k[1] != "plan")):
+    w = weeks[(week, kind)]
+    df.append(
+      dict(
+        Task=f"{week.format('YYYY-MM-DD')}週" + ("(予定)" if kind == "plan" else ""),
+        Start=w["start"].isoformat(),
+        Finish=w["end"].isoformat(),
+        Resource=w["resource"],
+        Description=("予定" if kind == "plan" else "実績")
+        + f": {w['seconds'] / 3600:.2f}hr",
+      )
+    )
+  return df
+
+
+# 粒度の粗い行を同じ図に非表示で加え、ボタンで切り替える。
+# ブラウザ側では表示するトレースと縦軸、図の大きさを入れ替えるだけ。
+def add_gantt_levels(
+  fig, levels: list[tuple[str, list[dict]]], colors: dict, width: int
+):
+  views = [
+    ("タスク別", len(fig.data), fig.layout.height, fig.layout.width, fig.layout.yaxis)
+  ]
+  for label, df in levels:
+    if not df:
+      continue
+    level = ff.create_gantt(
+      df,
+      index_col="Resource",
+      colors=colors,
+      show_colorbar=True,
+      group_tasks=True,
+    )
+    for trace in level.data:
+      fig.add_trace(trace.update(visible=False))
+    views.append(
+      (label, len(level.data), max(40 * len(df), 400), width, level.layout.yaxis)
+    )
+  buttons = []
+  first = 0
+  for label, n, height, w, yaxis in views:
+    buttons.append(
+      dict(
+        label=label,
+        method="update",
+        args=[
+          {"visible": [first <= i < first + n for i in range(len(fig.data))]},
+          {
+            "height": height,
+            "width": w,
+            "yaxis.tickvals": list(yaxis.tickvals),
+            "yaxis.ticktext": list(yaxis.ticktext),
+            "yaxis.range": list(yaxis.range),
+          },
+        ],
+      )
+    )
+    first += n
+  fig.update_layout(
+    updatemenus=[
+      dict(
+        type="buttons",
+        direction="right",
+        x=1,
+        xanchor="right",
+        y=1.02,
+        yanchor="bottom",
+        buttons=buttons,
+      )
+    ]
+  )
+
+
+def load_sheet(
+  xlsx: str, lean: bool = False, schema: TaskSchema = None
+) -> Sheet | CsvSheet:
+  if os.path.splitext(xlsx)[1].lower() in (".csv", ".tsv"):
+    return CsvSheet(xlsx)
+  if lean:
+    ws = read_xlsx(xlsx, schema)
+    if ws is not None:
+      return ws
+    print(f"{xlsx}: openpyxlで読み直します。")
+  wb = load_workbook(xlsx, read_only=True, data_only=True)
+  try:
+    return Sheet.from_worksheet(wb.active)
+  finally:
+    wb.close()
+
+
+# 名前がpatternに合うワークシートをすべて読む。
+def load_sheets(
+  xlsx: str, pattern: str = "*", lean: bool = False, schema: TaskSchema = None
+) -> list[Sheet]:
+  if lean:
+    sheets = read_xlsx_sheets(xlsx, pattern, schema)
+    if sheets is not None:
+      return sheets
+    print(f"{xlsx}: openpyxlで読み直します。")
   wb = load_workbook(xlsx, read_only=True, data_only=True)
+  try:
+    return [
+      Sheet.from_worksheet(ws) for ws in wb.worksheets if fnmatchcase(ws.title, pattern)
+    ]
+  finally:
+    wb.close()
 
-  ws = wb.active
-  baseline, team, members, on_off_map = load_members(ws)
+
+def print_team(baseline: str, team: str, members: MemberSet):
   print("-" * 50)
   print(f"基準: {baseline}")
   print(f"チーム名: {team}")
@@ -449,88 +871,95 @@ def main(xlsx: str = None, nw: str = None):
     print(f"役割: {m.role}")
   print("-" * 50)
 
-  breaks = make_breaks(on_off_map)
-  load_tasks(ws, members, nowt, breaks, on_off_map)
-  # for task in tasks:
-  #     print("-" * 50)
-  #     print(f"タスク: {task.name}")
-  #     print(f"進捗: {task.progress}%")
-  #     print(f"予定: {task.plan_start} - {task.plan_end}")
-  #     print(f"実績: {task.actual_start} - {task.actual_end}")
 
-  team_tasks = TaskSet()
+def total_team_durations(members: MemberSet) -> tuple:
   team_planned_total_seconds = 0
   team_planned_done_seconds = 0
   team_actual_total_seconds = 0
   team_actual_done_seconds = 0
   for m in members:
-    team_tasks.add_tasks(m.tasks)
     (
       planned_total_seconds,
       planned_done_seconds,
       actual_total_seconds,
       actual_done_seconds,
-    ) = m.tasks.total_durations()
+    ) = m.summary.total_durations()
     team_planned_total_seconds += planned_total_seconds
     team_planned_done_seconds += planned_done_seconds
     team_actual_total_seconds += actual_total_seconds
     team_actual_done_seconds += actual_done_seconds
+  return (
+    team_planned_total_seconds,
+    team_planned_done_seconds,
+    team_actual_total_seconds,
+    team_actual_done_seconds,
+  )
 
+
+# 各担当者のCSを出力し、ガントチャートの基準時刻を返す。
+# 担当者ごとにバッファに書いてからまとめて出力する。
+def print_cs(
+  baseline: str,
+  team: str,
+  members: MemberSet,
+  on_off_map: dict[DateTime, bool],
+  nowt: DateTime,
+  team_durations: tuple,
+  interactive: bool = not IN_GOOGLE_COLAB,
+) -> DateTime:
   is_team_shown = False
+  nowtt = nowt
   for m in members:
-    base_start, base_end = m.tasks.calc_base(nowt)
+    base_start, base_end = m.summary.calc_base(nowt)
     nowtt = max(base_start, nowt)
     now_days = 0
     period_days = 0
-    dt = m.tasks.period_start.at(0)
-    while dt < m.tasks.period_end.add(days=1).at(0):
+    dt = m.summary.period_start.at(0)
+    while dt < m.summary.period_end.add(days=1).at(0):
       if on_off_map[dt]:
         period_days += 1
         if dt <= base_start:
           now_days += 1
       dt = dt.add(days=1)
-    print("=" * 80)
-    print(f"{m.name}さん CS(1)")
-    print("-" * 50)
-    print(f"チーム名  : {team}")
-    assigned_tasks = m.tasks.filter(lambda t: t.is_responsible(base_start))
+    out = io.StringIO()
+    print("=" * 80, file=out)
+    print(f"{m.name}さん CS(1)", file=out)
+    print("-" * 50, file=out)
+    print(f"チーム名  : {team}", file=out)
+    assigned_tasks = m.summary.responsible()
     print(
-      f"担当タスク: {', '.join(assigned_tasks.names()) if assigned_tasks else 'ありません。まじか、しくしく...'}"
+      f"担当タスク: {', '.join(assigned_tasks) if assigned_tasks else 'ありません。まじか、しくしく...'}",
+      file=out,
     )
-    print(f"役割      : {m.role}")
-    print("-" * 50)
-    print(f"{m.name}さん CS(2)")
-    print("-" * 50)
-    print(f"ベースライン: {baseline}")
+    print(f"役割      : {m.role}", file=out)
+    print("-" * 50, file=out)
+    print(f"{m.name}さん CS(2)", file=out)
+    print("-" * 50, file=out)
+    print(f"ベースライン: {baseline}", file=out)
     print(
       f"行程      : {100 * now_days / period_days:.2f}% ({now_days}日/{period_days}日 "
       + f"{nowt.format('YYYY-MM-DD HH:mmZ')}/"
-      + f"{m.tasks.period_start.format('YYYY-MM-DD HH:mmZ')}/"
-      + f"{m.tasks.period_end.format('YYYY-MM-DD HH:mmZ')})"
+      + f"{m.summary.period_start.format('YYYY-MM-DD HH:mmZ')}/"
+      + f"{m.summary.period_end.format('YYYY-MM-DD HH:mmZ')})",
+      file=out,
     )
 
     if m.role == "リーダー":
       is_team_shown = True
-      print("-" * 50)
-      print_progress_details(
-        team_planned_total_seconds,
-        team_planned_done_seconds,
-        team_actual_total_seconds,
-        team_actual_done_seconds,
-        "(チーム)",
-      )
-      print("-" * 50)
+      print("-" * 50, file=out)
+      print_progress_details(*team_durations, "(チーム)", out)
+      print("-" * 50, file=out)
 
-    actual_per_planned = print_progress_details(*m.tasks.total_durations())
+    actual_per_planned = print_progress_details(*m.summary.total_durations(), out=out)
 
-    print("コメント  : " + TERM_RED, end="")
-    unstarted_tasks = m.tasks.filter(lambda t: t.is_unstarted(nowtt))
-    unfinished_tasks = m.tasks.filter(lambda t: t.is_unfinished(nowtt))
-    overrun_tasks = m.tasks.filter(lambda t: t.is_overrun(nowtt))
+    print("コメント  : " + TERM_RED, end="", file=out)
+    unstarted_tasks = m.summary.unstarted
+    unfinished_tasks = m.summary.unfinished
+    overrun_tasks = m.summary.overrun
     if unstarted_tasks or unfinished_tasks or overrun_tasks:
-      print("")
+      print("", file=out)
     if unstarted_tasks:
-      print("☆ タスクが開始されていません:")
+      print("☆ タスクが開始されていません:", file=out)
       print(
         "   "
         + "\n   ".join(
@@ -538,10 +967,11 @@ def main(xlsx: str = None, nw: str = None):
           + f" 予定開始日時: {t.plan_start.format('YYYY-MM-DD HH:mmZ')}"
           + f" <= {nowtt.format('YYYY-MM-DD HH:mmZ')}"
           for t in unstarted_tasks
-        )
+        ),
+        file=out,
       )
     if unfinished_tasks:
-      print("☆ タスクが完了していません:")
+      print("☆ タスクが完了していません:", file=out)
       print(
         "   "
         + "\n   ".join(
@@ -549,10 +979,11 @@ def main(xlsx: str = None, nw: str = None):
           + f" 予定終了日時: {t.plan_end.format('YYYY-MM-DD HH:mmZ')}"
           + f" <= {nowtt.format('YYYY-MM-DD HH:mmZ')}"
           for t in unfinished_tasks
-        )
+        ),
+        file=out,
       )
     if overrun_tasks:
-      print("☆ 工数が超過しています:")
+      print("☆ 工数が超過しています:", file=out)
       print(
         "   "
         + "\n   ".join(
@@ -561,7 +992,8 @@ def main(xlsx: str = None, nw: str = None):
           + f" ({nowt.format('YYYY-MM-DD HH:mmZ')} / {t.actual_start.format('YYYY-MM-DD HH:mmZ')})"
           + f" 予定工数: {(t.plan_end - t.plan_start).in_minutes() / 60:.2f}hr"
           for t in overrun_tasks
-        )
+        ),
+        file=out,
       )
     print(
       TERM_NORM
@@ -573,28 +1005,825 @@ def main(xlsx: str = None, nw: str = None):
         else "順調です。"
         if actual_per_planned < 120
         else "順調すぎて怖いです。"
-      )
+      ),
+      file=out,
     )
-    if not IN_GOOGLE_COLAB:
+    sys.stdout.write(out.getvalue())
+    sys.stdout.flush()
+    if interactive:
       print("\n確認したらenterを押してください。")
       input()
 
   if not is_team_shown:
+    out = io.StringIO()
+    print("=" * 80, file=out)
+    print_progress_details(*team_durations, "(チーム)", out)
+    sys.stdout.write(out.getvalue())
+  return nowtt
+
+
+def gantt_title(baseline: str, xlsx: str, kind: str = "gantt chart") -> str:
+  return f"{baseline}: {xlsx} - {kind} - Copyright (c) 2025 Fumiyuki Shimizu"
+
+
+# 稼働時間を超える予定がある担当者と時間帯を出力する。
+def print_overloads(hist: LoadHistogram):
+  print("=" * 80)
+  overloads = hist.overloads()
+  if not overloads:
+    print("稼働時間を超える予定はありません。")
+    return
+  fmt = "%Y-%m-%d %H:%M" if hist.step < 86400 else "%Y-%m-%d"
+  width = max(wlen(f"{name}さん") for name, *_ in overloads)
+  print(TERM_RED + "☆ 稼働時間を超える予定があります:")
+  print(
+    "   "
+    + "\n   ".join(
+      wljustify(f"{name}さん", width)
+      + f" {start.strftime(fmt)} 予定: {load / 3600:.2f}hr"
+      + f" / 稼働: {capacity / 3600:.2f}hr"
+      for name, start, load, capacity in overloads
+    )
+    + TERM_NORM
+  )
+
+
+# 全員が空いているhours時間の稼働時間を探して出力する。
+def print_slots(
+  availability: Availability,
+  names: list[str],
+  hours: float,
+  nowt: DateTime,
+  all_slots: bool = False,
+):
+  fmt = "YYYY-MM-DD HH:mmZ"
+  print("=" * 80)
+  unknown = [name for name in names if name not in availability.names]
+  if unknown:
+    print(f"{TERM_RED}担当者{'、'.join(unknown)}はいません。{TERM_NORM}")
+    return
+  who = "、".join(f"{name}さん" for name in names)
+  seconds = hours * 3600
+  if not all_slots:
+    slot = availability.earliest(names, seconds, nowt)
+    if slot is None:
+      print(f"{who}が{hours:g}時間空いている稼働時間はカレンダーにありません。")
+      return
+    print(f"{who}が{hours:g}時間空く最初の稼働時間:")
+    print(f"   {slot.start.format(fmt)} - {slot.end.format(fmt)}")
+    return
+  slots = availability.slots(names, seconds, nowt)
+  if not slots:
+    print(f"{who}が{hours:g}時間空いている稼働時間はカレンダーにありません。")
+    return
+  calendar = availability.calendar
+  print(f"{who}が{hours:g}時間以上空いている期間:")
+  print(
+    "   "
+    + "\n   ".join(
+      f"{s.start.format(fmt)} - {s.end.format(fmt)}"
+      + f" 稼働: {calendar.working_seconds(s.start, s.end) / 3600:.2f}hr"
+      for s in slots
+    )
+  )
+
+
+# 担当者のいないタスクへの提案と、担当者1の列に貼り付けられる値を出力する。
+# 提案のない行は今の値のままにする。
+def print_assignments(
+  suggestions: list[tuple[Task, str | None]], ws, schema: TaskSchema = None
+):
+  print("=" * 80)
+  if not suggestions:
+    print("担当者のいない未完了のタスクはありません。")
+    return
+  width = max(wlen(t.name) for t, _ in suggestions)
+  print("☆ 担当者の提案:")
+  print(
+    "   "
+    + "\n   ".join(
+      wljustify(t.name, width)
+      + (f" -> {name}さん" if name else f" -> {TERM_RED}候補がいません{TERM_NORM}")
+      for t, name in suggestions
+    )
+  )
+  rows = {int(t.name.rpartition("-line")[2]): name for t, name in suggestions if name}
+  if not rows:
+    return
+  label, col = task_header(ws, schema).members[0]
+  first = min(rows)
+  last = max(rows)
+  print(f"☆ {label}の{first}行目から{last}行目に貼り付け:")
+  for i, row in enumerate(
+    ws.iter_rows(min_row=first, max_row=last, values_only=True), start=first
+  ):
+    value = rows.get(i, row[col])
+    print("" if value is None else value)
+
+
+def print_tasks(label: str, tasks: TaskSet, line, out=None):
+  if tasks:
+    print(f"☆ {label}:", file=out)
+    print(
+      "   "
+      + "\n   ".join(
+        wljustify(t.name, tasks.max_len_of_names) + line(t) for t in tasks
+      ),
+      file=out,
+    )
+
+
+# チームごとと全体の進捗、チームをまたいだ遅れているタスクを出力する。
+def print_portfolio(portfolio: Portfolio, nowt: DateTime):
+  for team in portfolio.teams:
+    tasks = portfolio.team_tasks(team)
+    print("=" * 80)
+    print(f"チーム名  : {team.name} ({team.path})")
+    print(f"ベースライン: {team.baseline}")
+    print(f"タスク    : {len(tasks)}件")
+    if tasks:
+      print_progress_details(*tasks.total_durations(), "(チーム)")
+  print("=" * 80)
+  print(
+    f"チーム: {len(portfolio.teams)}, タスク: {len(portfolio.tasks)}件"
+    + f" (重複を除いた行: {portfolio.duplicates}),"
+    + f" カレンダー: {portfolio.calendars()}種類"
+  )
+  if not portfolio.tasks:
+    return
+  print_progress_details(*portfolio.tasks.total_durations(), "(全体)")
+  fmt = "YYYY-MM-DD HH:mmZ"
+  print(TERM_RED, end="")
+  print_tasks(
+    "タスクが開始されていません",
+    portfolio.tasks.unstarted(nowt),
+    lambda t: f" 予定開始日時: {t.plan_start.format(fmt)}",
+  )
+  print_tasks(
+    "タスクが完了していません",
+    portfolio.tasks.unfinished(nowt),
+    lambda t: f" 予定終了日時: {t.plan_end.format(fmt)}",
+  )
+  print_tasks(
+    "工数が超過しています",
+    portfolio.tasks.overrun(nowt),
+    lambda t: (
+      f" 実績工数: {(nowt - t.actual_start).in_minutes() / 60:.2f}hr"
+      + f" 予定工数: {(t.plan_end - t.plan_start).in_minutes() / 60:.2f}hr"
+    ),
+  )
+  print(TERM_NORM, end="")
+
+
+# 比較用に表を読む。読み込み中の出力は捨てる。
+def load_snapshot(
+  xlsx: str, nowt: DateTime, lean: bool = False, schema: TaskSchema = None
+) -> tuple[MemberSet, list[tuple[Task, MemberSet]]]:
+  with redirect_stdout(io.StringIO()):
+    ws = load_sheet(xlsx, lean, schema)
+    _, _, members, on_off_map = load_members(ws, schema)
+    tasks = list(
+      iter_tasks(
+        ws,
+        members,
+        nowt,
+        make_breaks(on_off_map),
+        on_off_map,
+        False,
+        keep=False,
+        schema=schema,
+        details=False,
+      )
+    )
+  return members, tasks
+
+
+def print_changes(label: str, changes: list[TaskChange], line):
+  if changes:
+    width = max(wlen(c.name) for c in changes)
+    print(f"☆ {label}:")
+    print("   " + "\n   ".join(wljustify(c.name, width) + line(c) for c in changes))
+
+
+# 2つの版の違いを出力する。
+def print_diff(d: WorkbookDiff):
+  fmt = "YYYY-MM-DD HH:mmZ"
+
+  def dt(t: DateTime | None) -> str:
+    return t.format(fmt) if t else "-"
+
+  def span(t: Task) -> str:
+    return f"{dt(t.plan_start)} - {dt(t.plan_end)}"
+
+  print("=" * 80)
+  if not d:
+    print("変更はありません。")
+    return
+  print_changes(
+    "追加されたタスク",
+    d.added,
+    lambda c: f" 予定: {span(c.new)} 担当: {', '.join(c.new_members) or '-'}",
+  )
+  print_changes(
+    "削除されたタスク",
+    d.removed,
+    lambda c: f" 予定: {span(c.old)} 担当: {', '.join(c.old_members) or '-'}",
+  )
+  print_changes(
+    "予定が変わったタスク",
+    d.rescheduled,
+    lambda c: f" 予定: {span(c.old)} -> {span(c.new)}",
+  )
+  print_changes(
+    "進捗が変わったタスク",
+    d.reprogressed,
+    lambda c: (
+      f" 進捗: {c.old.progress}% -> {c.new.progress}%"
+      + f" 実績: {dt(c.old.actual_start)} - {dt(c.old.actual_end)}"
+      + f" -> {dt(c.new.actual_start)} - {dt(c.new.actual_end)}"
+    ),
+  )
+  print_changes(
+    "担当者が変わったタスク",
+    d.reassigned,
+    lambda c: (
+      f" 担当: {', '.join(c.old_members) or '-'}"
+      + f" -> {', '.join(c.new_members) or '-'}"
+    ),
+  )
+  print("-" * 50)
+  width = max((wlen(f"{h.name}さん") for h in d.hours), default=0)
+  for h in d.hours:
+    print(
+      wljustify(f"{h.name}さん", width)
+      + f" 予定工数: {h.old_planned / 3600:.2f}hr -> {h.new_planned / 3600:.2f}hr"
+      + f" ({(h.new_planned - h.old_planned) / 3600:+.2f}hr)"
+      + f" 実績工数: {h.old_actual / 3600:.2f}hr -> {h.new_actual / 3600:.2f}hr"
+      + f" ({(h.new_actual - h.old_actual) / 3600:+.2f}hr)"
+    )
+
+
+# 完了していないタスク、担当者、チームの完了見込みを予定と比べて出力する。
+# 予定より遅れる見込みは赤。
+def print_forecast(forecaster: Forecaster, members: MemberSet):
+  fmt = "YYYY-MM-DD HH:mmZ"
+
+  def lines(forecasts: list[Forecast], label) -> str:
+    width = max(wlen(label(f)) for f in forecasts)
+    rc = []
+    for f in forecasts:
+      text = wljustify(label(f), width) + f" 予定完了日時: {f.plan_end.format(fmt)}"
+      if f.beyond:
+        rc.append(
+          TERM_RED
+          + text
+          + f" 見込み: カレンダーの範囲外 (残り{f.remaining / 3600:.2f}hr)"
+          + TERM_NORM
+        )
+        continue
+      delay = f.delay(forecaster.calendar)
+      text += f" 見込み: {f.finish.format(fmt)} ({delay / 3600:+.2f}hr)"
+      rc.append(TERM_RED + text + TERM_NORM if delay > 0 else text)
+    return "   " + "\n   ".join(rc)
+
+  print("=" * 80)
+  if forecaster.team.plan_end is None:
+    print("タスクがありません。")
+    return
+  if forecaster.tasks:
+    print("☆ タスクの完了見込み:")
+    print(lines(forecaster.tasks, lambda f: f.name))
+  forecasts = forecaster.member_forecasts(members)
+  if forecasts:
+    print("☆ 担当者の最後のタスクの完了見込み:")
+    print(lines(forecasts, lambda f: f"{f.name}さん"))
+  print("☆ チームの完了見込み:")
+  print(lines([forecaster.team_forecast(members)], lambda f: "チーム"))
+
+
+# 担当者とチームの完了日時の分位と、予定完了日時までに終わる割合を出力する。
+def print_risk(results: list[RiskResult], trials: int):
+  fmt = "YYYY-MM-DD HH:mmZ"
+  print("=" * 80)
+  if not results:
+    print("完了していないタスクはありません。")
+    return
+  width = max(wlen(f"{r.name}さん" if r.name else "チーム") for r in results)
+  print(f"☆ 完了日時の分布({trials}回):")
+  for r in results:
+    text = (
+      wljustify(f"{r.name}さん" if r.name else "チーム", width)
+      + f" 予定完了日時: {r.plan_end.format(fmt)}"
+      + "".join(
+        f" P{q}: {t.format(fmt) if t else 'カレンダーの範囲外'}"
+        for q, t in zip(QUANTILES, r.finishes)
+      )
+      + f" 予定までに完了: {100 * r.on_time:.1f}%"
+    )
+    print("   " + (TERM_RED + text + TERM_NORM if r.on_time < 0.8 else text))
+
+
+# サーバー用。printされる内容をそのままページにする。
+def render_pages(
+  ws, xlsx: str, nowt: DateTime, cache: FigureCache = None, schema: TaskSchema = None
+) -> dict[str, str | None]:
+  with redirect_stdout(io.StringIO()) as out:
+    baseline, team, members, on_off_map = load_members(ws, schema)
+    print_team(baseline, team, members)
+    breaks = make_breaks(on_off_map)
+    team_tasks = gantt_tasks(
+      iter_tasks(
+        ws, members, nowt, breaks, on_off_map, False, keep=False, schema=schema
+      ),
+      members,
+    )
+    team_durations = total_team_durations(members)
     print("=" * 80)
-    print_progress_details(
-      team_planned_total_seconds,
-      team_planned_done_seconds,
-      team_actual_total_seconds,
-      team_actual_done_seconds,
-      "(チーム)",
+    print_progress_details(*team_durations, "(チーム)")
+  summary = out.getvalue()
+  with redirect_stdout(io.StringIO()) as out:
+    nowtt = print_cs(
+      baseline,
+      team,
+      members,
+      on_off_map,
+      nowt,
+      team_durations,
+      interactive=False,
     )
+  cs = out.getvalue()
+  fig = (
+    cached_gantt(cache, team_tasks, nowtt, gantt_title(baseline, xlsx), members, breaks)
+    if team_tasks
+    else None
+  )
+  return dict(
+    summary=summary,
+    cs=cs,
+    gantt=fig.to_html(include_plotlyjs=PLOTLYJS_PATH) if fig else None,
+  )
+
+
+# argparseのtype。1以上の整数だけを受け付ける。
+def positive_int(value: str) -> int:
+  try:
+    n = int(value)
+  except ValueError:
+    n = 0
+  if n < 1:
+    raise argparse.ArgumentTypeError(f"1以上の整数を指定してください: {value}")
+  return n
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+  parser = argparse.ArgumentParser(prog="prj.py")
+  parser.add_argument("xlsx", nargs="?", help="進捗管理表(xlsx/csv/tsv)")
+  parser.add_argument("nw", nargs="?", help="基準日時 (例: 2026-01-16T13:00)")
+  parser.add_argument(
+    "--serve",
+    nargs="*",
+    metavar="XLSX",
+    help="localhostでレポートサーバーを起動する。xlsxと合わせて複数指定可",
+  )
+  parser.add_argument("--port", type=int, default=8765, help="サーバーのポート")
+  parser.add_argument(
+    "--lean",
+    action="store_true",
+    help="openpyxlを使わずに必要なセルだけを読む(読めない場合はopenpyxl)",
+  )
+  parser.add_argument(
+    "--schema",
+    metavar="PATH",
+    default=SCHEMA_PATH,
+    help="タスク表とシートの見出しの定義(既定は同梱のsheet/schema.json)",
+  )
+  parser.add_argument(
+    "--export",
+    metavar="PATH",
+    help="タスク表を書き出して終了する(.csv/.parquet/.arrow)",
+  )
+  parser.add_argument(
+    "--write",
+    metavar="XLSX",
+    help="タスクごとの工数・状態・警告、担当者の集計、ガントチャートをxlsxに書き出して終了する",
+  )
+  parser.add_argument(
+    "--load",
+    choices=sorted(BUCKETS),
+    help="担当者ごとの予定の負荷を時間帯ごとに集計し、稼働時間の超過とヒートマップを出す",
+  )
+  parser.add_argument(
+    "--diff",
+    metavar="OLD",
+    help="以前の進捗管理表と比べてタスクと工数の変更を出力する",
+  )
+  parser.add_argument(
+    "--portfolio",
+    nargs="*",
+    metavar="XLSX",
+    help="複数のチームの進捗管理表をまとめて集計する。xlsxと合わせて複数指定可",
+  )
+  parser.add_argument(
+    "--forecast",
+    action="store_true",
+    help="残りの工数を稼働時間に積んで、タスク・担当者・チームの完了見込みを出す",
+  )
+  parser.add_argument(
+    "--simulate",
+    nargs="?",
+    type=positive_int,
+    const=10000,
+    metavar="TRIALS",
+    help="工数をばらつかせて完了日時の分布(P50/P80/P95)を求める(既定は10000回)",
+  )
+  parser.add_argument(
+    "--workers",
+    type=positive_int,
+    default=1,
+    help="--simulateと--sheetsを並列に計算するプロセス数",
+  )
+  parser.add_argument(
+    "--sheets",
+    nargs="?",
+    const="*",
+    metavar="PATTERN",
+    help="名前がPATTERN(*や?が使える)に合うシートをすべて評価してまとめる(既定はすべて)",
+  )
+  parser.add_argument(
+    "--slot",
+    type=float,
+    metavar="HOURS",
+    help="担当者全員がHOURS時間空いている最初の稼働時間を探す",
+  )
+  parser.add_argument(
+    "--slot-members",
+    nargs="+",
+    metavar="NAME",
+    help="--slotで空きを探す担当者(既定は全員)",
+  )
+  parser.add_argument(
+    "--all-slots",
+    action="store_true",
+    help="--slotで最初の1つではなく、HOURS時間以上空いている期間をすべて出す",
+  )
+  parser.add_argument(
+    "--assign",
+    nargs="*",
+    metavar="ROLE",
+    help="担当者のいない未完了のタスクに、予定が重ならず空き時間の多い担当者を提案する。"
+    + "ROLEを指定するとその役割の担当者だけから選ぶ",
+  )
+  parser.add_argument(
+    "--metrics",
+    metavar="PATH",
+    help="実行後に進捗と件数、処理時間をPrometheusのtextfile形式で書き出す。"
+    + "--batchを含む",
+  )
+  parser.add_argument(
+    "--batch",
+    action="store_true",
+    help="警告やCSの後でenterを待たない",
+  )
+  parser.add_argument(
+    "--openmetrics",
+    action="store_true",
+    help="--metricsをOpenMetrics形式で書き出す",
+  )
+  parser.add_argument(
+    "--memo",
+    metavar="DIR",
+    help="予定と完了した実績の稼働時間をカレンダーごとにDIRに保存し、次から使う",
+  )
+  parser.add_argument(
+    "--gantt-cache",
+    metavar="DIR",
+    help="ガントチャートをDIRに保存し、予定と実績が変わらなければ作り直さずに使う",
+  )
+  parser.add_argument(
+    "--no-gantt",
+    action="store_true",
+    help="ガントチャートを作らない(タスクを保持せずに集計する)",
+  )
+  return parser.parse_args(argv)
+
+
+def serve(
+  workbooks: list[str],
+  nw: str = None,
+  port: int = 8765,
+  lean: bool = False,
+  cache: FigureCache = None,
+  schema: TaskSchema = None,
+):
+  nowt = penparse(nw, tz=tz_default) if nw else None
+  ReportServer(
+    workbooks,
+    lambda xlsx: load_sheet(xlsx, lean, schema),
+    partial(render_pages, cache=cache, schema=schema),
+    (lambda: nowt) if nowt else (lambda: now(tz_default).start_of("minute")),
+    port=port,
+  ).run()
+
 
+def portfolio_main(
+  xlsxs: list[str],
+  nw: str = None,
+  lean: bool = False,
+  show_gantt: bool = True,
+  cache: FigureCache = None,
+  schema: TaskSchema = None,
+):
+  print(f"xlsx:{', '.join(xlsxs)}, nw:{nw}")
+  nowt = penparse(nw, tz=tz_default) if nw else now(tz_default)
+  portfolio = load_portfolio(xlsxs, nowt, lean, schema=schema)
+  print_portfolio(portfolio, nowt)
+  team_tasks = portfolio.gantt_tasks() if show_gantt else None
   if team_tasks:
-    fig = gantt(
-      sorted(team_tasks, key=lambda t: t.plan_start),
-      nowtt,
-      f"{baseline}: {xlsx} - gantt chart - Copyright (c) 2025 Fumiyuki Shimizu",
+    cached_gantt(
+      cache, team_tasks, nowt, gantt_title("portfolio", ", ".join(xlsxs))
+    ).show()
+
+
+# 1枚のシートを評価して、出力とまとめに使う値を返す。別プロセスで動かすので
+# 出力は文字列で返す。
+def evaluate_sheet(
+  ws: Sheet, nowt: DateTime, schema: TaskSchema = None
+) -> tuple[str, str | None, dict[str, int], tuple | None, int]:
+  out = io.StringIO()
+  metrics = Metrics()
+  diagnostics = []
+  with redirect_stdout(out):
+    print("#" * 80)
+    print(f"シート: {ws.title}")
+    try:
+      baseline, team, members, on_off_map = load_members(ws, schema)
+    except KeyError as e:
+      print(f"{TERM_RED}{e}がありません。進捗管理表のシートではありません。{TERM_NORM}")
+      return out.getvalue(), None, metrics.counts, None, 0
+    except ValueError as e:
+      print(f"{TERM_RED}{e}{TERM_NORM}")
+      return out.getvalue(), None, metrics.counts, None, 0
+    print_team(baseline, team, members)
+    tasks = iter_tasks(
+      ws,
+      members,
+      nowt,
+      make_breaks(on_off_map),
+      on_off_map,
+      False,
+      keep=False,
+      diagnostics=diagnostics,
+      schema=schema,
+    )
+    for _ in metrics.feed(tasks, nowt):
+      pass
+    team_durations = total_team_durations(members)
+    print_cs(baseline, team, members, on_off_map, nowt, team_durations, False)
+  return out.getvalue(), team, metrics.counts, team_durations, len(diagnostics)
+
+
+def print_sheets_summary(ws: list[Sheet], results: list[tuple]):
+  print("=" * 80)
+  width = max(wlen(w.title) for w in ws)
+  for w, (_, team, counts, team_durations, warnings) in zip(ws, results):
+    if team_durations is None:
+      print(f"{wljustify(w.title, width)} : {TERM_RED}読めませんでした。{TERM_NORM}")
+      continue
+    print(
+      f"{wljustify(w.title, width)} : チーム名: {team}, タスク: {counts['total']}件"
+      + f" (未着手: {counts['unstarted']}, 未完了: {counts['unfinished']},"
+      + f" 超過: {counts['overrun']}), 警告: {warnings}件"
+    )
+  durations = [r[3] for r in results if r[3] is not None]
+  print("=" * 80)
+  print(f"シート: {len(ws)}枚, 読めたシート: {len(durations)}枚")
+  if durations:
+    print_progress_details(*map(sum, zip(*durations)), "(全体)")
+
+
+# ブックの中のシートをまとめて評価する。シートごとの出力を順に出してから
+# 全体をまとめる。redirect_stdoutはプロセス全体に効くのでスレッドではなく
+# プロセスで並列にする。
+def sheets_main(
+  xlsx: str,
+  pattern: str,
+  nw: str = None,
+  lean: bool = False,
+  workers: int = 1,
+  schema: TaskSchema = None,
+):
+  print(f"xlsx:{xlsx}, sheets:{pattern}, nw:{nw}")
+  nowt = penparse(nw, tz=tz_default) if nw else now(tz_default)
+  ws = load_sheets(xlsx, pattern, lean, schema)
+  if not ws:
+    print(f"{pattern}に合うシートがありません。")
+    return
+  if workers > 1 and len(ws) > 1:
+    with ProcessPoolExecutor(min(workers, len(ws))) as executor:
+      results = list(
+        executor.map(evaluate_sheet, ws, [nowt] * len(ws), [schema] * len(ws))
+      )
+  else:
+    results = [evaluate_sheet(w, nowt, schema) for w in ws]
+  for text, *_ in results:
+    print(text, end="")
+  print_sheets_summary(ws, results)
+
+
+def diff_main(
+  old: str, new: str, nw: str = None, lean: bool = False, schema: TaskSchema = None
+):
+  print(f"xlsx:{old} -> {new}, nw:{nw}")
+  nowt = penparse(nw, tz=tz_default) if nw else now(tz_default)
+  old_members, old_tasks = load_snapshot(old, nowt, lean, schema)
+  new_members, new_tasks = load_snapshot(new, nowt, lean, schema)
+  print_diff(diff_tasks(old_tasks, old_members, new_tasks, new_members))
+
+
+def main(xlsx: str = None, nw: str = None):
+  if not IN_GOOGLE_COLAB:
+    args = parse_args(sys.argv[1:])
+    cache = FigureCache(args.gantt_cache) if args.gantt_cache else None
+    schema = load_schema(args.schema)
+    if args.serve is not None:
+      return serve(
+        ([xlsx or args.xlsx] if xlsx or args.xlsx else []) + args.serve,
+        nw or args.nw,
+        args.port,
+        args.lean,
+        cache,
+        schema,
+      )
+    if args.portfolio is not None:
+      return portfolio_main(
+        ([xlsx or args.xlsx] if xlsx or args.xlsx else []) + args.portfolio,
+        nw or args.nw,
+        args.lean,
+        not args.no_gantt,
+        cache,
+        schema,
+      )
+    xlsx = xlsx or args.xlsx
+    nw = nw or args.nw
+    if args.sheets:
+      return sheets_main(
+        xlsx or "進捗管理表.xlsx", args.sheets, nw, args.lean, args.workers, schema
+      )
+    if args.diff:
+      return diff_main(args.diff, xlsx or "進捗管理表.xlsx", nw, args.lean, schema)
+    export = args.export
+    write = args.write
+    lean = args.lean
+    show_gantt = not args.no_gantt
+    load_bucket = args.load
+    metrics_path = args.metrics
+    openmetrics = args.openmetrics
+    show_forecast = args.forecast
+    trials = args.simulate
+    workers = args.workers
+    slot_hours = args.slot
+    slot_members = args.slot_members
+    all_slots = args.all_slots
+    assign_roles = args.assign
+    memo_dir = args.memo
+    interactive = not IN_GOOGLE_COLAB and not (args.batch or args.metrics)
+  else:
+    cache = None
+    schema = load_schema()
+    slot_hours = None
+    slot_members = None
+    all_slots = False
+    assign_roles = None
+    memo_dir = None
+    interactive = not IN_GOOGLE_COLAB
+    export = None
+    write = None
+    lean = False
+    show_gantt = True
+    load_bucket = None
+    metrics_path = None
+    openmetrics = False
+    show_forecast = False
+    trials = None
+    workers = 1
+  if not xlsx:
+    xlsx = "進捗管理表.xlsx"
+
+  print(f"xlsx:{xlsx}, nw:{nw}{', Google Colab' if IN_GOOGLE_COLAB else ''}")
+  nowt = penparse(nw, tz=tz_default) if nw else now(tz_default)
+  metrics = Metrics()
+  with metrics.phase("load"):
+    ws = load_sheet(xlsx, lean, schema)
+    baseline, team, members, on_off_map = load_members(ws, schema)
+    print_team(baseline, team, members)
+    breaks = make_breaks(on_off_map)
+  metrics.team = team
+
+  memo = WorkingTimeMemo(memo_dir, breaks) if memo_dir else None
+  diagnostics = []
+  tasks = iter_tasks(
+    ws,
+    members,
+    nowt,
+    breaks,
+    on_off_map,
+    interactive,
+    keep=False,
+    diagnostics=diagnostics,
+    schema=schema,
+    memo=memo,
+    details=not (write or export),
+  )
+  if write:
+    write_workbook(write, tasks, members, on_off_map, nowt, diagnostics)
+    if memo:
+      memo.save()
+    print(f"{write}に書き出しました。")
+    return
+  if export:
+    path = write_tasks(export, task_rows(team, tasks, members, nowt))
+    if memo:
+      memo.save()
+    print(f"{path}に書き出しました。")
+    return
+  workload = Workload(members) if load_bucket else None
+  if workload:
+    tasks = workload.feed(tasks)
+  if metrics_path:
+    tasks = metrics.feed(tasks, nowt)
+  forecaster = Forecaster(WorkingCalendar(breaks), nowt) if show_forecast else None
+  if forecaster:
+    tasks = forecaster.feed(tasks)
+  risk = RiskModel(WorkingCalendar(breaks), nowt) if trials else None
+  if risk:
+    tasks = risk.feed(tasks)
+  availability = Availability(members, WorkingCalendar(breaks)) if slot_hours else None
+  if availability:
+    tasks = availability.feed(tasks)
+  assigner = (
+    Assigner(members, WorkingCalendar(breaks), nowt, assign_roles)
+    if assign_roles is not None
+    else None
+  )
+  if assigner:
+    tasks = assigner.feed(tasks)
+  # for task, _ in tasks:
+  #     print("-" * 50)
+  #     print(f"タスク: {task.name}")
+  #     print(f"進捗: {task.progress}%")
+  #     print(f"予定: {task.plan_start} - {task.plan_end}")
+  #     print(f"実績: {task.actual_start} - {task.actual_end}")
+
+  with metrics.phase("tasks"):
+    if show_gantt:
+      team_tasks = gantt_tasks(tasks, members)
+    else:
+      team_tasks = None
+      for _ in tasks:
+        pass
+  if memo:
+    memo.save()
+  with metrics.phase("cs"):
+    team_durations = total_team_durations(members)
+    nowtt = print_cs(
+      baseline, team, members, on_off_map, nowt, team_durations, interactive
     )
+
+  if workload:
+    with metrics.phase("load_histogram"):
+      hist = workload.histogram(breaks, load_bucket)
+      print_overloads(hist)
+      heatmap = load_heatmap(hist, gantt_title(baseline, xlsx, "load"))
+    heatmap.show()
+
+  if forecaster:
+    with metrics.phase("forecast"):
+      print_forecast(forecaster, members)
+
+  if risk:
+    with metrics.phase("simulate"):
+      print_risk(risk.simulate(members, trials, workers), trials)
+
+  if assigner:
+    print_assignments(assigner.suggest(), ws, schema)
+
+  if availability:
+    print_slots(
+      availability, slot_members or members.names(), slot_hours, nowt, all_slots
+    )
+
+  fig = None
+  if team_tasks:
+    with metrics.phase("gantt"):
+      fig = cached_gantt(
+        cache, team_tasks, nowtt, gantt_title(baseline, xlsx), members, breaks
+      )
+
+  if metrics_path:
+    metrics.add_run(team_durations, members, diagnostics, nowt)
+    write_textfile(metrics_path, metrics.render(openmetrics))
+
+  if fig:
     if IN_GOOGLE_COLAB:
       return fig
     fig.show()
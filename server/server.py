@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import asyncio
+import html
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+from urllib.parse import quote, unquote, urlsplit
+
+from pendulum import DateTime
+
+from util.text import TERM_NORM, TERM_RED
+
+# ガントチャートのHTMLはplotly.jsをここから読み込む。
+PLOTLYJS_PATH = "/plotly.min.js"
+
+# リクエスト行とヘッダーを読み終えるまでの秒数
+READ_TIMEOUT = 10.0
+
+REASONS = {
+  200: "OK",
+  400: "Bad Request",
+  404: "Not Found",
+  405: "Method Not Allowed",
+  408: "Request Timeout",
+}
+
+PAGES = {
+  "cs": "CS",
+  "summary": "チームサマリー",
+  "gantt": "ガントチャート",
+}
+
+
+# 読み込みか評価に失敗し、返せる結果がないとき。原因はstderrに出力済み。
+class _LoadError(Exception):
+  pass
+
+
+class _Workbook:
+  def __init__(self, key: str, path: str):
+    self.key = key
+    self.path = path
+    self.mtime = None
+    self.sheet = None
+    self.nowt = None
+    self.pages = None
+    self.error = None
+    self.lock = asyncio.Lock()
+
+
+# 読み込んだシートをメモリに保持し、ファイルが更新されたら読み直す。
+# 評価結果は基準時刻ごとにキャッシュし、同時のリクエストは同じ結果を返す。
+class ReportServer:
+  def __init__(
+    self,
+    workbooks: list[str],
+    load: Callable[[str], object],
+    render: Callable[[object, str, DateTime], dict[str, str | None]],
+    clock: Callable[[], DateTime],
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    interval: float = 2.0,
+  ):
+    if not workbooks:
+      raise ValueError("xlsxが指定されていません。")
+    self.load = load
+    self.render = render
+    self.clock = clock
+    self.host = host
+    self.port = port
+    self.interval = interval
+    self.workbooks = {}
+    for path in workbooks:
+      key = os.path.splitext(os.path.basename(path))[0]
+      i = 1
+      while key in self.workbooks:
+        i += 1
+        key = f"{os.path.splitext(os.path.basename(path))[0]}-{i}"
+      self.workbooks[key] = _Workbook(key, path)
+    # 出力をredirect_stdoutで取り込むので評価は1スレッドで行う。
+    self.executor = ThreadPoolExecutor(max_workers=1)
+    self.plotlyjs = None
+
+  async def pages(self, wb: _Workbook) -> dict[str, bytes]:
+    loop = asyncio.get_running_loop()
+    async with wb.lock:
+      try:
+        mtime = os.stat(wb.path).st_mtime_ns
+        if wb.sheet is None or wb.mtime != mtime:
+          wb.sheet = await loop.run_in_executor(self.executor, self.load, wb.path)
+          wb.mtime = mtime
+          wb.pages = None
+        nowt = self.clock()
+        if wb.pages is None or wb.nowt != nowt:
+          pages = await loop.run_in_executor(
+            self.executor, self.render, wb.sheet, wb.path, nowt
+          )
+          wb.pages = {name: self._page(wb, name, text) for name, text in pages.items()}
+          wb.nowt = nowt
+        wb.error = None
+      except Exception as e:
+        # 保存中などで読めない場合は前回の結果を使い、次回読み直す。
+        wb.error = f"{type(e).__name__}: {e}"
+        print(f"{wb.path}: {wb.error}", file=sys.stderr)
+        if wb.pages is None:
+          raise _LoadError(wb.error) from e
+      return wb.pages
+
+  def _page(self, wb: _Workbook, name: str, text: str | None) -> bytes:
+    if text is None:
+      body = "<p>タスクがありません。</p>"
+    elif name == "gantt":
+      return text.encode()
+    else:
+      body = (
+        "<pre>"
+        + html.escape(text)
+        .replace(TERM_RED, '<span style="color:red">')
+        .replace(TERM_NORM, "</span>")
+        + "</pre>"
+      )
+    return self._html(f"{wb.key} - {PAGES[name]}", body)
+
+  def _html(self, title: str, body: str) -> bytes:
+    return (
+      "<!DOCTYPE html>\n"
+      '<html><head><meta charset="utf-8">'
+      f"<title>{html.escape(title)}</title></head>"
+      f"<body><h1>{html.escape(title)}</h1>{body}</body></html>"
+    ).encode()
+
+  def _index(self) -> bytes:
+    body = "<ul>"
+    for wb in self.workbooks.values():
+      key = quote(wb.key)
+      body += f"<li>{html.escape(wb.key)}: " + " | ".join(
+        f'<a href="/{key}/{name}">{label}</a>' for name, label in PAGES.items()
+      )
+      if wb.error:
+        body += f' <span style="color:red">{html.escape(wb.error)}</span>'
+      body += "</li>"
+    body += "</ul>"
+    return self._html("ししおどし", body)
+
+  async def route(self, path: str) -> tuple[int, str, bytes]:
+    if path == "/":
+      return 200, "text/html; charset=utf-8", self._index()
+    if path == PLOTLYJS_PATH:
+      if self.plotlyjs is None:
+        from plotly.offline import get_plotlyjs
+
+        self.plotlyjs = get_plotlyjs().encode()
+      return 200, "application/javascript", self.plotlyjs
+    parts = path.strip("/").split("/")
+    if len(parts) == 2 and parts[0] in self.workbooks and parts[1] in PAGES:
+      wb = self.workbooks[parts[0]]
+      try:
+        pages = await self.pages(wb)
+      except _LoadError as e:
+        return 500, "text/plain; charset=utf-8", str(e).encode()
+      return 200, "text/html; charset=utf-8", pages[parts[1]]
+    return 404, "text/plain; charset=utf-8", b"not found"
+
+  @staticmethod
+  async def _read_request(reader: asyncio.StreamReader) -> list[str]:
+    request = (await reader.readuntil(b"\n")).decode("latin-1").split()
+    while (await reader.readuntil(b"\n")) not in (b"\r\n", b"\n"):
+      pass
+    return request
+
+  async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+      try:
+        request = await asyncio.wait_for(self._read_request(reader), READ_TIMEOUT)
+      except TimeoutError:
+        request = None
+        status, ctype, body = 408, "text/plain", b"request timeout"
+      except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+        # 途中で切れたか、長すぎる行
+        request = None
+        status, ctype, body = 400, "text/plain", b"bad request"
+      if request is None:
+        pass
+      elif not request:
+        status, ctype, body = 400, "text/plain", b"bad request"
+      elif len(request) < 2 or request[0] not in ("GET", "HEAD"):
+        status, ctype, body = 405, "text/plain", b"method not allowed"
+      else:
+        status, ctype, body = await self.route(unquote(urlsplit(request[1]).path))
+      reason = REASONS.get(status, "Internal Server Error")
+      writer.write(
+        (
+          f"HTTP/1.1 {status} {reason}\r\n"
+          f"Content-Type: {ctype}\r\n"
+          f"Content-Length: {len(body)}\r\n"
+          "Connection: close\r\n\r\n"
+        ).encode("latin-1")
+      )
+      if not request or request[0] != "HEAD":
+        writer.write(body)
+      await writer.drain()
+    except ConnectionError:
+      pass
+    finally:
+      writer.close()
+
+  # ファイルの更新を監視し、リクエストが来る前に読み直しておく。
+  async def watch(self):
+    while True:
+      await asyncio.sleep(self.interval)
+      for wb in self.workbooks.values():
+        if wb.mtime is None:
+          continue
+        try:
+          mtime = os.stat(wb.path).st_mtime_ns
+        except OSError as e:
+          # 消えたファイルなどは、同じエラーが続く間は1回だけ出力する。
+          error = f"{type(e).__name__}: {e}"
+          if wb.error != error:
+            wb.error = error
+            print(f"{wb.path}: {error}", file=sys.stderr)
+          continue
+        if mtime != wb.mtime:
+          try:
+            await self.pages(wb)
+          except _LoadError:
+            # 次のリクエストか更新で読み直す。
+            pass
+
+  async def serve_forever(self):
+    server = await asyncio.start_server(self.handle, self.host, self.port)
+    for wb in self.workbooks.values():
+      try:
+        await self.pages(wb)
+      except _LoadError:
+        # 一覧にエラーを表示し、リクエストが来たら読み直す。
+        pass
+    print(f"http://{self.host}:{self.port}/", file=sys.stderr)
+    watcher = asyncio.create_task(self.watch())
+    try:
+      async with server:
+        await server.serve_forever()
+    finally:
+      watcher.cancel()
+
+  def run(self):
+    try:
+      asyncio.run(self.serve_forever())
+    except KeyboardInterrupt:
+      pass
+    finally:
+      self.executor.shutdown()
+
+
+# end of file
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import csv
+import os
+import re
+from datetime import datetime
+from itertools import islice
+from typing import Iterator
+
+_INT = re.compile(r"[+-]?\d+")
+_FLOAT = re.compile(r"[+-]?(?:\d+\.\d*|\.\d+)(?:[eE][+-]?\d+)?")
+_DATETIME = re.compile(
+  r"(\d{4})[-/](\d{1,2})[-/](\d{1,2})(?:[ T](\d{1,2}):(\d{2})(?::(\d{2}))?)?"
+)
+
+
+# xlsxをopenpyxlで読んだ場合と同じ型にする。
+def _value(s: str):
+  if not s:
+    return None
+  if _INT.fullmatch(s):
+    return int(s)
+  if _FLOAT.fullmatch(s):
+    return float(s)
+  m = _DATETIME.fullmatch(s)
+  if m:
+    try:
+      return datetime(*(int(x) for x in m.groups(default="0")))
+    except ValueError:
+      pass
+  return s
+
+
+# CSV/TSVに書き出した進捗管理表。iter_rowsのたびにファイルを先頭から読む。
+# 行は1行目の長さまで右をNoneで埋める。
+class CsvSheet:
+  def __init__(self, path: str, encoding: str = "utf-8-sig"):
+    self.path = path
+    self.encoding = encoding
+    self.delimiter = "\t" if os.path.splitext(path)[1].lower() == ".tsv" else ","
+    self.title = os.path.splitext(os.path.basename(path))[0]
+    with open(path, newline="", encoding=encoding) as f:
+      self.width = len(next(csv.reader(f, delimiter=self.delimiter), []))
+
+  def iter_rows(
+    self,
+    min_row: int | None = None,
+    max_row: int | None = None,
+    values_only: bool = True,
+  ) -> Iterator[tuple]:
+    if not values_only:
+      raise ValueError("CsvSheetは値のみ保持しています。")
+    return self._rows((min_row or 1) - 1, max_row)
+
+  def _rows(self, start: int, stop: int | None) -> Iterator[tuple]:
+    width = self.width
+    with open(self.path, newline="", encoding=self.encoding) as f:
+      for row in islice(csv.reader(f, delimiter=self.delimiter), start, stop):
+        if len(row) < width:
+          row += [""] * (width - len(row))
+        yield tuple(_value(v) for v in row)
+
+  def __repr__(self):
+    return f"CsvSheet(path={self.path!r})"
+
+
+# end of file
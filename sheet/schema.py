@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import json
+import os
+from functools import lru_cache
+from operator import itemgetter
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "schema.json")
+
+# 行から取り出す順番
+FIELDS = ("name", "progress", "plan_start", "plan_end", "actual_start", "actual_end")
+
+
+# シートとタスク表の見出し。列名と別名はschema.jsonで変更できる。
+class TaskSchema:
+  __slots__ = ("columns", "aliases", "member_prefix", "max_members", "header")
+
+  def __init__(
+    self,
+    header: dict[str, str],
+    columns: dict[str, str],
+    aliases: dict[str, list[str]],
+    member_prefix: str,
+    max_members: int,
+  ):
+    # 1行目の見出し(ベースライン、チーム名)
+    self.header = header
+    self.columns = columns
+    self.aliases = aliases
+    self.member_prefix = member_prefix
+    self.max_members = max_members
+
+  def member_labels(self) -> list[str]:
+    return [f"{self.member_prefix}{j}" for j in range(1, self.max_members + 1)]
+
+  # 見出し行から列の位置を決める。足りない列があればValueError。
+  def compile(self, labels: list) -> "RowExtractor":
+    label_to_col = {label: i for i, label in enumerate(labels) if label}
+    for label, aliases in self.aliases.items():
+      if label not in label_to_col:
+        for alias in aliases:
+          if alias in label_to_col:
+            label_to_col[label] = label_to_col[alias]
+            break
+    member_labels = self.member_labels()
+    for label in [self.columns[f] for f in FIELDS] + member_labels[:1]:
+      if label not in label_to_col:
+        raise ValueError(f"{label}列が見つかりません。しくしく...")
+    return RowExtractor(
+      [label_to_col[self.columns[f]] for f in FIELDS],
+      [
+        (label, label_to_col[label]) for label in member_labels if label in label_to_col
+      ],
+    )
+
+
+# 見出しを解決済みの行の読み出し。
+class RowExtractor:
+  __slots__ = ("fields", "members")
+
+  def __init__(self, cols: list[int], members: list[tuple[str, int]]):
+    # row -> (タスク, 進捗, 予定開始, 予定完了, 実績開始, 実績完了)
+    self.fields = itemgetter(*cols)
+    # (列名, 列)
+    self.members = members
+
+
+@lru_cache(maxsize=8)
+def load_schema(path: str = SCHEMA_PATH) -> TaskSchema:
+  with open(path, encoding="utf-8") as f:
+    d = json.load(f)
+  return TaskSchema(
+    d["header"],
+    d["columns"],
+    d.get("aliases", {}),
+    d["member_prefix"],
+    d["max_members"],
+  )
+
+
+# end of file
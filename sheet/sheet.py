@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+from typing import Iterator
+
+from openpyxl.utils.escape import unescape
+
+
+# ワークシートの値だけをメモリに保持する。
+# load_members/load_tasksが使うiter_rows(values_only=True)だけを提供する。
+# 行は最も長い行に合わせて読み出し時に右をNoneで埋める。
+class Sheet:
+  def __init__(self, rows: list[tuple], title: str | None = None):
+    self.rows = [tuple(r) for r in rows]
+    self.width = max((len(r) for r in self.rows), default=0)
+    self.title = title
+
+  # openpyxlは_xHHHH_の形の文字を戻さないので、xlsxと同じく戻す。
+  @classmethod
+  def from_worksheet(cls, ws) -> "Sheet":
+    return cls(
+      [
+        tuple(unescape(v) if isinstance(v, str) else v for v in r)
+        for r in ws.iter_rows(values_only=True)
+      ],
+      ws.title,
+    )
+
+  def iter_rows(
+    self,
+    min_row: int | None = None,
+    max_row: int | None = None,
+    values_only: bool = True,
+  ) -> Iterator[tuple]:
+    if not values_only:
+      raise ValueError("Sheetは値のみ保持しています。")
+    return self._padded(self.rows[(min_row or 1) - 1 : max_row])
+
+  def _padded(self, rows: list[tuple]) -> Iterator[tuple]:
+    width = self.width
+    for r in rows:
+      yield r if len(r) == width else r + (None,) * (width - len(r))
+
+  def __len__(self):
+    return len(self.rows)
+
+  def __repr__(self):
+    return f"Sheet(title={self.title!r}, rows={len(self.rows)})"
+
+
+# end of file
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import posixpath
+import zipfile
+from datetime import datetime
+from fnmatch import fnmatchcase
+from functools import lru_cache
+from xml.etree.ElementTree import ParseError, iterparse
+
+from openpyxl.styles.numbers import (
+  BUILTIN_FORMATS,
+  is_date_format,
+  is_timedelta_format,
+)
+from openpyxl.utils.datetime import (
+  CALENDAR_MAC_1904,
+  CALENDAR_WINDOWS_1900,
+  from_excel,
+  from_ISO8601,
+)
+from openpyxl.utils.escape import unescape
+
+from sheet.schema import TaskSchema, load_schema
+from sheet.sheet import Sheet
+
+NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# load_members/load_tasksが読む範囲
+HEADER_ROWS = 3  # 1行目の見出しと2,3行目の担当者
+CALENDAR_COL = 15  # O列以降がカレンダー
+TASK_MIN_ROW = 5  # 5行目以降にタスク表の見出し(schema.jsonのタスク列)
+
+TAG_C = f"{NS}c"
+TAG_ROW = f"{NS}row"
+
+
+class UnsupportedXlsx(Exception):
+  pass
+
+
+# これらが起きたらopenpyxlで読み直す。
+_ERRORS = (
+  UnsupportedXlsx,
+  KeyError,
+  IndexError,
+  ValueError,
+  OverflowError,
+  ParseError,
+  zipfile.BadZipFile,
+)
+
+
+@lru_cache(maxsize=None)
+def _col_index(letters: str) -> int:
+  rc = 0
+  for c in letters:
+    rc = rc * 26 + ord(c) - 64
+  return rc - 1
+
+
+# 共有文字列は必要になった番号まで読み進める。
+class _SharedStrings:
+  def __init__(self, zf: zipfile.ZipFile, path: str | None):
+    self.strings = []
+    self.it = None
+    if path is not None and path in zf.namelist():
+      self.it = iterparse(zf.open(path), events=("end",))
+
+  def __getitem__(self, i: int) -> str:
+    while len(self.strings) <= i:
+      if self.it is None:
+        raise UnsupportedXlsx(f"共有文字列{i}がありません。")
+      for _, e in self.it:
+        if e.tag == f"{NS}si":
+          self.strings.append(_text(e))
+          e.clear()
+          break
+      else:
+        self.it = None
+    return self.strings[i]
+
+
+# ふりがな(rPh)を除いた文字列。_xHHHH_の形の文字を戻す。
+def _text(e) -> str:
+  t = e.find(f"{NS}t")
+  snippets = [t.text or ""] if t is not None else []
+  for r in e.iterfind(f"{NS}r"):
+    t = r.find(f"{NS}t")
+    if t is not None:
+      snippets.append(t.text or "")
+  return unescape("".join(snippets))
+
+
+def _rels(zf: zipfile.ZipFile, path: str) -> dict[str, str]:
+  base = posixpath.dirname(posixpath.dirname(path))
+  rc = {}
+  for _, e in iterparse(zf.open(path)):
+    if e.tag == f"{NS_PKG_REL}Relationship":
+      target = e.get("Target")
+      rc[e.get("Id")] = (
+        target.lstrip("/")
+        if target.startswith("/")
+        else posixpath.normpath(posixpath.join(base, target))
+      )
+  return rc
+
+
+# シートの(名前, パス)の一覧、アクティブなシートの番号、共有文字列とスタイルの
+# パス、1904年基準か。
+def _workbook(
+  zf: zipfile.ZipFile,
+) -> tuple[list[tuple[str, str]], int, str | None, str | None, bool]:
+  rels = _rels(zf, "xl/_rels/workbook.xml.rels")
+  sheets = []
+  active = 0
+  date1904 = False
+  for _, e in iterparse(zf.open("xl/workbook.xml")):
+    if e.tag == f"{NS}sheet":
+      sheets.append((e.get("name"), rels[e.get(f"{NS_REL}id")]))
+    elif e.tag == f"{NS}workbookView" and e.get("activeTab"):
+      active = int(e.get("activeTab"))
+    elif e.tag == f"{NS}workbookPr":
+      date1904 = e.get("date1904") in ("1", "true")
+  shared = styles = None
+  for target in rels.values():
+    if target.endswith("sharedStrings.xml"):
+      shared = target
+    elif target.endswith("styles.xml"):
+      styles = target
+  return sheets, active, shared, styles, date1904
+
+
+# 日付(経過時間)書式のセルスタイル番号
+def _date_styles(zf: zipfile.ZipFile, path: str | None) -> tuple[set, set]:
+  dates = set()
+  timedeltas = set()
+  if path is None:
+    return dates, timedeltas
+  custom = {}
+  xfs = None
+  for _, e in iterparse(zf.open(path)):
+    if e.tag == f"{NS}numFmt":
+      custom[int(e.get("numFmtId"))] = e.get("formatCode")
+    elif e.tag == f"{NS}cellXfs":
+      xfs = e
+      break
+  for i, xf in enumerate(xfs if xfs is not None else []):
+    fmt_id = int(xf.get("numFmtId", 0))
+    fmt = custom.get(fmt_id, BUILTIN_FORMATS.get(fmt_id))
+    if fmt is not None and is_date_format(fmt):
+      dates.add(i)
+      if is_timedelta_format(fmt):
+        timedeltas.add(i)
+  return dates, timedeltas
+
+
+def _cast_number(v: str) -> int | float:
+  if "." in v or "E" in v or "e" in v:
+    return float(v)
+  return int(v)
+
+
+def _is_datetime(v) -> bool:
+  return isinstance(v, (datetime, int)) and not isinstance(v, bool)
+
+
+# 共有文字列とスタイルはブックで1つなので、複数のシートを読んでも一度だけ読む。
+class _Reader:
+  def __init__(self, zf: zipfile.ZipFile):
+    self.sheets, self.active, shared, styles, date1904 = _workbook(zf)
+    self.zf = zf
+    self.shared = _SharedStrings(zf, shared)
+    self.dates, self.timedeltas = _date_styles(zf, styles)
+    self.epoch = CALENDAR_MAC_1904 if date1904 else CALENDAR_WINDOWS_1900
+
+  def value(self, c):
+    t = c.get("t", "n")
+    if t == "inlineStr":
+      e = c.find(f"{NS}is")
+      return _text(e) if e is not None else None
+    v = c.findtext(f"{NS}v") or None
+    if v is None:
+      return None
+    if t == "n":
+      v = _cast_number(v)
+      s = int(c.get("s", 0))
+      if s in self.dates:
+        return from_excel(v, self.epoch, timedelta=s in self.timedeltas)
+      return v
+    if t == "s":
+      return self.shared[int(v)]
+    if t in ("str", "e"):
+      return v
+    if t == "b":
+      return bool(int(v))
+    if t == "d":
+      return from_ISO8601(v)
+    raise UnsupportedXlsx(f"{c.get('r')}: 型{t}")
+
+  # 行番号と{列: 値}を返す。cols(列→bool)で読む列を選ぶ。
+  def rows(self, path: str, cols):
+    r = 0
+    j = -1
+    cells = {}
+    for _, e in iterparse(self.zf.open(path), events=("end",)):
+      if e.tag == TAG_C:
+        ref = e.get("r")
+        if ref is None:
+          j += 1
+        else:
+          letters = ref.rstrip("0123456789")
+          if not letters.isupper() or len(letters) == len(ref):
+            raise UnsupportedXlsx(f"セル番地{ref}")
+          j = _col_index(letters)
+        if cols(j):
+          v = self.value(e)
+          if v is not None:
+            cells[j] = v
+        e.clear()
+      elif e.tag == TAG_ROW:
+        r = int(e.get("r")) if e.get("r") else r + 1
+        yield r, cells
+        j = -1
+        cells = {}
+        e.clear()
+
+
+# 読む列。最初は全列を読み、カレンダーとタスク表の見出しを読み終えたら
+# タスク表の列だけにする。
+class _Columns:
+  __slots__ = ("keep_all", "task_cols")
+
+  def __init__(self):
+    self.keep_all = True
+    self.task_cols = None
+
+  def __call__(self, j: int) -> bool:
+    return self.keep_all or j in self.task_cols
+
+
+def _lean_rows(reader: _Reader, title: str, path: str, marker: str) -> list[tuple]:
+  if not path.startswith("xl/worksheets/"):
+    raise UnsupportedXlsx(f"{title}はワークシートではありません。")
+  rows = []
+  cols = _Columns()
+  calendar_rows = None  # カレンダーの2行を見つけてから全列を読む残りの行数
+  prev = {}
+  for r, cells in reader.rows(path, cols):
+    while len(rows) < r - 1:
+      rows.append(())
+    if cols.keep_all:
+      if cols.task_cols is None and r >= TASK_MIN_ROW and marker in cells.values():
+        cols.task_cols = {j for j, v in cells.items() if isinstance(v, str)}
+      if calendar_rows is None:
+        for j, v in cells.items():
+          if j >= CALENDAR_COL - 1 and _is_datetime(v) and prev.get(j) == v:
+            calendar_rows = 1
+            break
+      elif calendar_rows > 0:
+        calendar_rows -= 1
+      # 以降はタスク表の列だけを読む。
+      cols.keep_all = r <= HEADER_ROWS or calendar_rows != 0 or cols.task_cols is None
+      prev = cells
+    rows.append(tuple(cells.get(j) for j in range(max(cells, default=-1) + 1)))
+  return rows
+
+
+# openpyxlを使わずにアクティブなシートから必要なセルだけを読む。
+# 読めないものはNoneを返すので、呼び出し側でopenpyxlを使うこと。
+def read_xlsx(path: str, schema: TaskSchema = None) -> Sheet | None:
+  marker = (schema or load_schema()).columns["name"]
+  try:
+    with zipfile.ZipFile(path) as zf:
+      reader = _Reader(zf)
+      title, part = reader.sheets[reader.active]
+      return Sheet(_lean_rows(reader, title, part, marker), title)
+  except _ERRORS:
+    return None
+
+
+# 名前がpattern(*や?が使える)に合うワークシートをシートの順に読む。
+# zipと共有文字列はシートの間で共有する。読めなければNone。
+def read_xlsx_sheets(
+  path: str, pattern: str = "*", schema: TaskSchema = None
+) -> list[Sheet] | None:
+  marker = (schema or load_schema()).columns["name"]
+  try:
+    with zipfile.ZipFile(path) as zf:
+      reader = _Reader(zf)
+      return [
+        Sheet(_lean_rows(reader, title, part, marker), title)
+        for title, part in reader.sheets
+        if fnmatchcase(title, pattern) and part.startswith("xl/worksheets/")
+      ]
+  except _ERRORS:
+    return None
+
+
+# end of file
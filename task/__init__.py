@@ -28,7 +28,8 @@
 
 from task.task import Task
 from task.taskset import TaskSet
+from task.tasksummary import TaskSummary
 
-__all__ = ["Task", "TaskSet"]
+__all__ = ["Task", "TaskSet", "TaskSummary"]
 
 # end of file
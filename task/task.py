@@ -26,6 +26,8 @@
 # CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import sys
+
 from pendulum import DateTime
 from pendulum import duration as penduration
 
@@ -34,6 +36,23 @@ from timerange.timerangeset import TimeRangeSet
 
 
 class Task:
+  __slots__ = (
+    "name",
+    "plan_start",
+    "plan_end",
+    "actual_start",
+    "actual_end",
+    "progress",
+    "was_warned",
+    "_now",
+    "_breaks",
+    "_memo",
+    "_planned_total_seconds",
+    "_planned_done_seconds",
+    "_actual_total_seconds",
+    "_actual_done_seconds",
+  )
+
   def __init__(
     self,
     name: str,
@@ -44,45 +63,108 @@ class Task:
     actual_end: DateTime | None,
     now: DateTime,
     breaks: TimeRangeSet,
-    on_off_map: dict[DateTime, bool],
+    was_warned: bool = False,
+    memo=None,
   ):
-    self.name = name
+    self.name = sys.intern(name)
     self.plan_start = plan_start
     self.plan_end = plan_end
     self.actual_start = actual_start
     self.actual_end = actual_end
     self.progress = progress
-    self.now = now
-    self.was_warned = False
-    self._validate(on_off_map)
-
-    trs = TimeRangeSet([TimeRange(self.plan_start, self.plan_end)]) - breaks
-    dur = trs.total_duration() if trs else penduration()
-    self.planned_total_seconds = dur.in_seconds()
-
-    trs = (
-      TimeRangeSet([TimeRange(self.plan_start, min(self.now, self.plan_end))]) - breaks
-      if self.plan_start < self.now
-      else None
-    )
+    # 値の検査と修正はvalidate.validate_tasksで済ませておく。
+    self.was_warned = was_warned
+    # 工数は読まれたときに計算して覚えておく。nowやbreaksを変えると計算し直す。
+    self._now = now
+    self._breaks = breaks
+    # breaksのカレンダーでnowによらない区間の稼働秒数を覚えておくもの
+    # (cache.WorkingTimeMemo)。
+    self._memo = memo
+    self._planned_total_seconds = None
+    self._forget()
+
+  def _forget(self):
+    self._planned_done_seconds = None
+    self._actual_total_seconds = None
+    self._actual_done_seconds = None
+
+  @property
+  def now(self) -> DateTime:
+    return self._now
+
+  @now.setter
+  def now(self, now: DateTime):
+    if now != self._now:
+      self._now = now
+      self._forget()
+
+  @property
+  def breaks(self) -> TimeRangeSet:
+    return self._breaks
+
+  @breaks.setter
+  def breaks(self, breaks: TimeRangeSet):
+    if breaks is not self._breaks:
+      self._breaks = breaks
+      self._memo = None
+      self._planned_total_seconds = None
+      self._forget()
+
+  def _working_seconds(self, start: DateTime, end: DateTime) -> int:
+    trs = TimeRangeSet([TimeRange(start, end)]) - self._breaks
     dur = trs.total_duration() if trs else penduration()
-    self.planned_done_seconds = dur.in_seconds()
-
+    return dur.in_seconds()
+
+  # nowによらない区間はメモがあればそこから引く。
+  def _closed_seconds(self, start: DateTime, end: DateTime) -> int:
+    if self._memo is None:
+      return self._working_seconds(start, end)
+    return self._memo.get(start, end, self._working_seconds)
+
+  @property
+  def planned_total_seconds(self) -> int:
+    if self._planned_total_seconds is None:
+      self._planned_total_seconds = self._closed_seconds(self.plan_start, self.plan_end)
+    return self._planned_total_seconds
+
+  @property
+  def planned_done_seconds(self) -> int:
+    if self._planned_done_seconds is None:
+      if self.plan_end <= self._now:
+        self._planned_done_seconds = self.planned_total_seconds
+      elif self.plan_start < self._now:
+        self._planned_done_seconds = self._working_seconds(self.plan_start, self._now)
+      else:
+        self._planned_done_seconds = 0
+    return self._planned_done_seconds
+
+  # 実績の工数は予定の工数と進捗に依存するので2つまとめて計算する。
+  def _actual_seconds(self):
     if self.progress == 100:
-      trs = TimeRangeSet([TimeRange(self.actual_start, self.actual_end)]) - breaks
-      dur = trs.total_duration() if trs else penduration()
-      self.actual_total_seconds = dur.in_seconds()
-      self.actual_done_seconds = self.actual_total_seconds
+      self._actual_total_seconds = self._closed_seconds(
+        self.actual_start, self.actual_end
+      )
+      self._actual_done_seconds = self._actual_total_seconds
     elif self.progress >= 30:
       # 工数を進捗率から予測。
-      trs = TimeRangeSet([TimeRange(self.actual_start, self.now)]) - breaks
-      dur = trs.total_duration() if trs else penduration()
-      self.actual_done_seconds = dur.in_seconds()
-      self.actual_total_seconds = self.actual_done_seconds * 100 / self.progress
+      self._actual_done_seconds = self._working_seconds(self.actual_start, self._now)
+      self._actual_total_seconds = self._actual_done_seconds * 100 / self.progress
     else:
       # 誤差が大きくなるので工数は計画を利用
-      self.actual_total_seconds = self.planned_total_seconds
-      self.actual_done_seconds = self.actual_total_seconds * self.progress / 100
+      self._actual_total_seconds = self.planned_total_seconds
+      self._actual_done_seconds = self._actual_total_seconds * self.progress / 100
+
+  @property
+  def actual_total_seconds(self) -> float:
+    if self._actual_total_seconds is None:
+      self._actual_seconds()
+    return self._actual_total_seconds
+
+  @property
+  def actual_done_seconds(self) -> float:
+    if self._actual_done_seconds is None:
+      self._actual_seconds()
+    return self._actual_done_seconds
 
   def __eq__(self, val: "Task"):
     return self.name == val.name
@@ -129,92 +211,5 @@ class Task:
 
   # ^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^ フィルター ^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
 
-  def _validate(self, on_off_map: dict[DateTime, bool]):
-    if self.plan_start == self.plan_end:
-      self.plan_end = self.plan_end.add(seconds=1)
-      self.was_warned = True
-      print(
-        f"{self.name}: 予定開始日時が予定終了日時と同じです。時間指定を間違えないように注意して修正してください。"
-      )
-    elif self.plan_start > self.plan_end:
-      t = self.plan_start
-      self.plan_start = self.plan_end
-      self.plan_end = t
-      self.was_warned = True
-      print(
-        f"{self.name}: 予定開始日時が予定終了日時より後です。時間指定を間違えないように注意して修正してください。"
-      )
-    if self.actual_start is None:
-      if self.actual_end:
-        self.actual_start = self.actual_end
-        self.actual_end = None
-        self.was_warned = True
-        print(
-          f"{self.name}: 実績開始日時がないのに実績終了日時があります。修正してください。"
-        )
-    elif self.actual_end:
-      if self.actual_start == self.actual_end:
-        self.actual_end = self.actual_end.add(seconds=1)
-        self.was_warned = True
-        print(
-          f"{self.name}: 実績開始日時が実績終了日時と同じです。時間指定を間違えないように注意して修正してください。"
-        )
-      elif self.actual_start > self.actual_end:
-        t = self.actual_start
-        self.actual_start = self.actual_end
-        self.actual_end = t
-        self.was_warned = True
-        print(
-          f"{self.name}: 実績開始日時が実績終了日時より後です。時間指定を間違えないように注意して修正してください。"
-        )
-
-    if self.progress:
-      if self.progress > 100:
-        print(f"{self.name}: 進捗よすぎ({self.progress}%)です。")
-        self.progress = 100
-        self.was_warned = True
-      elif self.progress < 0:
-        print(f"{self.name}: 進捗とんでもなく悪すぎ({self.progress}%)です。")
-        self.progress = 0
-        self.was_warned = True
-      if not self.actual_start and self.progress > 0:
-        self.actual_start = self.plan_start
-        self.was_warned = True
-        print(f"{self.name}: 進捗があります。実績開始日時をセットしてください。")
-    else:
-      self.progress = 0
-      if not self.actual_end and self.actual_start and self.actual_start < self.now:
-        self.was_warned = True
-        print(f"{self.name}: 実績開始日時があります。進捗をセットしてください。")
-    if self.actual_end and self.progress != 100:
-      self.progress = 100
-      self.was_warned = True
-      print(f"{self.name}: 実績完了日時があります。進捗を100%にセットしてください。")
-
-    if (
-      self.actual_start
-      and not self.actual_end
-      and self.actual_start > self.now
-      and self.progress > 0
-    ):
-      self.actual_start = None
-      self.progress = 0
-      self.was_warned = True
-      print(f"{self.name}: 実績開始日時が未来です。")
-    if self.actual_end and self.actual_end > self.now:
-      self.was_warned = True
-      print(f"{self.name}: 実績完了日時が未来です。")
-
-    if self.actual_start and self.progress < 0:
-      self.progress = 0
-
-    dt = self.plan_start.at(0)
-    while dt <= self.plan_end:
-      if dt not in on_off_map:
-        raise ValueError(
-          f"{dt.format('YYYY-MM-DD HH:mm')}がカレンダー(O列以降)にありません。"
-        )
-      dt = dt.add(days=1)
-
 
 # end of file
@@ -26,6 +26,7 @@
 # CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+from bisect import bisect_left, bisect_right
 from typing import Callable
 
 from pendulum import DateTime, Duration
@@ -35,8 +36,19 @@ from util.text import wlen
 
 
 class TaskSet:
+  __slots__ = (
+    "tasks",
+    "period_start",
+    "period_end",
+    "max_len_of_names",
+    "_names",
+    "_index",
+  )
+
   def __init__(self, tasks: list[Task] = None):
     self.tasks = tasks or []
+    self._names = {t.name for t in self.tasks}
+    self._index = None
     if self.tasks:
       self.period_start = min(t.period_start() for t in self.tasks)
       self.period_end = max(t.period_end() for t in self.tasks)
@@ -47,8 +59,10 @@ class TaskSet:
       self.max_len_of_names = None
 
   def add(self, task: Task):
-    if task not in self.tasks:
+    if task.name not in self._names:
+      self._names.add(task.name)
       self.tasks.append(task)
+      self._index = None
       ltn = wlen(task.name)
       if not self.max_len_of_names or self.max_len_of_names < ltn:
         self.max_len_of_names = ltn
@@ -78,6 +92,73 @@ class TaskSet:
   def filter(self, pred: Callable[[Task], bool]) -> "TaskSet":
     return TaskSet([t for t in self.tasks if pred(t)])
 
+  # vvvvvvvvvvvvvvvvvvvvvvvvvvvvvv 時刻を指定した抽出 vvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+  # Taskのis_*でfilterしたものと同じタスクを同じ順番で返す。
+  # 索引は最初の問い合わせで作り、タスクを追加したら作り直す。
+  def unstarted(self, nowt: DateTime) -> "TaskSet":
+    keys, pos = self._indexes()["unstarted"]
+    return self._pick(pos[: bisect_left(keys, nowt)])
+
+  def unfinished(self, nowt: DateTime) -> "TaskSet":
+    keys, pos = self._indexes()["unfinished"]
+    return self._pick(pos[: bisect_right(keys, nowt)])
+
+  def overrun(self, nowt: DateTime) -> "TaskSet":
+    keys, pos = self._indexes()["overrun"]
+    return self._pick(pos[: bisect_left(keys, nowt.timestamp())])
+
+  def responsible(self, base_date: DateTime) -> "TaskSet":
+    index = self._indexes()
+    keys, pos = index["unstarted"]
+    picked = pos[: bisect_left(keys, base_date.add(days=1))] + index["running"]
+    keys, pos = index["finished"]
+    return self._pick(picked + pos[bisect_left(keys, base_date.at(0)) :])
+
+  def _pick(self, pos: list[int]) -> "TaskSet":
+    return TaskSet([self.tasks[i] for i in sorted(pos)])
+
+  # 名前 -> (整列したキー, タスクの位置)。runningは位置だけ。
+  def _indexes(self) -> dict:
+    if self._index is None:
+      unstarted = []
+      unfinished = []
+      overrun = []
+      finished = []
+      running = []
+      for i, t in enumerate(self.tasks):
+        if not t.actual_start:
+          unstarted.append((t.plan_start, i))
+          continue
+        unfinished.append((t.plan_end, i))
+        if t.actual_end:
+          finished.append((t.actual_end, i))
+        else:
+          running.append(i)
+          # nowt - actual_start > plan_end - plan_startとなる境目
+          overrun.append(
+            (
+              t.actual_start.timestamp()
+              + t.plan_end.timestamp()
+              - t.plan_start.timestamp(),
+              i,
+            )
+          )
+      self._index = dict(
+        unstarted=self._sorted(unstarted),
+        unfinished=self._sorted(unfinished),
+        overrun=self._sorted(overrun),
+        finished=self._sorted(finished),
+        running=running,
+      )
+    return self._index
+
+  @staticmethod
+  def _sorted(entries: list[tuple]) -> tuple[list, list[int]]:
+    entries.sort()
+    return [k for k, _ in entries], [i for _, i in entries]
+
+  # ^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^ 時刻を指定した抽出 ^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+
   def calc_base(self, base_date: DateTime) -> tuple["DateTime", "DateTime"]:
     if not self.period_start or self.period_start <= base_date <= self.period_end:
       rc = base_date.at(0)
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+from pendulum import DateTime
+
+from task.task import Task
+from task.taskset import TaskSet
+
+
+# タスクを保持せずに担当者ごとの集計を更新していく。
+# 状態の判定は各タスクのnowで行う。CSの基準時刻で判定しても結果は同じ。
+# CSに出すタスクの一覧はaddのdetailsがTrueのときだけ集め、件数は常に数える。
+class TaskSummary:
+  __slots__ = (
+    "now",
+    "count",
+    "period_start",
+    "period_end",
+    "plan_start",
+    "plan_end",
+    "actual_start",
+    "actual_end",
+    "started",
+    "running",
+    "planned_total_seconds",
+    "planned_done_seconds",
+    "actual_total_seconds",
+    "actual_done_seconds",
+    "unstarted",
+    "unfinished",
+    "overrun",
+    "unstarted_count",
+    "unfinished_count",
+    "overrun_count",
+    "_base",
+    "_base_end",
+    "_first_end",
+    "_last_start",
+    "_responsible",
+    "_first_day",
+    "_last_day",
+  )
+
+  def __init__(self):
+    self.now = None
+    self._base = None
+    self._base_end = None
+    self._first_end = None
+    self._last_start = None
+    self.count = 0
+    self.period_start = None
+    self.period_end = None
+    # ガントチャートの担当者別の行用。予定と実績それぞれの範囲と着手/進行中の件数。
+    self.plan_start = None
+    self.plan_end = None
+    self.actual_start = None
+    self.actual_end = None
+    self.started = 0
+    self.running = 0
+    self.planned_total_seconds = 0
+    self.planned_done_seconds = 0
+    self.actual_total_seconds = 0
+    self.actual_done_seconds = 0
+    self.unstarted = TaskSet()
+    self.unfinished = TaskSet()
+    self.overrun = TaskSet()
+    self.unstarted_count = 0
+    self.unfinished_count = 0
+    self.overrun_count = 0
+    # (順番, タスク名)。nowの日に担当しているタスク。
+    self._responsible = []
+    # 期間がnowより後のときに加わる、期間の初日に始まる未着手のタスク。
+    self._first_day = []
+    # 期間がnowより前のときに加わる、期間の最終日に完了したタスク。
+    self._last_day = []
+
+  def add(self, task: Task, details: bool = True):
+    seq = self.count
+    self.count += 1
+    if self.now is not task.now:
+      self.now = task.now
+      self._base = task.now.at(0)
+      self._base_end = self._base.add(days=1)
+    self.planned_total_seconds += task.planned_total_seconds
+    self.planned_done_seconds += task.planned_done_seconds
+    self.actual_total_seconds += task.actual_total_seconds
+    self.actual_done_seconds += task.actual_done_seconds
+
+    tps = task.period_start()
+    tpe = task.period_end()
+    if not self.period_start or self.period_start > tps:
+      self.period_start = tps
+      self._first_end = tps.at(0).add(days=1)
+      self._first_day = [e for e in self._first_day if e[2] < self._first_end]
+    if not self.period_end or self.period_end < tpe:
+      self.period_end = tpe
+      self._last_start = tpe.at(0)
+      self._last_day = [e for e in self._last_day if e[2] >= self._last_start]
+
+    if not self.plan_start or self.plan_start > task.plan_start:
+      self.plan_start = task.plan_start
+    if not self.plan_end or self.plan_end < task.plan_end:
+      self.plan_end = task.plan_end
+    if task.actual_start:
+      self.started += 1
+      if not self.actual_start or self.actual_start > task.actual_start:
+        self.actual_start = task.actual_start
+      if not task.actual_end:
+        self.running += 1
+      elif not self.actual_end or self.actual_end < task.actual_end:
+        self.actual_end = task.actual_end
+
+    if task.is_unstarted(task.now):
+      self.unstarted_count += 1
+      if details:
+        self.unstarted.add(task)
+    if task.is_unfinished(task.now):
+      self.unfinished_count += 1
+      if details:
+        self.unfinished.add(task)
+    if task.is_overrun(task.now):
+      self.overrun_count += 1
+      if details:
+        self.overrun.add(task)
+    if not details:
+      return
+
+    # Task.is_responsible(nowの日)と同じ判定
+    if task.actual_start is None:
+      if task.plan_start < self._base_end:
+        self._responsible.append((seq, task.name))
+      if task.plan_start < self._first_end:
+        self._first_day.append((seq, task.name, task.plan_start))
+    elif not task.actual_end or self._base <= task.actual_end:
+      self._responsible.append((seq, task.name))
+    if task.actual_end and task.actual_end >= self._last_start:
+      self._last_day.append((seq, task.name, task.actual_end))
+
+  def __len__(self):
+    return self.count
+
+  def calc_base(self, base_date: DateTime) -> tuple["DateTime", "DateTime"]:
+    if not self.period_start or self.period_start <= base_date <= self.period_end:
+      rc = base_date.at(0)
+    elif self.period_end < base_date:
+      rc = self.period_end.at(0)
+    else:
+      rc = self.period_start.at(0)
+    return rc, rc.add(days=1)
+
+  # calc_base(now)の日に担当しているタスク名を読み込んだ順に返す。
+  def responsible(self) -> list[str]:
+    names = dict(self._responsible)
+    if self.period_start and self.now < self.period_start:
+      names.update((seq, name) for seq, name, _ in self._first_day)
+    elif self.period_end and self.period_end < self.now:
+      names.update((seq, name) for seq, name, _ in self._last_day)
+    return [names[seq] for seq in sorted(names)]
+
+  def total_durations(self) -> tuple[float, float, float, float]:
+    return (
+      self.planned_total_seconds,
+      self.planned_done_seconds,
+      self.actual_total_seconds,
+      self.actual_done_seconds,
+    )
+
+  def __repr__(self):
+    return (
+      f"TaskSummary(count={self.count}, period={self.period_start} - {self.period_end})"
+    )
+
+
+# end of file
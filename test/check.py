@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# test/check_*.pyをすべて実行し、ひとつでも失敗したら1で終わる。
+# python test/check.py
+
+import glob
+import os
+import subprocess
+import sys
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def main() -> int:
+  failed = []
+  for path in sorted(glob.glob(os.path.join(TEST_DIR, "check_*.py"))):
+    print(f"=== {os.path.basename(path)}", flush=True)
+    if subprocess.run([sys.executable, path]).returncode != 0:
+      failed.append(os.path.basename(path))
+  if failed:
+    print(f"失敗: {', '.join(failed)}")
+    return 1
+  print("すべて同じです。")
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
+
+# end of file
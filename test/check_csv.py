@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# CSV/TSVに書き出した進捗管理表がxlsxと同じ結果になるか確かめる。
+# python test/check_csv.py
+
+import csv
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+from openpyxl import load_workbook
+from report import WORKBOOKS, cs, same
+
+
+def export(xlsx: str, path: str, delimiter: str):
+  wb = load_workbook(xlsx, read_only=True, data_only=True)
+  try:
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+      w = csv.writer(f, delimiter=delimiter)
+      for row in wb.active.iter_rows(values_only=True):
+        w.writerow(
+          [
+            ""
+            if v is None
+            else v.strftime("%Y-%m-%d %H:%M:%S")
+            if isinstance(v, datetime)
+            else v
+            for v in row
+          ]
+        )
+  finally:
+    wb.close()
+
+
+def main() -> bool:
+  ok = True
+  with tempfile.TemporaryDirectory() as d:
+    for xlsx in WORKBOOKS:
+      expected = cs(xlsx)
+      name = os.path.splitext(os.path.basename(xlsx))[0]
+      for ext, delimiter in ((".csv", ","), (".tsv", "\t")):
+        path = os.path.join(d, name + ext)
+        export(xlsx, path, delimiter)
+        ok &= same(name + ext, expected, cs(path))
+  return ok
+
+
+if __name__ == "__main__":
+  sys.exit(0 if main() else 1)
+
+# end of file
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# 担当者ごとの予定の重なりが、行の順番によらず全部の組み合わせを調べたときと
+# 同じだけ見つかるか確かめる。予定開始の順に並んでいない行も試す。
+# python test/check_member.py
+
+import csv
+import os
+import re
+import sys
+import tempfile
+from datetime import datetime
+
+from openpyxl import load_workbook
+from report import NW, WORKBOOKS, cs, same
+
+MEMBER = "あいう"
+# 担当者ごとにタスクが1つはないとCSを出せないので、ほかの担当者にも1つ割り当てる。
+OTHERS = ("ほか", datetime(2026, 1, 28, 9), datetime(2026, 1, 28, 10))
+# (タスク, 予定開始, 予定完了)。lateとlater、midとearlyが重なる。
+ROWS = [
+  ("late", datetime(2026, 1, 22, 9), datetime(2026, 1, 26, 18)),
+  ("mid", datetime(2026, 1, 14, 9), datetime(2026, 1, 15, 18)),
+  ("later", datetime(2026, 1, 23, 9), datetime(2026, 1, 23, 18)),
+  ("early", datetime(2026, 1, 15, 9), datetime(2026, 1, 15, 12)),
+]
+# タスク名に付く行番号(-lineN)は除いて比べる。
+OVERLAP = re.compile(
+  f"{MEMBER}さんのタスク「(.+?)(?:-line\\d+)?」はタスク「(.+?)(?:-line\\d+)?」と重なっています。"
+)
+
+
+def text(v) -> str:
+  if v is None:
+    return ""
+  if isinstance(v, datetime):
+    return v.strftime("%Y-%m-%d %H:%M:%S")
+  return v
+
+
+# 見本の進捗管理表のタスクをrowsだけにしてCSVで書き出す。
+def write_csv(rows: list[tuple], path: str) -> str:
+  wb = load_workbook(WORKBOOKS[0], read_only=True, data_only=True)
+  try:
+    values = [list(r) for r in wb.active.iter_rows(values_only=True)]
+  finally:
+    wb.close()
+  first = next(i for i, r in enumerate(values) if isinstance(r[2], datetime))
+  for r in values[first:]:
+    r[:14] = [None] * 14
+  for r, (name, start, end) in zip(values[first:], rows):
+    r[0], r[2], r[3], r[6] = name, start, end, MEMBER
+  r = values[first + len(rows)]
+  r[0], r[2], r[3] = OTHERS
+  r[7:10] = values[1][7:10]
+  with open(path, "w", newline="", encoding="utf-8") as f:
+    csv.writer(f).writerows([text(v) for v in r] for r in values)
+  return path
+
+
+# 前の行のうち予定が重なるものを全部
+def reference(rows: list[tuple]) -> list[tuple]:
+  return [
+    (name, other)
+    for i, (name, start, end) in enumerate(rows)
+    for other, o_start, o_end in rows[:i]
+    if o_start < end and start < o_end
+  ]
+
+
+def main() -> bool:
+  ok = True
+  with tempfile.TemporaryDirectory() as d:
+    path = os.path.join(d, "overlap.csv")
+    for label, rows in (
+      ("行の順", ROWS),
+      ("予定開始の順", sorted(ROWS, key=lambda r: r[1])),
+    ):
+      write_csv(rows, path)
+      ok &= same(f"{label} {NW}", reference(rows), OVERLAP.findall(cs(path)))
+  return ok
+
+
+if __name__ == "__main__":
+  sys.exit(0 if main() else 1)
+
+# end of file
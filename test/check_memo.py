@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# --memoで覚えた稼働秒数を使っても工数が変わらないか確かめる。
+# Taskのnowを変えてもメモは使い続け、breaksを変えたらメモを使わないことも
+# 確かめる。
+# python test/check_memo.py
+
+import io
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+
+from check_task import metrics, reference
+from report import NW, WORKBOOKS, cs, same
+
+import prj
+from cache import WorkingTimeMemo, breaks_fingerprint
+from timerange.timerangeset import TimeRangeSet
+
+
+# 引かれた区間を数えるメモ
+class CountingMemo:
+  __slots__ = ("gets",)
+
+  def __init__(self):
+    self.gets = 0
+
+  def get(self, start, end, compute) -> int:
+    self.gets += 1
+    return compute(start, end)
+
+
+def load(xlsx: str, memo) -> tuple:
+  nowt = prj.penparse(NW, tz=prj.tz_default)
+  with redirect_stdout(io.StringIO()):
+    ws = prj.load_sheet(xlsx)
+    _, _, members, on_off_map = prj.load_members(ws)
+    breaks = prj.make_breaks(on_off_map)
+    if isinstance(memo, str):
+      memo = WorkingTimeMemo(memo, breaks)
+    tasks = [
+      t
+      for t, _ in prj.iter_tasks(
+        ws, members, nowt, breaks, on_off_map, False, memo=memo
+      )
+    ]
+  return tasks, nowt, breaks, memo
+
+
+def check_file(name: str, xlsx: str) -> bool:
+  ok = True
+  with tempfile.TemporaryDirectory() as d:
+    # 1回目は計算して保存し、2回目は保存したものを使う。
+    for i in (1, 2):
+      tasks, nowt, breaks, memo = load(xlsx, d)
+      expected = [reference(t, nowt, breaks) for t in tasks]
+      ok &= same(f"{name} {i}回目", expected, [metrics(t) for t in tasks])
+      memo.save()
+      saved = WorkingTimeMemo(d, breaks)
+      ok &= same(f"{name} {i}回目に保存した区間", len(memo), len(saved))
+    # 休みが変われば別のファイル
+    ok &= same(
+      f"{name} 休みごとのファイル",
+      True,
+      memo.fingerprint != breaks_fingerprint(TimeRangeSet()),
+    )
+    ok &= same(f"{name} CS", cs(xlsx), cs(xlsx, "--memo", d))
+  return ok
+
+
+def check_setters(name: str, xlsx: str) -> bool:
+  memo = CountingMemo()
+  tasks, nowt, breaks, _ = load(xlsx, memo)
+  ok = same(
+    f"{name} メモあり",
+    [reference(t, nowt, breaks) for t in tasks],
+    [metrics(t) for t in tasks],
+  )
+  # nowによらない区間は、nowを変えてもメモから引く。
+  gets = memo.gets
+  later = nowt.add(days=30)
+  for t in tasks:
+    t.now = later
+  ok &= same(
+    f"{name} now+30日",
+    [reference(t, later, breaks) for t in tasks],
+    [metrics(t) for t in tasks],
+  )
+  ok &= same(
+    f"{name} now+30日もメモを使う",
+    any(t.progress == 100 for t in tasks),
+    gets < memo.gets,
+  )
+  # 休みを変えたら、メモは前の休みで数えたものなので使わない。
+  gets = memo.gets
+  for t in tasks:
+    t.breaks = TimeRangeSet()
+  ok &= same(
+    f"{name} 休みなし",
+    [reference(t, later, TimeRangeSet()) for t in tasks],
+    [metrics(t) for t in tasks],
+  )
+  ok &= same(f"{name} 休みなしはメモを使わない", gets, memo.gets)
+  return ok
+
+
+def main() -> bool:
+  ok = True
+  for xlsx in WORKBOOKS:
+    name = os.path.basename(xlsx)
+    ok &= check_file(name, xlsx)
+    ok &= check_setters(name, xlsx)
+  return ok
+
+
+if __name__ == "__main__":
+  sys.exit(0 if main() else 1)
+
+# end of file
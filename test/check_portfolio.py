@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# --portfolioで、同じひな形から作ったチームのタスクが消えないことと、
+# 1つのチームの中で同じ内容の行だけが除かれることを確かめる。
+# python test/check_portfolio.py
+
+import csv
+import io
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from datetime import datetime
+
+from openpyxl import load_workbook
+from report import NW, WORKBOOKS, same
+
+import prj
+
+
+# xlsxをCSVで書き出す。最初のタスクの行をもう1行、表の最後に足す。
+def export_with_copy(xlsx: str, path: str):
+  wb = load_workbook(xlsx, read_only=True, data_only=True)
+  try:
+    rows = list(wb.active.iter_rows(values_only=True))
+  finally:
+    wb.close()
+  first = next(r for r in rows if isinstance(r[2], datetime))
+  last = max(i for i, r in enumerate(rows) if r[0] is not None)
+  rows.insert(last + 1, first)
+  rows = [
+    [v.strftime("%Y-%m-%d %H:%M:%S") if isinstance(v, datetime) else v for v in r]
+    for r in rows
+  ]
+  with open(path, "w", newline="", encoding="utf-8") as f:
+    csv.writer(f).writerows(rows)
+
+
+def task_count(path: str) -> int:
+  nowt = prj.penparse(NW, tz=prj.tz_default)
+  with redirect_stdout(io.StringIO()):
+    ws = prj.load_sheet(path)
+    _, _, members, on_off_map = prj.load_members(ws)
+    breaks = prj.make_breaks(on_off_map)
+    return len(prj.load_tasks(ws, members, nowt, breaks, on_off_map, False))
+
+
+def portfolio(paths: list[str]):
+  nowt = prj.penparse(NW, tz=prj.tz_default)
+  with redirect_stdout(io.StringIO()):
+    return prj.load_portfolio(paths, nowt, interactive=False)
+
+
+def counts(p) -> tuple:
+  return [len(p.team_tasks(t)) for t in p.teams], p.duplicates
+
+
+def main() -> bool:
+  ok = True
+  # 同じブックを2回。チーム名は同じで、行もすべて同じ。
+  xlsx = WORKBOOKS[0]
+  n = task_count(xlsx)
+  p = portfolio([xlsx, xlsx])
+  ok &= same("同じひな形の2チーム", ([n, n], 0), counts(p))
+  ok &= same("同じひな形の2チーム 全体", 2 * n, len(p.tasks))
+
+  # 1つのチームの中で同じ行が2回あれば、2回目だけを除く。
+  with tempfile.TemporaryDirectory() as d:
+    path = os.path.join(d, "copy.csv")
+    export_with_copy(xlsx, path)
+    ok &= same("行を足したCSV", n + 1, task_count(path))
+    p = portfolio([path, xlsx])
+    ok &= same("チームの中の重複", ([n, n], 1), counts(p))
+  return ok
+
+
+if __name__ == "__main__":
+  sys.exit(0 if main() else 1)
+
+# end of file
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# CSの出力がtest/expectedに保存したものと同じか確かめる。
+# 出力を変える修正をしたときは--updateで保存し直し、差分を確認すること。
+# python test/check_report.py [--update]
+
+import os
+import sys
+
+from report import TEST_DIR, WORKBOOKS, cs, same
+
+EXPECTED_DIR = os.path.join(TEST_DIR, "expected")
+
+
+def expected_path(xlsx: str) -> str:
+  name = os.path.splitext(os.path.basename(xlsx))[0]
+  return os.path.join(EXPECTED_DIR, f"{name}.txt")
+
+
+def main(update: bool = False) -> bool:
+  ok = True
+  for xlsx in WORKBOOKS:
+    path = expected_path(xlsx)
+    actual = cs(xlsx)
+    if update:
+      with open(path, "w", encoding="utf-8", newline="\n") as f:
+        f.write(actual)
+      print(f"{path}に保存しました。")
+      continue
+    with open(path, encoding="utf-8", newline="\n") as f:
+      ok &= same(os.path.basename(xlsx), f.read(), actual)
+  return ok
+
+
+if __name__ == "__main__":
+  sys.exit(0 if main("--update" in sys.argv[1:]) else 1)
+
+# end of file
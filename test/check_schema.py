@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# --schemaで列名と見出しを変えた表が、同梱のschema.jsonで読んだ元の表と
+# 同じCSになることを確かめる。
+# python test/check_schema.py
+
+import csv
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+from openpyxl import load_workbook
+from report import WORKBOOKS, cs, same
+
+from sheet import SCHEMA_PATH
+
+RENAME = {"タスク": "作業", "チーム名": "班"}
+RENAME.update({f"担当者{j}": f"係{j}" for j in range(1, 10)})
+
+
+# xlsxをCSVで書き出す。renameにあるセルは書き換える。
+def export(xlsx: str, path: str, rename: dict[str, str]):
+  wb = load_workbook(xlsx, read_only=True, data_only=True)
+  try:
+    rows = list(wb.active.iter_rows(values_only=True))
+  finally:
+    wb.close()
+  rows = [
+    [
+      v.strftime("%Y-%m-%d %H:%M:%S")
+      if isinstance(v, datetime)
+      else rename.get(v, v)
+      if isinstance(v, str)
+      else v
+      for v in r
+    ]
+    for r in rows
+  ]
+  with open(path, "w", newline="", encoding="utf-8") as f:
+    csv.writer(f).writerows(rows)
+
+
+def main() -> bool:
+  with open(SCHEMA_PATH, encoding="utf-8") as f:
+    d = json.load(f)
+  d["columns"]["name"] = RENAME["タスク"]
+  d["header"]["team"] = RENAME["チーム名"]
+  d["member_prefix"] = "係"
+  ok = True
+  with tempfile.TemporaryDirectory() as tmp:
+    schema = os.path.join(tmp, "schema.json")
+    with open(schema, "w", encoding="utf-8") as f:
+      json.dump(d, f, ensure_ascii=False)
+    original = os.path.join(tmp, "original.csv")
+    renamed = os.path.join(tmp, "renamed.csv")
+    export(WORKBOOKS[0], original, {})
+    export(WORKBOOKS[0], renamed, RENAME)
+    try:
+      cs(renamed)
+      ok &= same("同梱のschema.jsonで読めない", True, False)
+    except (KeyError, ValueError):
+      ok &= same("同梱のschema.jsonで読めない", True, True)
+    ok &= same("--schema", cs(original), cs(renamed, "--schema", schema))
+  return ok
+
+
+if __name__ == "__main__":
+  sys.exit(0 if main() else 1)
+
+# end of file
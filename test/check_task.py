@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Taskの工数を読まれたときに計算しても、作ったときにすべて計算していたときと
+# 同じになるか確かめる。読む順番を変えたときと、nowやbreaksを変えたときも
+# 確かめる。
+# python test/check_task.py
+
+import io
+import os
+import sys
+from contextlib import redirect_stdout
+
+from report import NW, WORKBOOKS, same
+
+import prj
+from timerange.timerange import TimeRange
+from timerange.timerangeset import TimeRangeSet
+
+
+def working_seconds(start, end, breaks: TimeRangeSet) -> int:
+  trs = TimeRangeSet([TimeRange(start, end)]) - breaks
+  return trs.total_duration().in_seconds() if trs else 0
+
+
+# Taskを作ったときに計算していた工数
+def reference(t, now, breaks: TimeRangeSet) -> tuple:
+  planned_total = working_seconds(t.plan_start, t.plan_end, breaks)
+  planned_done = (
+    working_seconds(t.plan_start, min(now, t.plan_end), breaks)
+    if t.plan_start < now
+    else 0
+  )
+  if t.progress == 100:
+    actual_total = working_seconds(t.actual_start, t.actual_end, breaks)
+    actual_done = actual_total
+  elif t.progress >= 30:
+    actual_done = working_seconds(t.actual_start, now, breaks)
+    actual_total = actual_done * 100 / t.progress
+  else:
+    actual_total = planned_total
+    actual_done = actual_total * t.progress / 100
+  return planned_total, planned_done, actual_total, actual_done
+
+
+def metrics(t) -> tuple:
+  return (
+    t.planned_total_seconds,
+    t.planned_done_seconds,
+    t.actual_total_seconds,
+    t.actual_done_seconds,
+  )
+
+
+# 実績から先に読む。
+def metrics_reversed(t) -> tuple:
+  actual_done = t.actual_done_seconds
+  actual_total = t.actual_total_seconds
+  planned_done = t.planned_done_seconds
+  return t.planned_total_seconds, planned_done, actual_total, actual_done
+
+
+def load(xlsx: str) -> tuple:
+  nowt = prj.penparse(NW, tz=prj.tz_default)
+  with redirect_stdout(io.StringIO()):
+    ws = prj.load_sheet(xlsx)
+    _, _, members, on_off_map = prj.load_members(ws)
+    breaks = prj.make_breaks(on_off_map)
+    tasks = [t for t, _ in prj.iter_tasks(ws, members, nowt, breaks, on_off_map, False)]
+  return tasks, nowt, breaks
+
+
+def compare(label: str, tasks: list, now, breaks: TimeRangeSet, read=metrics) -> bool:
+  expected = [reference(t, now, breaks) for t in tasks]
+  return same(label, expected, [read(t) for t in tasks])
+
+
+def main() -> bool:
+  ok = True
+  for xlsx in WORKBOOKS:
+    name = os.path.basename(xlsx)
+    tasks, nowt, breaks = load(xlsx)
+    ok &= compare(f"{name} 実績から", tasks, nowt, breaks, metrics_reversed)
+    tasks, nowt, breaks = load(xlsx)
+    ok &= compare(f"{name} {NW}", tasks, nowt, breaks)
+    # 計算済みの工数はnowを変えると計算し直す。
+    for days in (-3, 2, 30):
+      now = nowt.add(days=days)
+      for t in tasks:
+        t.now = now
+      ok &= compare(f"{name} now{days:+}日", tasks, now, breaks)
+    for t in tasks:
+      t.now = nowt
+      t.breaks = TimeRangeSet()
+    ok &= compare(f"{name} 休みなし", tasks, nowt, TimeRangeSet())
+    # 元の休みに戻す。
+    for t in tasks:
+      t.breaks = breaks
+    ok &= compare(f"{name} 休みを戻す", tasks, nowt, breaks, metrics_reversed)
+  return ok
+
+
+if __name__ == "__main__":
+  sys.exit(0 if main() else 1)
+
+# end of file
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# TaskSetの時刻を指定した抽出が、Taskのis_*で絞り込んだ結果と同じか確かめる。
+# 空のTaskSet、空のまま問い合わせてから足したとき、着手前か着手済みの
+# タスクだけのときも確かめる。
+# python test/check_taskset.py
+
+import io
+import os
+import sys
+from contextlib import redirect_stdout
+
+from report import NW, WORKBOOKS, same
+
+import prj
+from task.taskset import TaskSet
+
+QUERIES = ("unstarted", "unfinished", "overrun", "responsible")
+
+
+def load(xlsx: str) -> list:
+  nowt = prj.penparse(NW, tz=prj.tz_default)
+  with redirect_stdout(io.StringIO()):
+    ws = prj.load_sheet(xlsx)
+    _, _, members, on_off_map = prj.load_members(ws)
+    breaks = prj.make_breaks(on_off_map)
+    return list(prj.load_tasks(ws, members, nowt, breaks, on_off_map, False))
+
+
+# 期間の前日から翌日まで1時間ごと
+def hours(tasks: list) -> list:
+  T = min(t.period_start() for t in tasks).subtract(days=1)
+  end = max(t.period_end() for t in tasks).add(days=1)
+  rc = []
+  while T <= end:
+    rc.append(T)
+    T = T.add(hours=1)
+  return rc
+
+
+# 問い合わせごとに[(時刻, タスク名の一覧)]
+def answers(tasks: TaskSet, ts: list) -> dict:
+  return {q: [(T, getattr(tasks, q)(T).names()) for T in ts] for q in QUERIES}
+
+
+def reference(tasks: list, ts: list) -> dict:
+  return {
+    q: [(T, [t.name for t in tasks if getattr(t, f"is_{q}")(T)]) for T in ts]
+    for q in QUERIES
+  }
+
+
+def main() -> bool:
+  ok = True
+  for xlsx in WORKBOOKS:
+    name = os.path.basename(xlsx)
+    tasks = load(xlsx)
+    ts = hours(tasks)
+
+    empty = TaskSet()
+    ok &= same(f"{name} 空", reference([], ts), answers(empty, ts))
+    # 空で作った索引を、足したときに作り直す。
+    for t in tasks:
+      empty.add(t)
+    ok &= same(f"{name} 空から全部", reference(tasks, ts), answers(empty, ts))
+
+    half = TaskSet(tasks[: len(tasks) // 2])
+    ok &= same(f"{name} 前半", reference(half.tasks, ts), answers(half, ts))
+    for t in tasks[len(tasks) // 2 :]:
+      half.add(t)
+    # 同じ名前のタスクは足されないので、索引もそのまま
+    half.add(tasks[0])
+    ok &= same(f"{name} 前半に後半", reference(tasks, ts), answers(half, ts))
+
+    for label, subset in (
+      ("着手前だけ", [t for t in tasks if not t.actual_start]),
+      ("着手済みだけ", [t for t in tasks if t.actual_start]),
+    ):
+      ok &= same(f"{name} {label}", reference(subset, ts), answers(TaskSet(subset), ts))
+  return ok
+
+
+if __name__ == "__main__":
+  sys.exit(0 if main() else 1)
+
+# end of file
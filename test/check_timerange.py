@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# TimeRangeSetの差が、TimeRangeの差を1つずつ適用した結果と同じか確かめる。
+# python test/check_timerange.py [回数]
+
+import random
+import sys
+
+from pendulum import datetime as pendatetime
+from report import same
+
+from timerange.timerange import TimeRange
+from timerange.timerangeset import TimeRangeSet
+
+BASE = pendatetime(2026, 1, 5, tz="Asia/Tokyo")
+
+
+def random_set(rnd: random.Random, n: int) -> TimeRangeSet:
+  ranges = []
+  for _ in range(n):
+    start = rnd.randrange(0, 600)
+    ranges.append(
+      TimeRange(
+        BASE.add(minutes=start), BASE.add(minutes=start + rnd.randrange(1, 120))
+      )
+    )
+  return TimeRangeSet(ranges)
+
+
+def reference(minuend: TimeRangeSet, subtrahend: TimeRangeSet) -> TimeRangeSet:
+  rc = TimeRangeSet(list(minuend))
+  for s in subtrahend:
+    ranges = []
+    for r in rc:
+      ranges.extend(r - s)
+    rc = TimeRangeSet(ranges)
+  return rc
+
+
+def spans(trs: TimeRangeSet) -> list[tuple]:
+  return [(r.start, r.end) for r in trs]
+
+
+def main(times: int = 2000) -> bool:
+  rnd = random.Random(20260105)
+  for i in range(times):
+    minuend = random_set(rnd, rnd.randrange(0, 6))
+    subtrahend = random_set(rnd, rnd.randrange(0, 12))
+    expected = reference(minuend, subtrahend)
+    actual = minuend - subtrahend
+    if spans(expected) != spans(actual):
+      return same(f"{i}回目 {minuend} - {subtrahend}", spans(expected), spans(actual))
+  return same(f"ランダムな{times}通り", True, True)
+
+
+if __name__ == "__main__":
+  sys.exit(0 if main(*(int(a) for a in sys.argv[1:])) else 1)
+
+# end of file
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# validate_tasksが、行ごとに検査して直していたときと同じ結果になるか確かめる。
+# どの行にも直すところがあるときと、行がないときも確かめる。
+# python test/check_validate.py [行数]
+
+import random
+import sys
+
+from pendulum import datetime as pendatetime
+from report import same
+
+from validate import TaskRow, validate_tasks
+
+NOW = pendatetime(2026, 1, 16, 13, tz="Asia/Tokyo")
+FIRST = NOW.subtract(days=10).at(0)
+ON_OFF_MAP = {FIRST.add(days=d): True for d in range(21)}
+PROGRESS = [None, 0, -5, 10, 30, 50, 100, 150]
+
+
+# 行ごとに検査していたときの処理。(値, 表示する文, 警告したか)を返す。
+def reference(r: TaskRow, now) -> tuple:
+  ps, pe, acs, ace, progress = (
+    r.plan_start,
+    r.plan_end,
+    r.actual_start,
+    r.actual_end,
+    r.progress,
+  )
+  messages = []
+
+  def warn(message: str):
+    messages.append(f"{r.name}: {message}")
+
+  check = "時間指定を間違えないように注意して修正してください。"
+  if ps == pe:
+    pe = pe.add(seconds=1)
+    warn("予定開始日時が予定終了日時と同じです。" + check)
+  elif ps > pe:
+    ps, pe = pe, ps
+    warn("予定開始日時が予定終了日時より後です。" + check)
+  if acs is None:
+    if ace:
+      acs, ace = ace, None
+      warn("実績開始日時がないのに実績終了日時があります。修正してください。")
+  elif ace:
+    if acs == ace:
+      ace = ace.add(seconds=1)
+      warn("実績開始日時が実績終了日時と同じです。" + check)
+    elif acs > ace:
+      acs, ace = ace, acs
+      warn("実績開始日時が実績終了日時より後です。" + check)
+  if progress:
+    if progress > 100:
+      warn(f"進捗よすぎ({progress}%)です。")
+      progress = 100
+    elif progress < 0:
+      warn(f"進捗とんでもなく悪すぎ({progress}%)です。")
+      progress = 0
+    if not acs and progress > 0:
+      acs = ps
+      warn("進捗があります。実績開始日時をセットしてください。")
+  else:
+    progress = 0
+    if not ace and acs and acs < now:
+      warn("実績開始日時があります。進捗をセットしてください。")
+  if ace and progress != 100:
+    progress = 100
+    warn("実績完了日時があります。進捗を100%にセットしてください。")
+  if acs and not ace and acs > now and progress > 0:
+    acs = None
+    progress = 0
+    warn("実績開始日時が未来です。")
+  if ace and ace > now:
+    warn("実績完了日時が未来です。")
+  return (progress, ps, pe, acs, ace), messages, bool(messages)
+
+
+def random_time(rnd: random.Random, base):
+  return rnd.choice(
+    [None, base, base.add(hours=rnd.randrange(-30, 30)), NOW.add(hours=2)]
+  )
+
+
+def random_rows(rnd: random.Random, n: int) -> list[TaskRow]:
+  rows = []
+  for i in range(n):
+    ps = FIRST.add(days=2, hours=rnd.randrange(0, 200))
+    pe = rnd.choice([ps, ps.add(hours=rnd.randrange(1, 20)), ps.subtract(hours=3)])
+    acs = random_time(rnd, ps)
+    ace = random_time(rnd, acs or pe)
+    rows.append(TaskRow(i + 6, f"t{i}", rnd.choice(PROGRESS), ps, pe, acs, ace, []))
+  return rows
+
+
+# 予定が逆で、進捗が範囲外で、実績完了日時だけがある行
+def invalid_rows(rnd: random.Random, n: int) -> list[TaskRow]:
+  rows = []
+  for i in range(n):
+    pe = FIRST.add(days=2, hours=rnd.randrange(0, 200))
+    ps = pe.add(hours=rnd.randrange(1, 20))
+    progress = rnd.choice([-5, 150])
+    rows.append(TaskRow(i + 6, f"t{i}", progress, ps, pe, None, pe, []))
+  return rows
+
+
+def values(r: TaskRow) -> tuple:
+  return r.progress, r.plan_start, r.plan_end, r.actual_start, r.actual_end
+
+
+# 違う行があればその行を出力してFalseを返す。
+def check(label: str, rows: list[TaskRow]) -> bool:
+  expected = [reference(r, NOW) for r in rows]
+  diagnostics = []
+  validate_tasks(rows, NOW, ON_OFF_MAP, diagnostics)
+  messages = {r.row: [] for r in rows}
+  for d in diagnostics:
+    messages[d.row].append(d.message)
+  for r, e in zip(rows, expected):
+    a = (values(r), messages[r.row], r.was_warned)
+    if e != a:
+      return same(f"{label} {r.row}行目", e, a)
+  return same(label, len(rows), len(expected))
+
+
+def main(n: int = 5000) -> bool:
+  rnd = random.Random(20260116)
+  ok = check(f"ランダムな{n}行", random_rows(rnd, n))
+  rows = invalid_rows(rnd, 1000)
+  ok &= check("すべて直す1000行", rows)
+  ok &= same("すべて警告", True, all(r.was_warned for r in rows))
+  ok &= check("0行", [])
+
+  # カレンダーにない日があれば同じ文でValueError
+  outside = [TaskRow(6, "t", 0, NOW.add(days=30), NOW.add(days=31), None, None, [])]
+  try:
+    validate_tasks(outside, NOW, ON_OFF_MAP, [])
+    message = None
+  except ValueError as e:
+    message = str(e)
+  day = NOW.add(days=30).at(0).format("YYYY-MM-DD HH:mm")
+  ok &= same("カレンダー", f"{day}がカレンダー(O列以降)にありません。", message)
+  return ok
+
+
+if __name__ == "__main__":
+  sys.exit(0 if main(*(int(a) for a in sys.argv[1:])) else 1)
+
+# end of file
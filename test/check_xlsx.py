@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# openpyxlを使わない読み込み(--lean)がopenpyxlと同じ値を読むか確かめる。
+# python test/check_xlsx.py
+
+import os
+import sys
+import tempfile
+import zipfile
+
+from openpyxl import Workbook, load_workbook
+from report import WORKBOOKS, cs, same
+
+from sheet import Sheet, read_xlsx
+
+# _xHHHH_の形の文字と、元に戻した文字。_x005F_は「_」そのもの。
+ESCAPED = ["a_x000D_b", "lit_x005F_x000A_end", "tab_x0009_x", "plain_x005F_", "x"]
+DECODED = ["a\rb", "lit_x000A_end", "tab\tx", "plain_", "x"]
+
+
+def openpyxl_sheet(path: str) -> Sheet:
+  wb = load_workbook(path, read_only=True, data_only=True)
+  try:
+    return Sheet.from_worksheet(wb.active)
+  finally:
+    wb.close()
+
+
+def escaped_workbook(directory: str) -> str:
+  wb = Workbook()
+  for i, s in enumerate(ESCAPED, 1):
+    wb.active.cell(i, 1, f"@{i}@")
+  plain = os.path.join(directory, "plain.xlsx")
+  wb.save(plain)
+  path = os.path.join(directory, "escaped.xlsx")
+  with zipfile.ZipFile(plain) as zin, zipfile.ZipFile(path, "w") as zout:
+    for item in zin.infolist():
+      data = zin.read(item.filename)
+      if item.filename.startswith("xl/worksheets/"):
+        for i, s in enumerate(ESCAPED, 1):
+          data = data.replace(f"@{i}@".encode(), s.encode())
+      zout.writestr(item, data)
+  return path
+
+
+def main() -> bool:
+  ok = True
+  for path in WORKBOOKS:
+    name = os.path.basename(path)
+    lean = read_xlsx(path)
+    full = openpyxl_sheet(path)
+    # 担当者とカレンダーの行は全列を読む。
+    ok &= same(
+      f"{name} 1-7行目", list(full.iter_rows(1, 7)), list(lean.iter_rows(1, 7))
+    )
+    ok &= same(
+      f"{name} CS",
+      cs(path),
+      cs(path, "--lean"),
+    )
+  with tempfile.TemporaryDirectory() as d:
+    path = escaped_workbook(d)
+    # openpyxlは元に戻さないので、Sheet.from_worksheetで戻す。
+    ok &= same(
+      "_xHHHH_ openpyxl", DECODED, [r[0] for r in openpyxl_sheet(path).iter_rows()]
+    )
+    ok &= same(
+      "_xHHHH_",
+      list(openpyxl_sheet(path).iter_rows()),
+      list(read_xlsx(path).iter_rows()),
+    )
+  return ok
+
+
+if __name__ == "__main__":
+  sys.exit(0 if main() else 1)
+
+# end of file
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# 確認用のスクリプトから使う。prj.mainを実行して、出力とガントチャートの
+# JSONを返す。Enterの入力待ちはすぐに戻す。
+
+import builtins
+import io
+import os
+import sys
+from contextlib import redirect_stdout
+from unittest import mock
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(TEST_DIR)
+sys.path.insert(0, ROOT)
+
+import plotly.graph_objects as go
+
+import prj
+
+# test.cmdと同じ基準日時
+NW = "2026-01-16T13:00"
+WORKBOOKS = [
+  os.path.join(ROOT, "進捗管理表.xlsx"),
+  os.path.join(TEST_DIR, "進捗管理表_1.xlsx"),
+]
+
+
+def run(*args: str) -> tuple[str, list[str]]:
+  figures = []
+  with (
+    mock.patch.object(
+      go.Figure, "show", lambda fig, *a, **k: figures.append(fig.to_json())
+    ),
+    mock.patch.object(builtins, "input", lambda *a: ""),
+    mock.patch.object(sys, "argv", ["prj.py", *args]),
+    redirect_stdout(io.StringIO()) as out,
+  ):
+    prj.main()
+  return out.getvalue(), figures
+
+
+# CSの出力。1行目の「xlsx:ファイル名」は除く。
+def cs(path: str, *args: str) -> str:
+  return run(path, NW, "--no-gantt", *args)[0].split("\n", 1)[1]
+
+
+# 違いがあれば最初の行を出力してFalseを返す。
+def same(label: str, expected, actual) -> bool:
+  if expected == actual:
+    print(f"OK: {label}")
+    return True
+  if isinstance(expected, str) and isinstance(actual, str):
+    for i, (a, b) in enumerate(zip(expected.splitlines(), actual.splitlines()), 1):
+      if a != b:
+        print(f"NG: {label} {i}行目\n  - {a}\n  + {b}")
+        return False
+  print(f"NG: {label}\n  - {expected!r}\n  + {actual!r}")
+  return False
+
+
+# end of file
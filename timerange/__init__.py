@@ -28,7 +28,8 @@
 
 from timerange.timerange import TimeRange
 from timerange.timerangeset import TimeRangeSet
+from timerange.workingcalendar import WorkingCalendar
 
-__all__ = ["TimeRange", "TimeRangeSet"]
+__all__ = ["TimeRange", "TimeRangeSet", "WorkingCalendar"]
 
 # end of file
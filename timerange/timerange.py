@@ -28,17 +28,21 @@
 
 from pendulum import DateTime, Duration, timezone
 
+_TZ = timezone("Asia/Tokyo")
+
 
 class TimeRange:
+  __slots__ = ("start", "end")
+
   def __init__(self, start: DateTime, end: DateTime):
     if start >= end:
       raise ValueError("start must be before end")
     self.start = start
     self.end = end
     # TODO: failsafe for now. remove the following after a suitable grace period has passed.
-    if start.tzinfo != timezone("Asia/Tokyo"):
+    if start.tzinfo != _TZ:
       raise ValueError(f"tz of start is {start.tzinfo}")
-    if end.tzinfo != timezone("Asia/Tokyo"):
+    if end.tzinfo != _TZ:
       raise ValueError(f"tz of end is {end.tzinfo}")
 
   def is_overlap(self, other: "TimeRange") -> bool:
@@ -26,6 +26,9 @@
 # CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+from bisect import bisect_right
+from datetime import datetime, timedelta
+
 from pendulum import Duration
 from pendulum import duration as penduration
 
@@ -33,22 +36,38 @@ from timerange.timerange import TimeRange
 
 
 class TimeRangeSet:
+  __slots__ = ("ranges",)
+
   def __init__(self, ranges: list[TimeRange] = []):
     self.ranges = self._normalize(ranges or [])
 
   def add(self, r: TimeRange):
     self.ranges = self._normalize(self.ranges + [r])
 
+  # どちらも正規化(整列済みで重ならない)されているので一度の走査で引ける。
   def __sub__(self, subtractors: "TimeRangeSet") -> "TimeRangeSet":
-    rc = TimeRangeSet()
+    subs = subtractors.ranges
+    rc = []
     for r in self.ranges:
-      for s in subtractors:
-        for rr in r - s:
-          rc.add(rr)
-    return rc
+      start = r.start
+      i = bisect_right(subs, start, key=lambda s: s.end)
+      while i < len(subs) and subs[i].start < r.end:
+        if start < subs[i].start:
+          rc.append(TimeRange(start, subs[i].start))
+        start = max(start, subs[i].end)
+        i += 1
+      if start < r.end:
+        rc.append(TimeRange(start, r.end))
+    result = TimeRangeSet()
+    result.ranges = rc
+    return result
 
+  # pendulumの差(Interval)は作るのが重いので、標準のtimedeltaで足してから変換する。
   def total_duration(self) -> Duration:
-    return sum((r.duration() for r in self.ranges), penduration())
+    total = sum((datetime.__sub__(r.end, r.start) for r in self.ranges), timedelta())
+    return penduration(
+      days=total.days, seconds=total.seconds, microseconds=total.microseconds
+    )
 
   def _normalize(self, ranges: list[TimeRange]) -> list[TimeRange]:
     sorted_ranges = sorted(ranges, key=lambda r: r.start)
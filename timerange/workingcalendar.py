@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+from pendulum import DateTime, from_timestamp
+
+from timerange.timerange import _TZ
+from timerange.timerangeset import TimeRangeSet
+
+
+# 休みの間の稼働時間を累積して持ち、稼働時間と時刻を相互に変換する。
+# 範囲は最初の休みの始まりから最後の休みの終わりまで。
+class WorkingCalendar:
+  __slots__ = ("starts", "ends", "cumulative")
+
+  def __init__(self, breaks: TimeRangeSet):
+    ranges = breaks.ranges
+    # 稼働時間帯(休みと休みの間)。時刻はtimestamp。
+    self.starts = [r.end.timestamp() for r in ranges[:-1]]
+    self.ends = [r.start.timestamp() for r in ranges[1:]]
+    # cumulative[i]はi番目の稼働時間帯の終わりまでの稼働秒数
+    self.cumulative = list(accumulate(e - s for s, e in zip(self.starts, self.ends)))
+
+  # 範囲の始まりからtまでの稼働秒数。範囲外は端に寄せる。
+  def seconds_at(self, t: DateTime) -> float:
+    ts = t.timestamp()
+    i = bisect_right(self.starts, ts) - 1
+    if i < 0:
+      return 0
+    before = self.cumulative[i - 1] if i else 0
+    return before + min(ts, self.ends[i]) - self.starts[i]
+
+  def working_seconds(self, start: DateTime, end: DateTime) -> float:
+    return self.seconds_at(end) - self.seconds_at(start)
+
+  # tから稼働時間がseconds秒たった時刻。範囲を超える場合はNone。
+  def add(self, t: DateTime, seconds: float) -> DateTime | None:
+    if seconds <= 0:
+      return t
+    return self.time_at(self.seconds_at(t) + seconds)
+
+  # seconds_atの逆。範囲を超える場合はNone。
+  def time_at(self, seconds: float) -> DateTime | None:
+    i = bisect_left(self.cumulative, seconds)
+    if i >= len(self.cumulative):
+      return None
+    return from_timestamp(self.ends[i] - (self.cumulative[i] - seconds), tz=_TZ)
+
+  # seconds_atがsecondsになる最初の時刻(休みの後の稼働の始まり)。範囲を超える
+  # 場合はNone。
+  def start_at(self, seconds: float) -> DateTime | None:
+    i = bisect_right(self.cumulative, seconds)
+    if i >= len(self.cumulative):
+      return None
+    before = self.cumulative[i - 1] if i else 0
+    return from_timestamp(self.starts[i] + seconds - before, tz=_TZ)
+
+
+# end of file
@@ -26,17 +26,24 @@
 # CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+from functools import lru_cache
 from unicodedata import east_asian_width
 
 TERM_NORM = "\033[0m"
 TERM_RED = "\033[1;31m"
 
 
-def wlen(s: str) -> int:
+# タスク名は何度も表示されるので幅をキャッシュする。
+@lru_cache(maxsize=4096)
+def _wlen(s: str) -> int:
   return sum(2 if east_asian_width(c) in "WF" else 1 for c in s)
 
 
-def wljustify(s: str, wl: int) -> int:
+def wlen(s: str) -> int:
+  return len(s) if s.isascii() else _wlen(s)
+
+
+def wljustify(s: str, wl: int) -> str:
   return s + " " * (wl - wlen(s))
 
 
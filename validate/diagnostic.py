@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+from util.text import TERM_NORM, TERM_RED
+
+# 確認を求める問題と、知らせるだけのもの
+WARNING = "warning"
+INFO = "info"
+
+PLAN_END_MISSING = "plan-end-missing"
+UNKNOWN_MEMBER = "unknown-member"
+NO_ASSIGNEE = "no-assignee"
+PLAN_SAME = "plan-same"
+PLAN_REVERSED = "plan-reversed"
+ACTUAL_END_ONLY = "actual-end-only"
+ACTUAL_SAME = "actual-same"
+ACTUAL_REVERSED = "actual-reversed"
+PROGRESS_OVER = "progress-over"
+PROGRESS_UNDER = "progress-under"
+PROGRESS_NOT_STARTED = "progress-not-started"
+STARTED_NO_PROGRESS = "started-no-progress"
+FINISHED_NOT_DONE = "finished-not-done"
+START_FUTURE = "start-future"
+END_FUTURE = "end-future"
+OVERLAP = "overlap"
+
+
+# シートの行と列(見出し)、種類、表示する文と、自動で直したかどうか。
+class Diagnostic:
+  __slots__ = ("row", "column", "code", "message", "fixed", "level")
+
+  def __init__(
+    self,
+    row: int,
+    column: str | None,
+    code: str,
+    message: str,
+    fixed: bool = False,
+    level: str = WARNING,
+  ):
+    self.row = row
+    self.column = column
+    self.code = code
+    self.message = message
+    self.fixed = fixed
+    self.level = level
+
+  def __repr__(self):
+    return (
+      f"Diagnostic(row={self.row}, column={self.column!r}, code={self.code!r}, "
+      + f"fixed={self.fixed}, level={self.level!r})"
+    )
+
+
+# 行の順にまとめて出力する。同じ行の中では見つけた順。
+def print_diagnostics(diagnostics: list[Diagnostic], out=None):
+  lines = [d.message for d in sorted(diagnostics, key=lambda d: d.row)]
+  print(TERM_RED + "".join(f"{line}\n" for line in lines) + TERM_NORM, end="", file=out)
+
+
+# end of file
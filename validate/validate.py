@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import numpy as np
+from pendulum import DateTime
+
+from sheet.schema import load_schema
+from validate.diagnostic import (
+  ACTUAL_END_ONLY,
+  ACTUAL_REVERSED,
+  ACTUAL_SAME,
+  END_FUTURE,
+  FINISHED_NOT_DONE,
+  PLAN_REVERSED,
+  PLAN_SAME,
+  PROGRESS_NOT_STARTED,
+  PROGRESS_OVER,
+  PROGRESS_UNDER,
+  START_FUTURE,
+  STARTED_NO_PROGRESS,
+  Diagnostic,
+)
+
+
+# シートから読んだタスク1行分。validate_tasksが直してからTaskにする。
+class TaskRow:
+  __slots__ = (
+    "row",
+    "name",
+    "progress",
+    "plan_start",
+    "plan_end",
+    "actual_start",
+    "actual_end",
+    "members",
+    "was_warned",
+  )
+
+  def __init__(
+    self,
+    row: int,
+    name: str,
+    progress: int | None,
+    plan_start: DateTime,
+    plan_end: DateTime,
+    actual_start: DateTime | None,
+    actual_end: DateTime | None,
+    members,
+  ):
+    self.row = row
+    self.name = name
+    self.progress = progress
+    self.plan_start = plan_start
+    self.plan_end = plan_end
+    self.actual_start = actual_start
+    self.actual_end = actual_end
+    self.members = members
+    self.was_warned = False
+
+  def __repr__(self):
+    return f"TaskRow(row={self.row}, name={self.name!r})"
+
+
+def _timestamps(values) -> np.ndarray:
+  return np.array(
+    [np.nan if v is None else v.timestamp() for v in values], dtype=np.float64
+  )
+
+
+# 行をまとめて検査し、直せるものはその場で直して診断をdiagnosticsに加える。
+# 判定は列ごとの配列で一度に行い、直すのは該当する行だけ。検査の順番と
+# 内容はひとつずつ直していたときと同じ。カレンダーにない日があればValueError。
+# 診断の列名はcolumns(既定はschema.jsonの列名)から取る。
+def validate_tasks(
+  rows: list[TaskRow],
+  now: DateTime,
+  on_off_map: dict[DateTime, bool],
+  diagnostics: list[Diagnostic],
+  columns: dict[str, str] = None,
+):
+  if not rows:
+    return
+  columns = columns or load_schema().columns
+  ps = _timestamps(r.plan_start for r in rows)
+  pe = _timestamps(r.plan_end for r in rows)
+  acs = _timestamps(r.actual_start for r in rows)
+  ace = _timestamps(r.actual_end for r in rows)
+  progress = np.array(
+    [np.nan if r.progress is None else r.progress for r in rows], dtype=np.float64
+  )
+  nowts = now.timestamp()
+
+  def emit(mask, column, code, message, fixed=True, fix=None):
+    for i in np.flatnonzero(mask):
+      r = rows[i]
+      diagnostics.append(
+        Diagnostic(r.row, column, code, f"{r.name}: {message(r)}", fixed)
+      )
+      r.was_warned = True
+      if fix:
+        fix(i, r)
+
+  def plan_same(i, r):
+    r.plan_end = r.plan_end.add(seconds=1)
+    pe[i] += 1
+
+  def plan_reversed(i, r):
+    r.plan_start, r.plan_end = r.plan_end, r.plan_start
+    ps[i], pe[i] = pe[i], ps[i]
+
+  same = ps == pe
+  reversed_ = ps > pe
+  emit(
+    same,
+    columns["plan_end"],
+    PLAN_SAME,
+    lambda r: (
+      "予定開始日時が予定終了日時と同じです。"
+      + "時間指定を間違えないように注意して修正してください。"
+    ),
+    fix=plan_same,
+  )
+  emit(
+    reversed_,
+    columns["plan_start"],
+    PLAN_REVERSED,
+    lambda r: (
+      "予定開始日時が予定終了日時より後です。"
+      + "時間指定を間違えないように注意して修正してください。"
+    ),
+    fix=plan_reversed,
+  )
+
+  def actual_end_only(i, r):
+    r.actual_start, r.actual_end = r.actual_end, None
+    acs[i], ace[i] = ace[i], np.nan
+
+  def actual_same(i, r):
+    r.actual_end = r.actual_end.add(seconds=1)
+    ace[i] += 1
+
+  def actual_reversed(i, r):
+    r.actual_start, r.actual_end = r.actual_end, r.actual_start
+    acs[i], ace[i] = ace[i], acs[i]
+
+  started = ~np.isnan(acs)
+  finished = ~np.isnan(ace)
+  end_only = ~started & finished
+  same = started & finished & (acs == ace)
+  reversed_ = started & finished & (acs > ace)
+  emit(
+    end_only,
+    columns["actual_start"],
+    ACTUAL_END_ONLY,
+    lambda r: "実績開始日時がないのに実績終了日時があります。修正してください。",
+    fix=actual_end_only,
+  )
+  emit(
+    same,
+    columns["actual_end"],
+    ACTUAL_SAME,
+    lambda r: (
+      "実績開始日時が実績終了日時と同じです。"
+      + "時間指定を間違えないように注意して修正してください。"
+    ),
+    fix=actual_same,
+  )
+  emit(
+    reversed_,
+    columns["actual_start"],
+    ACTUAL_REVERSED,
+    lambda r: (
+      "実績開始日時が実績終了日時より後です。"
+      + "時間指定を間違えないように注意して修正してください。"
+    ),
+    fix=actual_reversed,
+  )
+
+  def set_progress(value):
+    def fix(i, r):
+      r.progress = value
+      progress[i] = value
+
+    return fix
+
+  def progress_not_started(i, r):
+    r.actual_start = r.plan_start
+    acs[i] = ps[i]
+
+  # 進捗が0や空のときは0にして、開始だけしている行を知らせる。
+  has_progress = ~np.isnan(progress) & (progress != 0)
+  for i in np.flatnonzero(~has_progress):
+    rows[i].progress = 0
+  progress[~has_progress] = 0
+  emit(
+    has_progress & (progress > 100),
+    columns["progress"],
+    PROGRESS_OVER,
+    lambda r: f"進捗よすぎ({r.progress}%)です。",
+    fix=set_progress(100),
+  )
+  emit(
+    has_progress & (progress < 0),
+    columns["progress"],
+    PROGRESS_UNDER,
+    lambda r: f"進捗とんでもなく悪すぎ({r.progress}%)です。",
+    fix=set_progress(0),
+  )
+  emit(
+    has_progress & np.isnan(acs) & (progress > 0),
+    columns["actual_start"],
+    PROGRESS_NOT_STARTED,
+    lambda r: "進捗があります。実績開始日時をセットしてください。",
+    fix=progress_not_started,
+  )
+  emit(
+    ~has_progress & np.isnan(ace) & (acs < nowts),
+    columns["progress"],
+    STARTED_NO_PROGRESS,
+    lambda r: "実績開始日時があります。進捗をセットしてください。",
+    fixed=False,
+  )
+
+  emit(
+    ~np.isnan(ace) & (progress != 100),
+    columns["progress"],
+    FINISHED_NOT_DONE,
+    lambda r: "実績完了日時があります。進捗を100%にセットしてください。",
+    fix=set_progress(100),
+  )
+
+  def start_future(i, r):
+    r.actual_start = None
+    r.progress = 0
+    acs[i] = np.nan
+    progress[i] = 0
+
+  emit(
+    np.isnan(ace) & (acs > nowts) & (progress > 0),
+    columns["actual_start"],
+    START_FUTURE,
+    lambda r: "実績開始日時が未来です。",
+    fix=start_future,
+  )
+  emit(
+    ace > nowts,
+    columns["actual_end"],
+    END_FUTURE,
+    lambda r: "実績完了日時が未来です。",
+    fixed=False,
+  )
+
+  _check_calendar(rows, ps, pe, now, on_off_map)
+
+
+# 予定の期間の日がすべてカレンダーにあるか。
+def _check_calendar(
+  rows: list[TaskRow],
+  ps: np.ndarray,
+  pe: np.ndarray,
+  now: DateTime,
+  on_off_map: dict[DateTime, bool],
+):
+  offset = now.utcoffset().total_seconds()
+  days = np.sort(_timestamps(on_off_map) + offset) // 86400
+  first = (ps + offset) // 86400
+  last = (pe + offset) // 86400
+  covered = np.searchsorted(days, last, "right") - np.searchsorted(days, first)
+  bad = np.flatnonzero(covered != last - first + 1)
+  if len(bad):
+    r = rows[bad[0]]
+    dt = r.plan_start.at(0)
+    while dt <= r.plan_end:
+      if dt not in on_off_map:
+        raise ValueError(
+          f"{dt.format('YYYY-MM-DD HH:mm')}がカレンダー(O列以降)にありません。"
+        )
+      dt = dt.add(days=1)
+
+
+# end of file
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Released under MIT License
+#
+# Copyright (c) 2025 Fumiyuki Shimizu
+# Copyright (c) 2025 Abacus Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+from datetime import datetime
+from typing import Iterable, Iterator
+
+import numpy as np
+import plotly.graph_objects as go
+
+from member.memberset import MemberSet
+from task.task import Task
+from timerange.timerangeset import TimeRangeSet
+
+BUCKETS = {"hour": 3600, "day": 86400}
+
+
+# 担当者×時間帯ごとの予定稼働秒と、その時間帯に一人が稼働できる秒。
+class LoadHistogram:
+  __slots__ = ("names", "starts", "step", "load", "capacity")
+
+  def __init__(
+    self,
+    names: list[str],
+    starts: list[datetime],
+    step: int,
+    load: np.ndarray,
+    capacity: np.ndarray,
+  ):
+    self.names = names
+    self.starts = starts
+    self.step = step
+    self.load = load
+    self.capacity = capacity
+
+  def over_capacity(self) -> np.ndarray:
+    return self.load > self.capacity + 1e-6
+
+  # (担当者名, 時間帯の開始, 予定秒, 稼働できる秒)を時間帯の順に返す。
+  def overloads(self) -> list[tuple[str, datetime, float, float]]:
+    members, buckets = np.nonzero(self.over_capacity())
+    order = np.lexsort((members, buckets))
+    return [
+      (
+        self.names[members[i]],
+        self.starts[buckets[i]],
+        float(self.load[members[i], buckets[i]]),
+        float(self.capacity[buckets[i]]),
+      )
+      for i in order
+    ]
+
+  def __repr__(self):
+    return f"LoadHistogram(members={len(self.names)}, buckets={len(self.starts)})"
+
+
+# タスクの予定期間を担当者ごとに集めて、稼働時間帯ごとの負荷を求める。
+# feedはタスクをそのまま流しながら予定期間だけを記録する。
+class Workload:
+  __slots__ = ("names", "_index", "_members", "_starts", "_ends", "_first")
+
+  def __init__(self, members: MemberSet):
+    self.names = members.names()
+    self._index = {name: i for i, name in enumerate(self.names)}
+    self._members = []
+    self._starts = []
+    self._ends = []
+    self._first = None
+
+  def add(self, task: Task, task_members: MemberSet):
+    for m in task_members:
+      self._members.append(self._index[m.name])
+      self._starts.append(task.plan_start.timestamp())
+      self._ends.append(task.plan_end.timestamp())
+    if task_members and (not self._first or task.plan_start < self._first):
+      self._first = task.plan_start
+
+  def feed(
+    self, tasks: Iterable[tuple[Task, MemberSet]]
+  ) -> Iterator[tuple[Task, MemberSet]]:
+    for task, task_members in tasks:
+      self.add(task, task_members)
+      yield task, task_members
+
+  # 時間帯の境界・タスクの開始終了・休みの境界で時間を区切り、区間ごとの
+  # 担当タスク数を差分配列の累積和で求めて、稼働している区間の長さを掛けて
+  # 時間帯ごとに足す。
+  def histogram(self, breaks: TimeRangeSet, bucket: str = "day") -> LoadHistogram:
+    step = BUCKETS[bucket]
+    if self._first is None:
+      return LoadHistogram(
+        self.names, [], step, np.zeros((len(self.names), 0)), np.zeros(0)
+      )
+    members = np.array(self._members, dtype=np.intp)
+    starts = np.array(self._starts)
+    ends = np.array(self._ends)
+
+    origin = self._first.at(0)
+    n = int(np.ceil((ends.max() - origin.timestamp()) / step))
+    edges = origin.timestamp() + step * np.arange(n + 1, dtype=np.float64)
+    rests = np.array(
+      [(r.start.timestamp(), r.end.timestamp()) for r in breaks], dtype=np.float64
+    ).reshape(-1, 2)
+    rests = np.clip(rests, edges[0], edges[-1])
+    rests = rests[rests[:, 0] < rests[:, 1]]
+
+    points = np.unique(np.concatenate([edges, starts, ends, rests.ravel()]))
+    diff = np.zeros((len(self.names), len(points)))
+    np.add.at(diff, (members, np.searchsorted(points, starts)), 1)
+    np.add.at(diff, (members, np.searchsorted(points, ends)), -1)
+    active = np.cumsum(diff, axis=1)[:, :-1]
+
+    resting = np.zeros(len(points))
+    np.add.at(resting, np.searchsorted(points, rests[:, 0]), 1)
+    np.add.at(resting, np.searchsorted(points, rests[:, 1]), -1)
+    working = np.where(np.cumsum(resting)[:-1] > 0, 0.0, np.diff(points))
+
+    first = np.searchsorted(points, edges[:-1])
+    return LoadHistogram(
+      self.names,
+      [datetime.fromtimestamp(t, origin.tz) for t in edges[:-1]],
+      step,
+      np.add.reduceat(active * working, first, axis=1),
+      np.add.reduceat(working, first),
+    )
+
+
+# 稼働できる時間帯だけを並べたヒートマップ。超過している所に印を付ける。
+def load_heatmap(hist: LoadHistogram, title: str) -> go.Figure:
+  cols = np.flatnonzero(hist.capacity > 0)
+  load = hist.load[:, cols] / 3600
+  capacity = hist.capacity[cols] / 3600
+  fmt = "%Y-%m-%d %H:%M" if hist.step < 86400 else "%Y-%m-%d"
+  fig = go.Figure(
+    go.Heatmap(
+      z=load,
+      x=[hist.starts[c].strftime(fmt) for c in cols],
+      y=hist.names,
+      customdata=np.broadcast_to(capacity, load.shape),
+      text=np.where(hist.over_capacity()[:, cols], "超過", ""),
+      texttemplate="%{text}",
+      hovertemplate="%{y} %{x}<br>予定: %{z:.2f}hr / 稼働: %{customdata:.2f}hr"
+      + "<extra></extra>",
+      colorscale="YlOrRd",
+      zmin=0,
+      colorbar=dict(title="hr"),
+    )
+  )
+  fig.update_layout(
+    title=title,
+    height=max(40 * len(hist.names), 300) + 150,
+    plot_bgcolor="black",
+    paper_bgcolor="black",
+    font=dict(color="white"),
+  )
+  fig.update_xaxes(type="category", side="top")
+  fig.update_yaxes(autorange="reversed")
+  return fig
+
+
+# end of file